@@ -0,0 +1 @@
+"""Performance benchmarks on synthetic survey data; see ``benchmarks.run``."""
@@ -0,0 +1,289 @@
+"""Timing the loader, every analysis section and the figures on synthetic surveys.
+
+    python -m benchmarks.run                          # 1k, 10k and 100k rows
+    python -m benchmarks.run --rows 1m 10m --only load sections
+    python -m benchmarks.run --save                   # record the results as baselines
+    python -m benchmarks.run --check                  # exit 1 on a regression
+
+Survey files are generated once per scale by ``benchmarks.synthetic`` into
+``benchmarks/data/``. Every case is timed ``--repeat`` times and the best time
+counts; setup (fresh dataset objects, a fresh stats engine, an empty cache
+directory) is not timed, so each repeat measures what the first viewer of a
+new file waits for:
+
+- ``load``: parsing the file through ``load_survey`` into an empty cache,
+  loading it again from the cache, and the chunked ``summarize_survey``;
+- ``sections``: every test and table of one section, from a dataset whose
+  indexes haven't been built yet;
+- ``plots``: drawing and encoding every figure of one section, in the mode
+  the app would pick for that many rows;
+- ``startup`` (independent of the scale): a fresh interpreter importing the
+  app's modules, and a fresh interpreter running the app once (through
+  Streamlit's ``AppTest``) up to the first rendered page.
+
+Results are compared against ``benchmarks/baselines.json``. A case counts as
+a regression when it is more than ``--tolerance`` slower than its baseline
+(and by more than a few milliseconds, which is noise). Baselines only mean
+something on the machine that recorded them, which is stored alongside.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from dataclasses import replace
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.synthetic import write_survey  # noqa: E402
+from worklife.analyses import SECTIONS, Analysis, Plot, Table  # noqa: E402
+from worklife.data import load_survey  # noqa: E402
+from worklife.engine import StatsEngine  # noqa: E402
+from worklife.figures import render_figure, resolve_mode  # noqa: E402
+from worklife.streaming import summarize_survey  # noqa: E402
+
+HERE = Path(__file__).resolve().parent
+DATA_DIR = HERE / "data"
+BASELINES = HERE / "baselines.json"
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_SCALES = ("1k", "10k", "100k")
+GROUPS = ("load", "sections", "plots", "startup")
+SEED = 549
+
+# Writing and parsing workbooks gets slow quickly; larger scales load from Parquet only
+XLSX_MAX_ROWS = 100_000
+NOISE_SECONDS = 0.005
+
+
+def survey_file(rows, suffix):
+    path = DATA_DIR / f"survey-{rows}-{SEED}{suffix}"
+    if not path.exists():
+        print(f"generating {path.name} ...", file=sys.stderr)
+        write_survey(path, rows, SEED)
+    return path
+
+
+def _timed(work, setup=None, repeat=3):
+    """Seconds taken by ``work(setup())`` in each of ``repeat`` runs."""
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        work(state)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+# ------------ Cases ----------------#
+
+def load_cases(rows, scratch):
+    """Loader cases; cache directories are made under ``scratch``."""
+    for suffix in (".parquet", ".xlsx") if rows <= XLSX_MAX_ROWS else (".parquet",):
+        path = survey_file(rows, suffix)
+        kind = suffix.lstrip(".")
+        yield (f"load {kind} (parse)", lambda cache, path=path: load_survey(path, cache),
+               lambda: tempfile.mkdtemp(dir=scratch))
+        cache_dir = tempfile.mkdtemp(dir=scratch)
+        load_survey(path, cache_dir)
+        yield f"load {kind} (cached)", lambda _, path=path, cache_dir=cache_dir: load_survey(path, cache_dir), None
+    parquet = survey_file(rows, ".parquet")
+    yield "stream parquet", lambda _: summarize_survey(parquet), None
+
+
+def _fresh(dataset):
+    # A copy of the dataclass drops the cached indexes (groups, designs, ...)
+    return lambda: replace(dataset)
+
+
+def _run_section(section):
+    def work(dataset):
+        stats = StatsEngine()
+        for block in SECTIONS[section]:
+            if isinstance(block, Analysis):
+                stats.run(dataset, block)
+            elif isinstance(block, Table):
+                stats.table(dataset, block)
+    return work
+
+
+def _draw_section(section):
+    def work(dataset):
+        for block in SECTIONS[section]:
+            if isinstance(block, Plot):
+                render_figure(dataset, block, mode=resolve_mode(dataset))
+    return work
+
+
+def section_cases(dataset):
+    for section, blocks in SECTIONS.items():
+        if any(isinstance(block, (Analysis, Table)) for block in blocks):
+            yield f"section {section}", _run_section(section), _fresh(dataset)
+
+
+def plot_cases(dataset):
+    for section, blocks in SECTIONS.items():
+        if any(isinstance(block, Plot) for block in blocks):
+            yield f"figures {section}", _draw_section(section), _fresh(dataset)
+
+
+def run_scale(scale, groups=GROUPS, repeat=3):
+    """{case: {"best": seconds, "median": seconds}} for one scale."""
+    rows = SCALES[scale]
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        cases = []
+        if "load" in groups:
+            cases += load_cases(rows, scratch)
+        if "sections" in groups or "plots" in groups:
+            dataset = load_survey(survey_file(rows, ".parquet"), scratch)
+            if "sections" in groups:
+                cases += section_cases(dataset)
+            if "plots" in groups:
+                cases += plot_cases(dataset)
+        for name, work, setup in cases:
+            times = _timed(work, setup, repeat)
+            results[name] = {"best": min(times), "median": statistics.median(times)}
+            print(f"{scale:>5}  {name:<60} {min(times):9.4f}s", file=sys.stderr)
+    return results
+
+
+# ------------ Start-up ----------------#
+
+APP = HERE.parent / "streamlit_app.py"
+
+# Each snippet prints how long it took; the first run exits right away rather
+# than waiting for the sections the app warms in the background.
+_IMPORT_APP_MODULES = """
+import time
+start = time.perf_counter()
+import worklife.data, worklife.engine, worklife.figures, worklife.prefetch
+print(time.perf_counter() - start)
+"""
+
+_FIRST_RUN = f"""
+import os, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({str(APP)!r}, default_timeout=300).run()
+if app.exception:
+    sys.exit(f"the app raised: {{app.exception[0].message}}")
+print(time.perf_counter() - start, flush=True)
+os._exit(0)
+"""
+
+
+def _python_seconds(code):
+    # Without the shared results store, whose hits would make every run after the first a warm one
+    env = dict(os.environ, WORKLIFE_RESULTS_STORE="off")
+    done = subprocess.run([sys.executable, "-c", code], cwd=HERE.parent, env=env, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return float(done.stdout.split()[-1])
+
+
+def run_startup(repeat=3):
+    """Cold-start timings, each in a new interpreter: {case: {"best": ..., "median": ...}}."""
+    results = {}
+    for name, code in (("import app modules", _IMPORT_APP_MODULES), ("first app run", _FIRST_RUN)):
+        times = [_python_seconds(code) for _ in range(repeat)]
+        results[name] = {"best": min(times), "median": statistics.median(times)}
+        print(f"{'-':>5}  {name:<60} {min(times):9.4f}s", file=sys.stderr)
+    return results
+
+
+# ------------ Baselines ----------------#
+
+def machine():
+    return {"platform": platform.platform(), "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(), "python": platform.python_version(),
+            "numpy": np.__version__, "pandas": pd.__version__}
+
+
+def read_baselines(path=BASELINES):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {"machine": None, "scales": {}}
+
+
+def save_baselines(results, path=BASELINES):
+    """Merge ``results`` ({scale: {case: timings}}) into the baseline file."""
+    baselines = read_baselines(path)
+    if baselines.get("machine") != machine():
+        baselines = {"machine": machine(), "scales": {}}
+    for scale, cases in results.items():
+        baselines["scales"].setdefault(scale, {}).update(cases)
+    with open(path, "w") as handle:
+        json.dump(baselines, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def compare(results, baselines, tolerance=0.25):
+    """One row per case with its baseline, ratio and whether it regressed."""
+    records = []
+    for scale, cases in results.items():
+        for name, timings in cases.items():
+            baseline = baselines["scales"].get(scale, {}).get(name, {}).get("best")
+            ratio = timings["best"] / baseline if baseline else np.nan
+            regressed = bool(baseline) and ratio > 1 + tolerance \
+                and timings["best"] - baseline > NOISE_SECONDS
+            records.append({"scale": scale, "case": name, "best (s)": timings["best"],
+                            "median (s)": timings["median"], "baseline (s)": baseline or np.nan,
+                            "ratio": ratio, "regressed": regressed})
+    return pd.DataFrame(records)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the loader, sections and figures on synthetic data.")
+    parser.add_argument("--rows", nargs="+", choices=list(SCALES), default=list(DEFAULT_SCALES),
+                        help="scales to run (default: 1k 10k 100k)")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS),
+                        help="benchmark groups to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best one counts")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (default: 0.25)")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on a regression")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    # Seaborn's deprecation notices would drown the progress lines
+    warnings.simplefilter("ignore", FutureWarning)
+
+    results = {}
+    if "startup" in args.only:
+        results["startup"] = run_startup(args.repeat)
+    if set(args.only) - {"startup"}:
+        results.update({scale: run_scale(scale, args.only, args.repeat) for scale in args.rows})
+    baselines = read_baselines()
+    table = compare(results, baselines, args.tolerance)
+    if baselines.get("machine") not in (None, machine()):
+        print("note: baselines were recorded on a different machine", file=sys.stderr)
+    print(table.to_string(index=False, float_format="{:.4f}".format, na_rep="-", justify="left",
+                          formatters={"case": f"{{:<{table['case'].str.len().max()}}}".format}))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump({"machine": machine(), "scales": results}, handle, indent=2)
+    if args.save:
+        save_baselines(results)
+    regressions = table[table["regressed"]]
+    if len(regressions):
+        print(f"{len(regressions)} case(s) slower than the baseline by more than {args.tolerance:.0%}",
+              file=sys.stderr)
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Synthetic survey exports with the layout of ``Cleaned_Work_life.xlsx``.
+
+Every coded column is drawn from its answer frequencies in the published
+workbook (n = 549), so group sizes, sparse cells and category counts look
+like the real data at any scale. The questionnaire items are not independent:
+
+- each PSS item is a noisy reading of a latent stress level and each SWL item
+  of a latent life satisfaction, cut at the thresholds that reproduce the
+  item's observed frequencies, so the scales have realistic reliability;
+- stress and life satisfaction both depend on a general well-being factor
+  that also drives income and perceived health, and stress is a little higher
+  for people who don't exercise, so the tests find effects of roughly the
+  published size instead of pure noise;
+- ``Stress`` and ``LifeSatisf`` are the item sums, ``CompanySize`` is the
+  two-way split of ``CompanySize4cat`` and ``Sportgr`` follows
+  ``LeisureCompOrNoSport``, as in the workbook.
+
+Columns are written with the workbook's names (including its misspelling of
+``GovOrPrivaqteCo``) and plain integer codes, so files go through the same
+loading path as a real export.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtri
+
+from worklife.schema import LS_ITEMS, PSS_ITEMS
+
+# Answer counts per code in the workbook
+FREQUENCIES = {
+    "gender": {1: 135, 2: 414},
+    "perceivedhealth1to7": {2: 3, 3: 27, 4: 56, 5: 228, 6: 157, 7: 78},
+    "income1to7": {1: 4, 2: 47, 3: 143, 4: 241, 5: 101, 6: 13},
+    "schooling1to3": {1: 18, 2: 205, 3: 326},
+    "GovOrPrivaqteCo": {1: 219, 2: 330},
+    "JobPositionEmployeeManager": {1: 439, 2: 110},
+    "HUorEUorNONEuCo": {1: 450, 2: 76, 3: 23},
+    "CompanySize4cat": {1: 91, 2: 239, 3: 131, 4: 88},
+    "Childhood7to16SportsYesNo": {1: 136, 2: 413},
+    "LeisureCompOrNoSport": {1: 287, 2: 61, 3: 201},
+    "SportSocSupport1to10ZeroNoSport": {1: 7, 2: 6, 3: 9, 4: 12, 5: 33, 6: 22, 7: 39, 8: 71, 9: 56, 10: 177},
+    "ls1": {1: 9, 2: 27, 3: 61, 4: 112, 5: 178, 6: 113, 7: 49},
+    "ls2": {1: 5, 2: 20, 3: 58, 4: 103, 5: 183, 6: 117, 7: 63},
+    "ls3": {1: 4, 2: 17, 3: 43, 4: 77, 5: 151, 6: 174, 7: 83},
+    "ls4": {1: 10, 2: 13, 3: 51, 4: 78, 5: 144, 6: 158, 7: 95},
+    "ls5": {1: 37, 2: 54, 3: 99, 4: 104, 5: 107, 6: 91, 7: 57},
+    "pss1": {0: 12, 1: 62, 2: 238, 3: 167, 4: 70},
+    "pss2": {0: 62, 1: 163, 2: 201, 3: 92, 4: 31},
+    "pss3": {0: 13, 1: 76, 2: 215, 3: 163, 4: 82},
+    "pss4": {0: 65, 1: 259, 2: 183, 3: 33, 4: 9},
+    "pss5": {0: 77, 1: 268, 2: 163, 3: 31, 4: 10},
+    "pss6": {0: 140, 1: 255, 2: 122, 3: 22, 4: 10},
+    "pss7": {0: 36, 1: 195, 2: 237, 3: 61, 4: 20},
+    "pss8": {0: 54, 1: 140, 2: 204, 3: 99, 4: 52},
+    "pss9": {0: 75, 1: 279, 2: 157, 3: 29, 4: 9},
+    "pss10": {0: 52, 1: 194, 2: 215, 3: 70, 4: 18},
+    "pss11": {0: 32, 1: 114, 2: 192, 3: 158, 4: 53},
+    "pss12": {0: 15, 1: 46, 2: 148, 3: 216, 4: 124},
+    "pss13": {0: 89, 1: 247, 2: 149, 3: 50, 4: 14},
+    "pss14": {0: 104, 1: 176, 2: 155, 3: 83, 4: 31},
+}
+
+COLUMNS = [
+    "gender", "age", "perceivedhealth1to7", "income1to7", "schooling1to3", "GovOrPrivaqteCo",
+    "JobPositionEmployeeManager", "HUorEUorNONEuCo", "CompanySize4cat", "Childhood7to16SportsYesNo",
+    "SportsHistoryYears", "LeisureCompOrNoSport", "SportSocSupport1to10ZeroNoSport",
+    *LS_ITEMS, *PSS_ITEMS, "Stress", "LifeSatisf", "Sportgr", "CompanySize",
+]
+
+# Correlation of an item's latent reading with its scale; gives the workbook's
+# Cronbach's alpha (about 0.88 for both scales)
+ITEM_LOADINGS = {"LifeSatisf": 0.8, "Stress": 0.62}
+NO_SUPPORT_WITHOUT_SPORT = 0.57  # share of non-exercisers answering 0 for sport social support
+XLSX_MAX_ROWS = 1_048_575    # one row of the sheet holds the header
+
+
+def _codes(column, size, rng):
+    frequencies = FREQUENCIES[column]
+    p = np.array(list(frequencies.values()), dtype=np.float64)
+    return rng.choice(np.array(list(frequencies)), size=size, p=p / p.sum())
+
+
+def _ordinal(column, latent):
+    """Cut a standard normal ``latent`` so the codes have the column's frequencies."""
+    frequencies = FREQUENCIES[column]
+    p = np.array(list(frequencies.values()), dtype=np.float64)
+    thresholds = ndtri(np.cumsum(p / p.sum())[:-1])
+    return np.array(list(frequencies))[np.searchsorted(thresholds, latent)]
+
+
+def _mix(weight, common, rng):
+    """Standard normal variable correlated ``weight`` with the standard normal ``common``."""
+    return weight * common + np.sqrt(1 - weight * weight) * rng.standard_normal(len(common))
+
+
+def generate(rows, seed=0):
+    """A DataFrame of ``rows`` synthetic respondents in the workbook's layout."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    wellbeing = rng.standard_normal(rows)
+
+    for column in ("gender", "schooling1to3", "GovOrPrivaqteCo", "JobPositionEmployeeManager",
+                   "HUorEUorNONEuCo", "CompanySize4cat", "Childhood7to16SportsYesNo", "LeisureCompOrNoSport"):
+        data[column] = _codes(column, rows, rng)
+    data["age"] = np.clip(np.rint(rng.normal(40.35, 11.74, rows)), 18, 73).astype(np.int64)
+    data["income1to7"] = _ordinal("income1to7", _mix(0.45, wellbeing, rng))
+    data["perceivedhealth1to7"] = _ordinal("perceivedhealth1to7", _mix(0.45, wellbeing, rng))
+
+    no_sport = data["LeisureCompOrNoSport"] == 3
+    years = np.round(rng.gamma(1.76, 10.4, rows) * 2) / 2
+    data["SportsHistoryYears"] = np.where(rng.random(rows) < 0.42, 0.0, np.minimum(years, 55.0))
+    support = _codes("SportSocSupport1to10ZeroNoSport", rows, rng)
+    data["SportSocSupport1to10ZeroNoSport"] = np.where(
+        no_sport & (rng.random(rows) < NO_SUPPORT_WITHOUT_SPORT), 0, support)
+
+    stress = _mix(0.7, -wellbeing, rng) + 0.25 * no_sport
+    stress = (stress - stress.mean()) / stress.std()
+    satisfaction = _mix(0.7, wellbeing, rng)
+    for scale, items, latent in (("LifeSatisf", LS_ITEMS, satisfaction), ("Stress", PSS_ITEMS, stress)):
+        for item in items:
+            data[item] = _ordinal(item, _mix(ITEM_LOADINGS[scale], latent, rng))
+    data["Stress"] = sum(data[item] for item in PSS_ITEMS)
+    data["LifeSatisf"] = sum(data[item] for item in LS_ITEMS)
+
+    # Almost every non-exerciser is in sport group 1, almost everyone else in group 2
+    data["Sportgr"] = np.where(no_sport, np.where(rng.random(rows) < 0.99, 1, 2),
+                               np.where(rng.random(rows) < 0.9, 2, 1))
+    data["CompanySize"] = np.where(data["CompanySize4cat"] <= 2, 1, 2)
+    return pd.DataFrame({column: data[column] for column in COLUMNS})
+
+
+def write_survey(path, rows, seed=0, chunk_rows=1_000_000):
+    """Write ``rows`` synthetic respondents to a .csv, .parquet or .xlsx file.
+
+    Large files are generated and written ``chunk_rows`` at a time (each chunk
+    from its own child seed), so memory stays bounded at any size.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".xlsx" and rows > XLSX_MAX_ROWS:
+        raise ValueError(f"An Excel sheet holds at most {XLSX_MAX_ROWS:,} rows; use .csv or .parquet")
+    if suffix not in (".csv", ".parquet", ".xlsx"):
+        raise ValueError(f"Unsupported survey file type: {path.name}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sizes = [min(chunk_rows, rows - start) for start in range(0, rows, chunk_rows)] or [0]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tmp = path.with_name(path.name + ".tmp")
+
+    if suffix == ".xlsx":
+        generate(rows, seeds[0]).to_excel(tmp, index=False, engine="openpyxl")
+    elif suffix == ".csv":
+        for i, (size, child) in enumerate(zip(sizes, seeds)):
+            generate(size, child).to_csv(tmp, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for size, child in zip(sizes, seeds):
+                table = pa.Table.from_pandas(generate(size, child), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    tmp.replace(path)
+    return path
@@ -1,28 +1,121 @@
+import os
+
+import numpy as np
 import streamlit as st
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from scipy.stats import ttest_ind, pearsonr, f_oneway, chi2_contingency
-from streamlit_lottie import st_lottie
-import requests
 
-# Function to load Lottie animation from URL
-def load_lottie_url(url:str):
-    return url
+from worklife.analyses import SECTIONS, Analysis, Plot, Table, Text
+from worklife.animation import LOTTIE_PATH, LOTTIE_URL, Download, read_animation
+from worklife.bitmaps import filter_dataset, normalize_filters
+from worklife.data import DATA_PATH, load_survey, source_signature
+from worklife.discussion import discussion
+from worklife.effects import THRESHOLDS, describe, effect_sizes, power_grid, sample_size
+from worklife.engine import ALPHA, engine
+from worklife.figures import render
+from worklife.instrumentation import recorder
+from worklife.prefetch import Prefetcher, make_executor
+from worklife.resampling import N_RESAMPLES, RESAMPLED_KINDS
+from worklife.schema import CATEGORICAL_COLUMNS, LABELS
+from worklife.store import shared_results
+from worklife.waves import compare_section, registered_datasets
+
+# ------------ Header animation ----------------#
+
+# The animation ships with the app (assets/header_lottie.json). Only when that
+# file is missing, and WORKLIFE_LOTTIE_URL is set, is one downloaded, on a
+# background thread: see worklife.animation.
+@st.cache_resource(show_spinner=False)
+def _read_lottie(path: str, signature: tuple):
+    return read_animation(path)
+
+@st.cache_resource(show_spinner=False)
+def _lottie_download(url: str):
+    return Download(url)  # one per process; a failed download is retried later
+
+def load_lottie():
+    try:
+        stat = LOTTIE_PATH.stat()
+    except OSError:
+        animation = None
+    else:
+        animation = _read_lottie(str(LOTTIE_PATH), (stat.st_mtime_ns, stat.st_size))
+    if animation is None and LOTTIE_URL:
+        animation = _lottie_download(LOTTIE_URL).result()
+    return animation
 
-# Load your Lottie animation from a URL
-lottie_url = "https://lottie.host/6f5b51d6-63e7-4fb8-9a09-c81a873648d6/0lOEKzDF98.json"  # Example URL
+# Reserve the header's place now and fill it once the page is rendered, so the
+# animation never holds up the content.
+header = st.empty()
 
-# Display the animation in Streamlit
-st_lottie(load_lottie_url(lottie_url), speed=1, width=600, height=400, key="lottie1")
 
+# ------------ Load data ----------------#
 
-# ------------ Introduction ----------------#
+# One parsed copy per process, shared by every session. The signature makes
+# Streamlit load the file again as soon as the workbook changes on disk.
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load_dataset(path: str, signature: tuple):
+    return load_survey(path)
+
+def get_dataset(path=DATA_PATH):
+    return _load_dataset(str(path), source_signature(path))
+
+# Subsets are shared too, so every session filtering the same way reuses one
+# copy and its cached results.
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _filter_dataset(path: str, signature: tuple, filters: tuple):
+    return filter_dataset(_load_dataset(path, signature), dict(filters))
+
+def get_filtered_dataset(filters, path=DATA_PATH):
+    return _filter_dataset(str(path), source_signature(path), normalize_filters(filters))
+
+dataset = get_dataset()
+df = dataset.frame  # shared between sessions: never modify it in place
+theme = st.context.theme.type or "light"
+
+
+# ------------ Render analysis blocks ----------------#
+def render_analysis(analysis: Analysis):
+    result = engine.run(dataset, analysis)
+    st.write(f"**{analysis.stat_label}:** {result.statistic:.3f}")
+    st.write(f"**{analysis.p_label}:** {result.p_value:.5f}")
+    st.write(f"**Effect size:** {describe(effect_sizes(analysis, result))}")
+    if result.p_value < ALPHA:
+        st.success(analysis.significant)
+    else:
+        st.info(analysis.not_significant)
+    if result.details.get("warning"):
+        st.caption(result.details["warning"] + ".")
+    if show_resampling and analysis.kind in RESAMPLED_KINDS:
+        with st.spinner("Resampling..."):
+            resampled = engine.resampled(dataset, analysis)
+        low, high = resampled.ci
+        st.write(f"**Permutation p-value ({resampled.n_resamples:,} resamples):** {resampled.p_value:.5f}")
+        st.write(f"**{resampled.confidence:.0%} bootstrap CI ({resampled.ci_label}):** "
+                 f"{resampled.estimate:.3f} [{low:.3f}, {high:.3f}]")
+
+def show_table(table):
+    if table.empty:
+        # e.g. a model that can't be fitted on the selected respondents
+        st.info("Not enough data (or variation) among the selected respondents for this table.")
+    else:
+        st.dataframe(table, hide_index=True)
+
+def render_section(name: str):
+    for block in SECTIONS[name]:
+        if isinstance(block, Text):
+            st.markdown(block.markdown)
+        elif isinstance(block, Analysis):
+            render_analysis(block)
+        elif isinstance(block, Plot):
+            # Cached image bytes, shared by every session viewing the same data
+            st.image(render(dataset, block, theme=theme), width="stretch")
+        elif isinstance(block, Table):
+            show_table(engine.table(dataset, block))
 
-df = pd.read_excel("Cleaned_Work_life.xlsx")
+
+# ------------ Introduction ----------------#
 
 # Title and Introduction
-st.markdown("# Work, Stress and Life Satisfaction Study\n\n---\n\nThis project analyzes data from a cross-sectional study of 549 participants exploring the relationship between company size, job roles, and well-being in the workplace. Specifically, it examines whether individuals working in larger companies experience higher stress levels and different levels of life satisfaction compared to those in smaller companies. The study also investigates how stress and life satisfaction vary between employees and managers. Additionally, it explores the connection between company size and regular exercise habits, as well as whether adult exercise patterns are linked to childhood exercise habits.\n\n---\n\n\n\n---\n\n")
+st.markdown(f"# Work, Stress and Life Satisfaction Study\n\n---\n\nThis project analyzes data from a cross-sectional study of {len(df):,} participants exploring the relationship between company size, job roles, and well-being in the workplace. Specifically, it examines whether individuals working in larger companies experience higher stress levels and different levels of life satisfaction compared to those in smaller companies. The study also investigates how stress and life satisfaction vary between employees and managers. Additionally, it explores the connection between company size and regular exercise habits, as well as whether adult exercise patterns are linked to childhood exercise habits.\n\n---\n\n\n\n---\n\n")
 
 
 
@@ -73,10 +166,102 @@ section = st.sidebar.selectbox("Choose Analysis Section", [
     "Perceived Health & Stress",
     "Exercise Habits & Stress",
     "Current Exercise Habits vs Childhood Sports History",
+    "Correlation Matrix",
+    "Item Screening",
+    "Categorical Associations",
+    "Regression Models",
+    "Effect Sizes & Power",
     "Discussion",
     "Data Source",
     "Steps to Reproduce Study"
 ])
+show_resampling = st.sidebar.toggle(
+    "Permutation p-values and bootstrap CIs",
+    help=f"Distribution-free check of each t-test, ANOVA and correlation ({N_RESAMPLES:,} resamples).")
+
+# ------------ Filter respondents ----------------#
+# Options within a question are combined with OR, questions with AND.
+with st.sidebar.expander("Filter respondents"):
+    filters = {}
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            filters[column] = st.multiselect(
+                column, dataset.bitmaps.levels(column),
+                format_func=lambda code, column=column: str(LABELS.get(column, {}).get(code, code)))
+if any(filters.values()):
+    dataset = get_filtered_dataset(filters)
+    df = dataset.frame
+    st.sidebar.caption(f"{len(df):,} of {len(get_dataset().frame):,} respondents selected.")
+
+# ------------ Survey waves ----------------#
+# Extra datasets come from WORKLIFE_DATASETS (see worklife/waves.py); each is
+# loaded and filtered through the same caches as the main workbook.
+WAVES = registered_datasets(main=DATA_PATH)
+compare_waves = len(WAVES) > 1 and st.sidebar.toggle(
+    f"Compare {len(WAVES)} survey waves",
+    help="Run each section on every registered dataset and test whether the effects differ between them.")
+
+def get_waves():
+    return {name: get_filtered_dataset(filters, path) for name, path in WAVES.items()}
+
+def render_comparison(name: str, waves: dict):
+    comparisons, tables = compare_section(waves, name)
+    comparisons = dict(comparisons)
+    for block in SECTIONS[name]:
+        if isinstance(block, Text):
+            st.markdown(block.markdown)
+        elif isinstance(block, Analysis):
+            comparison = comparisons[block]
+            st.write(f"**{block.stat_label} by wave:**")
+            st.dataframe(comparison.table, hide_index=True)
+            h = comparison.heterogeneity
+            st.write(f"**Between-wave heterogeneity ({h.method}):** {h.statistic:.3f} "
+                     f"(df = {h.dof}), p = {h.p_value:.5f}, I² = {h.i2:.0%}")
+            if h.p_value < ALPHA:
+                st.warning("The effect differs significantly between the waves.")
+            else:
+                st.info("No significant difference in the effect between the waves.")
+        elif isinstance(block, Plot):
+            # One panel per wave, three to a row; every panel comes from the figure cache
+            columns = st.columns(min(len(waves), 3))
+            for i, (wave, wave_dataset) in enumerate(waves.items()):
+                with columns[i % len(columns)]:
+                    st.caption(wave)
+                    st.image(render(wave_dataset, block, theme=theme), width="stretch")
+        elif isinstance(block, Table):
+            for tab, (wave, table) in zip(st.tabs(list(tables[block])), tables[block].items()):
+                with tab:
+                    show_table(table)
+
+# ------------ Power planning ----------------#
+# Test -> (power kind, effect-size name, scale of Cohen's thresholds, groups, df)
+POWER_TESTS = {
+    "t-test (two equal groups)": ("ttest", "Cohen's d", "d", 2, 1),
+    "ANOVA (three groups)": ("anova", "eta squared", "eta2", 3, 1),
+    "Correlation": ("pearson", "r", "r", 2, 1),
+    "Chi-square, 2x2 table": ("chi2", "Cohen's w", "w", 2, 1),
+    "Chi-square, 2x3 table": ("chi2", "Cohen's w", "w", 2, 2),
+}
+
+def render_power_planner():
+    st.markdown("## Planning a Survey Wave")
+    st.write("Power of a test for a range of effect sizes and wave sizes. Every curve comes from one "
+             "vectorized call, so the sliders update right away.")
+    name = st.selectbox("Test", list(POWER_TESTS))
+    kind, effect_name, scale, groups, dof = POWER_TESTS[name]
+    small, _, large = THRESHOLDS[scale]
+    low, high = st.slider(f"Effect sizes ({effect_name})", 0.0, round(2 * large, 2), (small, large),
+                          step=0.01 if scale != "eta2" else 0.005)
+    alpha = st.select_slider("Significance level", [0.001, 0.005, 0.01, 0.05, 0.1], value=ALPHA)
+    target = st.slider("Target power", 0.5, 0.99, 0.8, 0.01)
+    max_n = st.slider("Largest wave (respondents)", 50, 5000, 1000, 50)
+    effects = np.unique(np.round(np.linspace(max(low, 0.001), max(high, 0.001), 5), 3))
+    ns = np.unique(np.linspace(groups + 2, max_n, 200).astype(int))
+    curves = power_grid(kind, effects, ns, alpha, groups, dof)
+    curves.columns = [f"{effect_name} = {effect:g}" for effect in effects]
+    st.line_chart(curves, x_label="respondents", y_label="power")
+    needed = sample_size(kind, effects, target, alpha, groups, dof)
+    st.dataframe({effect_name: effects, f"respondents for {target:.0%} power": needed}, hide_index=True)
 
 
 # ------------ Methods ----------------#
@@ -140,517 +325,33 @@ if section == "Methods":
     st.markdown("**Cleaned Dataset Preview**:")
 
     st.write(df.head())
+    st.caption(f"In memory: {dataset.memory_bytes / 1024:.0f} KB with compact column types "
+               f"({dataset.raw_bytes / 1024:.0f} KB with pandas' defaults).")
+    alpha = dataset.reliability
+    st.caption(f"Internal consistency (Cronbach's alpha): Life Satisfaction {alpha['LifeSatisf']:.2f}, "
+               f"Perceived Stress {alpha['Stress']:.2f}.")
     st.markdown("\n\n---\n\n")
 
 
 
 
-# ------------------ Company Size Analysis -------------------- #
-elif section == "Company Size & Wellbeing":
-    # Analyze company size and well-being with t-test 
-    st.markdown("# (A) Company Size & Well-Being (Stress & Life Satisfaction)")
-
-    # Separate groups for stress and life satisfaction
-    stress_small_companies = df[df['CompanySize'] == 1]['Stress']
-    stress_large_companies = df[df['CompanySize'] == 2]['Stress']
-
-    life_satisf_small_companies = df[df['CompanySize'] == 1]['LifeSatisf']
-    life_satisf_large_companies = df[df['CompanySize'] == 2]['LifeSatisf']
-
-    # Perform independent t-test for Stress
-    t_stat_stress, p_value_stress = ttest_ind(stress_small_companies, stress_large_companies, equal_var=False)
-    # Perform independent t-test for Life Satisfaction
-    t_stat_life_satisf, p_value_life_satisf = ttest_ind(life_satisf_small_companies, life_satisf_large_companies, equal_var=False)
-
-    # Display results for Stress and Life Satisfaction
-    # Stress results
-    st.write("### Stress")
-    st.write(f"**T-statistic (Stress):** {t_stat_stress:.3f}")
-    st.write(f"**P-value (Stress):** {p_value_stress:.5f}")
-    if p_value_stress < 0.05:
-        st.success("There is a statistically significant difference between small and large companies in stress.")
-    else:
-        st.info("There is no significant difference in stress between small and large companies.")
-
-    # Life Satisfaction results
-    st.write("### Life Satisfaction")
-    st.write(f"**T-statistic (Life Satisfaction):** {t_stat_life_satisf:.3f}")
-    st.write(f"**P-value (Life Satisfaction):** {p_value_life_satisf:.5f}")
-    if p_value_life_satisf < 0.05:
-        st.success("There is a statistically significant difference between small and large companies in life satisfaction.")
-    else:
-        st.info("There is no significant difference in life satisfaction between small and large companies.")
-
-    # Visualization: Boxplot for Stress
-    st.header("Boxplot Comparison (Stress)")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["CompanySize"], y=df["Stress"], ax=ax)
-    ax.set_xticklabels(["Small Companies", "Large Companies"])
-    ax.set_xlabel("Company Size")
-    ax.set_ylabel("Stress Level")
-    st.pyplot(fig)
-
-    # Visualization: Boxplot for Life Satisfaction
-    st.header("Boxplot Comparison (Life Satisfaction)")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["CompanySize"], y=df["LifeSatisf"], ax=ax)
-    ax.set_xticklabels(["Small Companies", "Large Companies"])
-    ax.set_xlabel("Company Size")
-    ax.set_ylabel("Life Satisfaction")
-    st.pyplot(fig)
-
-    # Visualization: Histogram for Stress
-    st.header("Histogram of Stress Distribution")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.histplot(stress_small_companies, color="blue", label="Small Companies", kde=True, alpha=0.6)
-    sns.histplot(stress_large_companies, color="red", label="Large Companies", kde=True, alpha=0.6)
-    ax.set_xlabel("Stress Level")
-    ax.legend()
-    st.pyplot(fig)
-
-    # Visualization: Histogram for Life Satisfaction
-    st.header("Histogram of Life Satisfaction Distribution")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.histplot(life_satisf_small_companies, color="blue", label="Small Companies", kde=True, alpha=0.6)
-    sns.histplot(life_satisf_large_companies, color="red", label="Large Companies", kde=True, alpha=0.6)
-    ax.set_xlabel("Life Satisfaction Level")
-    ax.legend()
-    st.pyplot(fig)
-
-
-# ------------------ Income Analysis -------------------- #
-elif section == "Income & Wellbeing":
-    st.markdown("# (B) Income & Wellbeing")
-
-    # Compute correlation
-    corr_coeff, p_value = pearsonr(df["Stress"], df["income1to7"])
-
-    # Display correlation results
-    st.header("Correlation Between Stress and Income")
-    st.write(f"**Pearson's Correlation Coefficient:** {corr_coeff:.3f}")
-    st.write(f"**P-value:** {p_value:.5f}")
-
-    # Interpretation
-    if p_value < 0.05:
-        st.success("There is a statistically significant correlation between stress and income.")
-    else:
-        st.info("There is no significant correlation between stress and income.")
-
-    # Scatterplot Visualization
-    st.header("Scatterplot: Stress vs. Income")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.regplot(x=df["income1to7"], y=df["Stress"], ax=ax, scatter_kws={'alpha':0.6}, line_kws={'color':'red'})
-    ax.set_xlabel("Income Level (1 = Low, 7 = High)")
-    ax.set_ylabel("Stress Level")
-    ax.set_title("Relationship Between Stress and Income")
-    st.pyplot(fig)
-
-    # Life satisfaction vs income
-
-    # Compute correlation
-    corr_coeff, p_value = pearsonr(df["LifeSatisf"], df["income1to7"])
-
-    # Display correlation results
-    st.header("Correlation Between Life Satisfaction and Income")
-    st.write(f"**Pearson's Correlation Coefficient:** {corr_coeff:.3f}")
-    st.write(f"**P-value:** {p_value:.5f}")
-
-    # Interpretation
-    if p_value < 0.05:
-        st.success("There is a statistically significant correlation between life satisfaction and income.")
-    else:
-        st.info("There is no significant correlation between life satisfaction and income.")
-
-    # Scatterplot Visualization
-    st.header("Scatterplot: Life Satisfaction vs. Income")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.regplot(x=df["income1to7"], y=df["LifeSatisf"], ax=ax, scatter_kws={'alpha':0.6}, line_kws={'color':'red'})
-    ax.set_xlabel("Income Level (1 = Low, 7 = High)")
-    ax.set_ylabel("Life Satisfaction Level")
-    ax.set_title("Relationship Between Life Satisfaction and Income")
-    st.pyplot(fig)
-
-# ------------------------- Education -------------------------------#
-elif section == "Education & Wellbeing":
-    st.markdown("## **Education Level & Well-Being (Stress & Life Satisfaction)**")
-
-    # Define education level mapping
-    education_labels = {1: "Elementary", 2: "High School", 3: "University"}
-
-    # Map numerical values to labels
-    df["Education Level"] = df["schooling1to3"].map(education_labels)
-
-    # Stress Analysis
-    st.markdown("### **(A) Stress Levels by Education Level**")
-
-    # Perform ANOVA for Stress
-    stress_groups = [df[df["schooling1to3"] == level]["Stress"] for level in [1, 2, 3]]
-    f_stat_stress, p_value_stress = f_oneway(*stress_groups)
-
-    st.write(f"**F-statistic:** {f_stat_stress:.3f}")
-    st.write(f"**P-value:** {p_value_stress:.5f}")
-
-    if p_value_stress < 0.05:
-        st.success("There is a statistically significant difference in stress levels across education levels.")
-    else:
-        st.info("There is no significant difference in stress levels across education levels.")
-
-    # Boxplot for Stress
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["Education Level"], y=df["Stress"], ax=ax)
-    ax.set_xlabel("Education Level")
-    ax.set_ylabel("Stress")
-    st.pyplot(fig)
-
-    # Life Satisfaction Analysis
-    st.markdown("### **(B) Life Satisfaction by Education Level**")
-
-    # Perform ANOVA for Life Satisfaction
-    life_satisfaction_groups = [df[df["schooling1to3"] == level]["LifeSatisf"] for level in [1, 2, 3]]
-    f_stat_ls, p_value_ls = f_oneway(*life_satisfaction_groups)
-
-    st.write(f"**F-statistic:** {f_stat_ls:.3f}")
-    st.write(f"**P-value:** {p_value_ls:.5f}")
-
-    if p_value_ls < 0.05:
-        st.success("There is a statistically significant difference in life satisfaction across education levels.")
-    else:
-        st.info("There is no significant difference in life satisfaction across education levels.")
-
-    # Boxplot for Life Satisfaction
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["Education Level"], y=df["LifeSatisf"], ax=ax)
-    ax.set_xlabel("Education Level")
-    ax.set_ylabel("Life Satisfaction")
-    st.pyplot(fig)
-
-
-    st.markdown("## **Education Level & Perceived Income**")
-
-    # Define education level mapping
-    education_labels = {1: "Elementary", 2: "High School", 3: "University"}
-
-    # Map numerical values to labels
-    df["Education Level"] = df["schooling1to3"].map(education_labels)
-
-    # ANOVA Test for Income Across Education Levels
-    st.markdown("### **Income Levels by Education Level**")
-
-    # Perform ANOVA for Perceived Income
-    income_groups = [df[df["schooling1to3"] == level]["income1to7"] for level in [1, 2, 3]]
-    f_stat_income, p_value_income = f_oneway(*income_groups)
-
-    st.write(f"**F-statistic:** {f_stat_income:.3f}")
-    st.write(f"**P-value:** {p_value_income:.5f}")
-
-    if p_value_income < 0.05:
-        st.success("There is a statistically significant difference in perceived income across education levels.")
-    else:
-        st.info("There is no significant difference in perceived income across education levels.")
-
-    # Boxplot for Income
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["Education Level"], y=df["income1to7"], ax=ax)
-    ax.set_xlabel("Education Level")
-    ax.set_ylabel("Perceived Income (1 to 7)")
-    st.pyplot(fig)
-
-# ------------------ Life Satisfaction & Stress -------------------- #
-elif section == "Life Satisfaction & Stress":
-
-    st.markdown("# Life Satisfaction & Stress")
-    # Compute correlation
-    corr_coeff, p_value = pearsonr(df["Stress"], df["LifeSatisf"])
-
-    # Display correlation results
-    st.header("Correlation Between Stress and Life Satisfaction")
-    st.write(f"**Pearson's Correlation Coefficient:** {corr_coeff:.3f}")
-    st.write(f"**P-value:** {p_value:.5f}")
-
-    # Interpretation
-    if p_value < 0.05:
-        st.success("There is a statistically significant correlation between stress and life satisfaction.")
-    else:
-        st.info("There is no significant correlation between stress and life satisfaction.")
-
-    # Scatterplot Visualization
-    st.header("Scatterplot: Stress vs. Life Satisfaction")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.regplot(x=df["Stress"], y=df["LifeSatisf"], ax=ax, scatter_kws={'alpha':0.6}, line_kws={'color':'red'})
-    ax.set_xlabel("Stress Level")
-    ax.set_ylabel("Life Satisfaction Level")
-    ax.set_title("Relationship Between Stress and Life Satisfaction")
-    st.pyplot(fig)
-
-# ------------------ Employment Type Analysis -------------------- #
-elif section == "Employment Type Analysis":
-    # Employment type vs Stress
-    st.markdown("# (C) Employment Type Analysis - Stress Levels")
-
-    # Split into two groups
-    employees = df[df["JobPositionEmployeeManager"] == 1]["Stress"]
-    managers = df[df["JobPositionEmployeeManager"] == 2]["Stress"]
-
-    # Perform t-test
-    t_stat, p_value = ttest_ind(employees, managers, equal_var=False)
-
-    # Display t-test results
-    st.header("Stress Levels Between Employees and Managers")
-    st.write(f"**T-test Statistic:** {t_stat:.3f}")
-    st.write(f"**P-value:** {p_value:.5f}")
-
-    # Interpretation
-    if p_value < 0.05:
-        st.success("There is a statistically significant difference in stress levels between employees and managers.")
-    else:
-        st.info("There is no significant difference in stress levels between employees and managers.")
-
-    # Boxplot Visualization
-    st.header("Boxplot: Stress Levels of Employees vs. Managers")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["JobPositionEmployeeManager"], y=df["Stress"], ax=ax, palette=["blue", "orange"])
-    ax.set_xticklabels(["Employee", "Manager"])
-    ax.set_xlabel("Job Position")
-    ax.set_ylabel("Stress Level")
-    ax.set_title("Comparison of Stress Levels Between Employees and Managers")
-    st.pyplot(fig)
-
-    # Employment type vs Life Satisfaction
-
-    st.markdown("### Employment Type Analysis - Life Satisfaction")
-
-    # Split into two groups
-    employees_ls = df[df["JobPositionEmployeeManager"] == 1]["LifeSatisf"]
-    managers_ls = df[df["JobPositionEmployeeManager"] == 2]["LifeSatisf"]
-
-    # Perform t-test
-    t_stat_ls, p_value_ls = ttest_ind(employees_ls, managers_ls, equal_var=False)
-
-    # Display t-test results
-    st.header("Life Satisfaction Between Employees and Managers")
-    st.write(f"**T-test Statistic:** {t_stat_ls:.3f}")
-    st.write(f"**P-value:** {p_value_ls:.5f}")
-
-    # Interpretation
-    if p_value_ls < 0.05:
-        st.success("There is a statistically significant difference in life satisfaction between employees and managers.")
-    else:
-        st.info("There is no significant difference in life satisfaction between employees and managers.")
-
-    # Boxplot Visualization
-    st.header("Boxplot: Life Satisfaction of Employees vs. Managers")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["JobPositionEmployeeManager"], y=df["LifeSatisf"], ax=ax, palette=["blue", "orange"])
-    ax.set_xticklabels(["Employee", "Manager"])
-    ax.set_xlabel("Job Position")
-    ax.set_ylabel("Life Satisfaction Score")
-    ax.set_title("Comparison of Life Satisfaction Between Employees and Managers")
-    st.pyplot(fig)
-
-
-
-# ------------------ Perceived Health vs. Stress levels -------------------- #
-elif section == "Perceived Health & Stress":
-    # Perceived Health vs Stress
-    st.markdown("# (D) Perceived Health - Stress Levels")
-
-
-
-    # Calculate Pearson correlation
-    correlation, p_value = pearsonr(df["Stress"], df["perceivedhealth1to7"])
-
-    # Display correlation result
-    st.header("Relationship Between Stress and Perceived Health")
-    st.write(f"**Pearson Correlation Coefficient:** {correlation:.3f}")
-    st.write(f"**P-value:** {p_value:.5f}")
-
-    # Interpretation
-    if p_value < 0.05:
-        st.success("There is a statistically significant relationship between stress levels and perceived health.")
-    else:
-        st.info("There is no significant correlation between stress levels and perceived health.")
-
-    # Scatterplot Visualization
-    st.header("Scatterplot: Stress vs. Perceived Health")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.scatterplot(x=df["perceivedhealth1to7"], y=df["Stress"], ax=ax, alpha=0.6, color="purple")
-    ax.set_xlabel("Perceived Health (1 = Least Healthy, 7 = Most Healthy)")
-    ax.set_ylabel("Stress Score")
-    ax.set_title("Scatterplot of Stress vs. Perceived Health")
-    st.pyplot(fig)
-
-    # Boxplot Visualization
-    st.header("Boxplot: Stress Across Perceived Health Levels")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["perceivedhealth1to7"], y=df["Stress"], ax=ax, palette="coolwarm")
-    ax.set_xlabel("Perceived Health (1 = Least Healthy, 7 = Most Healthy)")
-    ax.set_ylabel("Stress Score")
-    ax.set_title("Comparison of Stress Across Different Perceived Health Levels")
-    st.pyplot(fig)
-
-
-
-    # Perceived Health Vs. Life Satisfaction
-
-    # Calculate Pearson correlation
-    correlation_health_ls, p_value_health_ls = pearsonr(df["LifeSatisf"], df["perceivedhealth1to7"])
-
-    # Display correlation result
-    st.header("Relationship Between Life Satisfaction and Perceived Health")
-    st.write(f"**Pearson Correlation Coefficient:** {correlation_health_ls:.3f}")
-    st.write(f"**P-value:** {p_value_health_ls:.5f}")
-
-    # Interpretation
-    if p_value_health_ls < 0.05:
-        st.success("There is a statistically significant relationship between life satisfaction and perceived health.")
-    else:
-        st.info("There is no significant correlation between life satisfaction and perceived health.")
-
-    # Scatterplot Visualization
-    st.header("Scatterplot: Life Satisfaction vs. Perceived Health")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.scatterplot(x=df["perceivedhealth1to7"], y=df["LifeSatisf"], ax=ax, alpha=0.6, color="teal")
-    ax.set_xlabel("Perceived Health (1 = Least Healthy, 7 = Most Healthy)")
-    ax.set_ylabel("Life Satisfaction Score")
-    ax.set_title("Scatterplot of Life Satisfaction vs. Perceived Health")
-    st.pyplot(fig)
-
-    # Boxplot Visualization
-    st.header("Boxplot: Life Satisfaction Across Perceived Health Levels")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["perceivedhealth1to7"], y=df["LifeSatisf"], ax=ax, palette="viridis")
-    ax.set_xlabel("Perceived Health (1 = Least Healthy, 7 = Most Healthy)")
-    ax.set_ylabel("Life Satisfaction Score")
-    ax.set_title("Comparison of Life Satisfaction Across Different Perceived Health Levels")
-    st.pyplot(fig)
-
-# ------------------ Exercise Habits vs. Stress levels -------------------- #
-elif section == "Exercise Habits & Stress":
-    # Exercise Habits vs Stress
-    st.markdown("# (E) Exercise Habits - Stress Levels")
-
-    # Boxplot/Violin plot
-    st.header("Stress Across Exercise Habits")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["LeisureCompOrNoSport"], y=df["Stress"], ax=ax, palette="muted")
-    ax.set_xlabel("Exercise Habits (1=Leisure, 2=Competitive, 3=No Sport)")
-    ax.set_ylabel("Stress Level")
-    ax.set_title("Comparison of Stress Across Exercise Habits")
-    st.pyplot(fig)
-
-    # ANOVA to test for significant difference
-    leisure = df[df["LeisureCompOrNoSport"] == 1]["Stress"]
-    competitive = df[df["LeisureCompOrNoSport"] == 2]["Stress"]
-    no_sport = df[df["LeisureCompOrNoSport"] == 3]["Stress"]
-
-    f_statistic, p_value = f_oneway(leisure, competitive, no_sport)
-
-    # Display result
-    st.write(f"**F-statistic:** {f_statistic:.3f}")
-    st.write(f"**P-value:** {p_value:.5f}")
-
-    # Interpretation of ANOVA results
-    if p_value < 0.05:
-        st.success("There is a significant difference in stress levels based on exercise habits.")
-    else:
-        st.info("There is no significant difference in stress levels based on exercise habits.")
-
-
-    # exercise Habits vs. Life Satisfaction
-
-    # Boxplot/Violin plot to compare life satisfaction across exercise habits
-    st.header("Life Satisfaction Across Exercise Habits")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.boxplot(x=df["LeisureCompOrNoSport"], y=df["LifeSatisf"], ax=ax, palette="muted")
-    ax.set_xlabel("Exercise Habits (1=Leisure, 2=Competitive, 3=No Sport)")
-    ax.set_ylabel("Life Satisfaction Score")
-    ax.set_title("Comparison of Life Satisfaction Across Exercise Habits")
-    st.pyplot(fig)
-
-    # ANOVA to test for significant difference in life satisfaction
-    leisure = df[df["LeisureCompOrNoSport"] == 1]["LifeSatisf"]
-    competitive = df[df["LeisureCompOrNoSport"] == 2]["LifeSatisf"]
-    no_sport = df[df["LeisureCompOrNoSport"] == 3]["LifeSatisf"]
-
-    f_statistic, p_value = f_oneway(leisure, competitive, no_sport)
-
-    # Display result
-    st.write(f"**F-statistic:** {f_statistic:.3f}")
-    st.write(f"**P-value:** {p_value:.5f}")
-
-    # Interpretation of ANOVA results
-    if p_value < 0.05:
-        st.success("There is a significant difference in life satisfaction based on exercise habits.")
-    else:
-        st.info("There is no significant difference in life satisfaction based on exercise habits.")
-
-# ------------------ Childhood Sports vs Current Exercise -------------------- #
-elif section == "Current Exercise Habits vs Childhood Sports History":
-    # Bar plot to compare current exercise habits based on childhood sports history
-    st.header("Current Exercise Habits vs Childhood Sports History")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.countplot(data=df, x="LeisureCompOrNoSport", hue="Childhood7to16SportsYesNo", ax=ax, palette="muted")
-    ax.set_xlabel("Current Exercise Habits (1=Leisure, 2=Competitive, 3=No Sport)")
-    ax.set_ylabel("Count")
-    ax.set_title("Comparison of Current Exercise Habits by Childhood Sports History")
-    st.pyplot(fig)
-
-    # Chi-Square Test to see if childhood sports history and current exercise habits are related
-    contingency_table = pd.crosstab(df['Childhood7to16SportsYesNo'], df['LeisureCompOrNoSport'])
-
-    # Perform the Chi-Square test
-    chi2_stat, p_value, dof, expected = chi2_contingency(contingency_table)
-
-    # Display result
-    st.write(f"**Chi-Square Statistic:** {chi2_stat:.3f}")
-    st.write(f"**P-value:** {p_value:.5f}")
-
-    # Interpretation of results
-    if p_value < 0.05:
-        st.success("There is a significant association between childhood sports history and current exercise habits.")
-    else:
-        st.info("There is no significant association between childhood sports history and current exercise habits.")
+# ------------------ Analysis sections -------------------- #
+# The statistical sections are declared in worklife/analyses.py and rendered
+# block by block; every test result comes from the shared, memoized engine.
+elif section in SECTIONS:
+    with recorder.span("section", section):
+        if compare_waves:
+            render_comparison(section, get_waves())
+        else:
+            render_section(section)
+        if section == "Effect Sizes & Power":
+            render_power_planner()
 
 # ------------------- Discussion ------------------#
 elif section == "Discussion":
-    st.markdown("""
-    # **Summary and Discussion of Findings**  
-
-    This study explored various factors influencing stress and life satisfaction, including company size, income, employment type, perceived health, and exercise habits. The analysis yielded several key insights regarding workplace environments, financial well-being, and lifestyle factors.  
-
-    ## **Workplace Environment and Well-Being**  
-    - There was **no significant difference** in **stress levels** or **life satisfaction** between employees in **small and large companies**. This suggests that company size alone may not be a determining factor in workplace stress or overall satisfaction. Other factors, such as workplace culture and work-life balance, might have a greater impact.  
-    - However, a **significant difference** was found between **employees and managers**:  
-    - **Managers reported higher stress levels** than employees, likely due to increased responsibilities.  
-    - **Managers also reported higher life satisfaction**, which may be linked to job autonomy, financial benefits, or career fulfillment.  
-
-    ## **Financial Factors and Well-Being**  
-    - **Income was significantly correlated** with both stress and life satisfaction:  
-    - Higher **income** was associated with **lower stress levels** (*r = -0.182, p < 0.001*).  
-    - Higher **income** was associated with **greater life satisfaction** (*r = 0.209, p < 0.001*).  
-    - While income plays a role, the relatively low correlation values suggest that other factors, such as job satisfaction and personal values, contribute to stress and life satisfaction as well.  
-
-    ## **Interplay Between Stress and Life Satisfaction**  
-    - A **strong negative correlation** was observed between **stress and life satisfaction** (*r = -0.474, p < 0.001*), indicating that individuals experiencing higher stress levels tend to report lower life satisfaction.  
-    - This result highlights the importance of **stress management** in improving overall well-being.  
-
-    ## **Health and Lifestyle Factors**  
-    - **Perceived Health**:  
-    - Individuals who reported **better perceived health** had **lower stress levels** (*r = -0.167, p < 0.001*) and **higher life satisfaction** (*r = 0.224, p < 0.001*).  
-    - This reinforces the well-documented relationship between physical and mental/emotional well-being.  
-    - **Exercise Habits**:  
-    - There were **significant differences** in both **stress levels** (*F = 7.648, p < 0.001*) and **life satisfaction** (*F = 11.926, p < 0.001*) based on **exercise habits**.  
-    - This suggests that **regular physical activity** is associated with **lower stress and greater life satisfaction**.  
-    - **Childhood Sports Participation**:  
-    - A **significant association** was found between **childhood sports participation and current exercise habits** (*χ² = 26.329, p < 0.001*).  
-    - This indicates that early exposure to physical activity may influence **long-term health behaviors**.  
-
-    ## **Conclusion**  
-    These findings emphasize the **multifaceted nature of well-being**, highlighting the complex interactions between **workplace dynamics, financial stability, health, and lifestyle habits**.  
-
-    - While **income and job role** influence **stress and satisfaction**, **personal health perceptions and exercise habits** also play a crucial role.  
-    - The results suggest that **organizations and individuals** may benefit from **policies and behaviors that promote financial security and physical well-being** to enhance overall quality of life.  
-    """)
+    # Written from the results of the sections above, so it follows the data and the filters
+    with recorder.span("section", section):
+        st.markdown(discussion(dataset))
 
 
 
@@ -704,4 +405,58 @@ Gather data on:
 - **Regression analysis** can be performed if further predictive insights are needed based on the research question.  
 
 These steps will ensure a structured and reproducible approach to studying workplace well-being, financial factors, and health-related behaviors.  
-""")
\ No newline at end of file
+""")
+
+
+
+# ------------------ Header animation -------------------- #
+animation = load_lottie()
+if animation is not None:
+    from streamlit_lottie import st_lottie  # only needed once there is something to show
+
+    with header:
+        st_lottie(animation, speed=1, width=600, height=400, key="lottie1")
+
+
+# ------------------ Warm the other sections -------------------- #
+# The selected section is done; compute the others in the background so
+# switching sections finds their results and figures ready.
+@st.cache_resource
+def _prefetch_executor():
+    return make_executor()  # one bounded pool per server process
+
+if "prefetcher" not in st.session_state:
+    st.session_state.prefetcher = Prefetcher(_prefetch_executor())
+st.session_state.prefetcher.warm(dataset, [name for name in SECTIONS if name != section], theme)
+
+
+# ------------------ Developer panel -------------------- #
+# Shown with ?dev=1 in the URL or WORKLIFE_DEV=1; timings are process-wide.
+# Anyone can add ?dev=1, so the controls that affect every session (recording,
+# memory tracing, reset) need WORKLIFE_DEV=1 on the server.
+developer = os.environ.get("WORKLIFE_DEV") == "1"
+if developer or st.query_params.get("dev") == "1":
+    with st.sidebar.expander("Developer: performance"):
+        if developer:
+            trace_memory = st.checkbox("Trace memory (slower)", value=recorder.trace_memory)
+            if st.toggle("Record timings", value=recorder.enabled):
+                if not recorder.enabled or recorder.trace_memory != trace_memory:
+                    recorder.disable()
+                    recorder.enable(trace_memory)
+            elif recorder.enabled:
+                recorder.disable()
+        else:
+            st.caption("Recording " + ("is on." if recorder.enabled else "is off; set WORKLIFE_DEV=1 "
+                                       "or WORKLIFE_PROFILE=1 on the server to control it."))
+        spans = recorder.snapshot()
+        if spans:
+            st.dataframe(spans, hide_index=True)
+        else:
+            st.caption("Nothing recorded yet; computations cached before recording started don't show up.")
+        if shared_results is not None:
+            st.caption(f"Shared results store: {shared_results.hits:,} results read, "
+                       f"{shared_results.misses:,} computed by this process")
+        st.download_button("Export JSON", recorder.to_json(), "worklife-timings.json", "application/json")
+        st.download_button("Export Prometheus", recorder.to_prometheus(), "worklife-timings.prom", "text/plain")
+        if developer and st.button("Reset"):
+            recorder.reset()
@@ -0,0 +1,32 @@
+import os
+
+# Results must be computed by the code under test, never read back from a store
+os.environ["WORKLIFE_RESULTS_STORE"] = "off"
+
+from pathlib import Path  # noqa: E402
+
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+
+from worklife.data import DATA_PATH, load_survey  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def raw_survey():
+    """The published workbook as read from disk, before any typing."""
+    return pd.read_excel(DATA_PATH)
+
+
+@pytest.fixture(scope="session")
+def survey(tmp_path_factory):
+    """The published workbook, loaded through an empty cache directory."""
+    return load_survey(DATA_PATH, cache_dir=tmp_path_factory.mktemp("cache"))
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    def write(frame, name="survey.csv"):
+        path = Path(tmp_path) / name
+        frame.to_csv(path, index=False)
+        return path
+    return write
@@ -0,0 +1,50 @@
+import json
+import threading
+import time
+
+from worklife import animation
+from worklife.animation import LOTTIE_PATH, Download, read_animation
+
+
+def test_the_animation_ships_with_the_app():
+    document = read_animation(LOTTIE_PATH)
+    assert document["layers"]
+    assert read_animation(LOTTIE_PATH.with_name("missing.json")) is None
+
+
+def test_download_runs_in_the_background(monkeypatch):
+    release = threading.Event()
+
+    def urlopen(url, timeout):
+        release.wait(5)  # a host that takes its time to resolve
+        raise OSError("unreachable")
+
+    monkeypatch.setattr(animation.urllib.request, "urlopen", urlopen)
+    download = Download("https://example.invalid/header.json")
+    start = time.monotonic()
+    assert download.result() is None
+    assert time.monotonic() - start < 1
+    release.set()
+    assert download.wait(5) is None
+
+
+def test_failed_downloads_are_retried(tmp_path):
+    path = tmp_path / "header.json"
+    download = Download(path.as_uri(), retry_seconds=0)
+    download.result()
+    assert download.wait(5) is None
+
+    path.write_text(json.dumps({"layers": [1]}))
+    download.result()
+    assert download.wait(5) == {"layers": [1]}
+    assert download.result() == {"layers": [1]}
+
+
+def test_failed_downloads_wait_before_the_next_attempt(tmp_path):
+    path = tmp_path / "header.json"
+    download = Download(path.as_uri(), retry_seconds=3600)
+    download.result()
+    download.wait(5)
+    path.write_text(json.dumps({"layers": [1]}))
+    assert download.result() is None
+    assert download.wait(5) is None
@@ -0,0 +1,19 @@
+from worklife.data import _cache_root, load_survey
+
+
+def test_load_removes_files_of_older_cache_formats(raw_survey, write_csv, tmp_path):
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    legacy = [cache / name for name in ("survey-0123456789.parquet", "survey-0123456789.feather",
+                                        "survey-0123456789.json", "gone-abcdef0123.feather")]
+    kept = [cache / name for name in ("results.sqlite", "notes.json")]
+    for file in legacy + kept:
+        file.write_bytes(b"old")
+
+    path = write_csv(raw_survey.head(50)).resolve()
+    dataset = load_survey(path, cache_dir=cache)
+
+    assert len(dataset.frame) == 50
+    assert not any(file.exists() for file in legacy)
+    assert all(file.exists() for file in kept)
+    assert _cache_root(path, cache).is_dir()
@@ -0,0 +1,42 @@
+from worklife import engine as engine_module
+from worklife.analyses import SECTIONS, Table, analyses
+from worklife.bitmaps import filter_dataset
+from worklife.engine import StatsEngine
+
+
+def test_memo_keeps_the_most_recently_used_datasets(survey):
+    stats = StatsEngine(max_datasets=2)
+    analysis = next(a for a in analyses() if a.kind == "ttest")
+    subsets = [filter_dataset(survey, {"schooling1to3": [level]}) for level in (1, 2, 3)]
+
+    first = stats.run(subsets[0], analysis)
+    stats.run(subsets[1], analysis)
+    assert stats.run(subsets[0], analysis) is first      # a hit, and now the most recent
+    stats.run(subsets[2], analysis)                       # pushes out subsets[1]
+
+    assert stats.cached(subsets[0], analysis) is first
+    assert stats.cached(subsets[1], analysis) is None
+    assert stats.cached(subsets[2], analysis) is not None
+    assert len(stats._results) == 2
+
+
+def test_forget(survey):
+    stats = StatsEngine()
+    analysis = next(a for a in analyses() if a.kind == "pearson")
+    stats.run(survey, analysis)
+    stats.forget(survey.fingerprint)
+    assert stats.cached(survey, analysis) is None
+
+
+def test_effect_table_reuses_the_test_results(survey, monkeypatch):
+    stats = StatsEngine()
+    for analysis in analyses():
+        stats.run(survey, analysis)
+    calls = []
+    for kind, test in list(engine_module.TESTS.items()):
+        monkeypatch.setitem(engine_module.TESTS, kind, lambda *args, test=test: calls.append(args) or test(*args))
+
+    block = next(b for b in SECTIONS["Effect Sizes & Power"] if isinstance(b, Table))
+    table = stats.table(survey, block)
+    assert calls == []
+    assert set(table["outcome"]) == {analysis.outcome for analysis in analyses()}
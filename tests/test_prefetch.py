@@ -0,0 +1,55 @@
+import logging
+import threading
+from types import SimpleNamespace
+
+from worklife import prefetch
+from worklife.prefetch import Prefetcher, make_executor
+
+
+def test_finished_sections_can_be_warmed_again(monkeypatch):
+    calls = []
+    monkeypatch.setattr(prefetch, "warm_section", lambda dataset, section, *args: calls.append(section))
+    executor = make_executor()
+    prefetcher = Prefetcher(executor)
+    dataset = SimpleNamespace(fingerprint="a")
+
+    prefetcher.warm(dataset, ["One", "Two"])
+    executor.shutdown(wait=True)
+    assert prefetcher.pending() == 0
+
+    prefetcher._executor = executor = make_executor()
+    prefetcher.warm(dataset, ["One"])
+    executor.shutdown(wait=True)
+    assert sorted(calls) == ["One", "One", "Two"]
+
+
+def test_queued_sections_are_not_submitted_twice(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def warm_section(dataset, section, *args):
+        calls.append(section)
+        release.wait(5)
+
+    monkeypatch.setattr(prefetch, "warm_section", warm_section)
+    executor = make_executor()
+    prefetcher = Prefetcher(executor)
+    dataset = SimpleNamespace(fingerprint="a")
+    prefetcher.warm(dataset, ["One"])
+    prefetcher.warm(dataset, ["One"])
+    release.set()
+    executor.shutdown(wait=True)
+    assert calls == ["One"]
+
+
+def test_failures_are_logged(monkeypatch, caplog):
+    def warm_section(dataset, section, *args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(prefetch, "warm_section", warm_section)
+    executor = make_executor()
+    with caplog.at_level(logging.ERROR, logger="worklife.prefetch"):
+        Prefetcher(executor).warm(SimpleNamespace(fingerprint="a"), ["One"])
+        executor.shutdown(wait=True)
+    assert "Warming 'One' failed" in caplog.text
+    assert "boom" in caplog.text
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from worklife.analyses import SECTIONS, Table
+from worklife.bitmaps import filter_dataset
+from worklife.engine import StatsEngine
+from worklife.regression import build_design, logistic, model_comparison, ols
+
+MODELS = [block for block in SECTIONS["Regression Models"] if isinstance(block, Table)]
+
+
+def test_models_of_the_whole_survey(survey):
+    stats = StatsEngine()
+    for block in MODELS:
+        table = stats.table(survey, block)
+        assert not table.empty, block
+        assert np.isfinite(table.select_dtypes("number").to_numpy(float)).all(), block
+
+
+@pytest.mark.parametrize("filters", [
+    {"JobPositionEmployeeManager": [2], "HUorEUorNONEuCo": [3]},
+    {"CompanySize4cat": [1], "GovOrPrivateCo": [1], "JobPositionEmployeeManager": [2]},
+    {"LeisureCompOrNoSport": [3]},
+])
+def test_filters_that_leave_no_model_to_fit(survey, filters):
+    subset = filter_dataset(survey, filters)
+    stats = StatsEngine()
+    for block in MODELS:
+        table = stats.table(subset, block)   # must not raise
+        numbers = table.select_dtypes("number").to_numpy(float)
+        assert table.empty or np.isfinite(numbers).all(), block
+
+
+def test_rank_deficient_design():
+    frame = pd.DataFrame({"y": np.arange(20.0) % 7, "a": np.arange(20.0), "b": 2 * np.arange(20.0) + 1})
+    design = build_design(frame, "y", ["a", "b"])
+    assert not design.full_rank and not design.fittable
+    assert ols(design).empty and model_comparison(design).empty and logistic(design, [1]).empty
+
+
+def test_constant_outcome():
+    frame = pd.DataFrame({"y": np.full(20, 3.0), "a": np.arange(20.0)})
+    design = build_design(frame, "y", ["a"])
+    assert design.full_rank and not design.fittable
+    assert ols(design).empty and logistic(design, [3]).empty
+
+
+def test_separated_outcome_has_no_estimates():
+    frame = pd.DataFrame({"y": (np.arange(20) >= 10).astype(float), "a": np.arange(20.0)})
+    assert logistic(build_design(frame, "y", ["a"]), [1]).empty
@@ -0,0 +1,34 @@
+from worklife import report
+from worklife.analyses import SECTIONS
+
+
+class FreshWorkerPerTask:
+    """Stands in for the process pool: every task starts without cached datasets."""
+
+    def __init__(self, max_workers):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, function, *arguments):
+        for task in zip(*arguments):
+            report._datasets.clear()
+            yield function(*task)
+
+
+def test_streamed_workbooks_are_read_once(raw_survey, write_csv, monkeypatch):
+    reads = []
+    summarize = report.summarize_survey
+    monkeypatch.setattr(report, "summarize_survey", lambda path: reads.append(path) or summarize(path))
+    monkeypatch.setattr(report, "ProcessPoolExecutor", FreshWorkerPerTask)
+    paths = [write_csv(raw_survey.head(200), "a.csv"), write_csv(raw_survey.tail(200), "b.csv")]
+
+    by_path = report.run_reports(paths, jobs=4, stream=True)
+
+    assert len(reads) == 2
+    assert [[result["section"] for result in results] for results in by_path.values()] == [list(SECTIONS)] * 2
+    assert all(result["rows"] == 200 for results in by_path.values() for result in results)
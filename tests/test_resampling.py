@@ -0,0 +1,46 @@
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from worklife.analyses import analyses
+from worklife.data import Dataset
+from worklife import resampling
+from worklife.resampling import CELL_BUDGET, _block_size, resample
+
+
+@pytest.fixture(scope="module")
+def cohort(survey):
+    """The workbook repeated to about 22,000 respondents."""
+    return Dataset(pd.concat([survey.frame] * 40, ignore_index=True), "repeated")
+
+
+def test_blocks_stay_within_the_cell_budget():
+    for n in (10, 549, 50_000, 1_000_000, 50_000_000):
+        assert 1 <= _block_size(n)
+        assert _block_size(n) * n <= max(CELL_BUDGET, n)
+
+
+@pytest.mark.parametrize("kind", ["ttest", "pearson"])
+def test_peak_memory_does_not_grow_with_the_cohort(cohort, kind):
+    analysis = next(a for a in analyses() if a.kind == kind)
+    tracemalloc.start()
+    try:
+        resample(cohort, analysis, n_resamples=500, parallel=False)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # A block of 500 resamples of every respondent would take about 500 MB
+    assert peak < 200 * 2 ** 20
+
+
+def test_parallel_blocks_give_the_serial_result(cohort):
+    analysis = next(a for a in analyses() if a.kind == "ttest")
+    serial = resample(cohort, analysis, 300, parallel=False)
+    assert resample(cohort, analysis, 300, parallel=True) == serial
+    assert resampling._pool._mp_context.get_start_method() == "spawn"
+
+    resampling.shutdown()
+    assert resampling._pool is None
+    assert resample(cohort, analysis, 300, parallel=True) == serial
+    resampling.shutdown()
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from worklife.schema import apply_schema
+
+
+def test_integer_scores_are_narrowed():
+    frame = apply_schema(pd.DataFrame({"pss1": [1.0, 2.0, 4.0], "pss2": [1.0, np.nan, 3.0]}))
+
+    assert frame["pss1"].dtype == "int8"
+    assert frame["pss1"].tolist() == [1, 2, 4]
+    assert frame["pss2"].dtype == "Int8"
+    assert frame["pss2"].isna().tolist() == [False, True, False]
+
+
+@pytest.mark.parametrize("values", [[1.0, 2.5, 3.0], [1.0, np.nan, 2.5]])
+def test_fractional_scores_are_an_error(values):
+    with pytest.raises(ValueError, match="'pss3'.*2.5"):
+        apply_schema(pd.DataFrame({"pss3": values}))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from worklife.schema import LS_ITEMS, PSS_ITEMS
+from worklife.scoring import PSS, Scale, add_missing_scores, score_scales
+
+REVERSED = ["pss4", "pss5", "pss6", "pss7", "pss9", "pss10", "pss13"]
+
+
+def test_reverse_keyed_stress_items():
+    assert list(PSS.reverse) == REVERSED
+    frame = pd.DataFrame([[1] * 14, [4] * 14], columns=PSS_ITEMS)
+    result = score_scales(frame, [PSS])
+
+    for item in PSS_ITEMS:
+        expected = [3, 0] if item in REVERSED else [1, 4]
+        assert result.recoded[item].tolist() == expected, item
+    # 7 items as answered plus 7 reversed ones (x -> 4 - x)
+    assert result.scores["Stress"].tolist() == [7 * 1 + 7 * 3, 7 * 4 + 7 * 0]
+
+
+def test_prorated_totals_need_80_percent_of_the_items():
+    # PSS: 0.8 * 14 = 11.2, so 12 answers are enough and 11 are not;
+    # SWL: 0.8 * 5 = 4 answers are exactly enough and 3 are not
+    frame = pd.DataFrame(2.0, index=range(4), columns=PSS_ITEMS + LS_ITEMS)
+    frame.loc[0, PSS_ITEMS[:2]] = np.nan
+    frame.loc[1, PSS_ITEMS[:3]] = np.nan
+    frame.loc[2, LS_ITEMS[:1]] = np.nan
+    frame.loc[3, LS_ITEMS[:2]] = np.nan
+    result = score_scales(frame)
+
+    assert result.answered["Stress"].tolist() == [12, 11, 14, 14]
+    assert result.answered["LifeSatisf"].tolist() == [5, 5, 4, 3]
+    stress, satisfaction = result.scores["Stress"], result.scores["LifeSatisf"]
+    # Every answer (and every reversed answer, 4 - 2) is 2: pro-rated totals are 2 * k
+    assert stress[0] == pytest.approx(28.0)
+    assert np.isnan(stress[1])
+    assert satisfaction[2] == pytest.approx(10.0)
+    assert np.isnan(satisfaction[3])
+
+
+def test_cronbach_alpha():
+    scale = Scale("Total", ("a", "b", "c"), 1, 5)
+    frame = pd.DataFrame({"a": [1, 2, 3, 4], "b": [2, 2, 4, 4], "c": [1, 3, 3, 5]})
+    # Item variances 5/3 + 4/3 + 8/3 = 17/3, total variance 15:
+    # alpha = 3/2 * (1 - (17/3) / 15) = 14/15
+    assert score_scales(frame, [scale]).alpha["Total"] == pytest.approx(14 / 15)
+
+
+def test_cleaned_workbook_keeps_its_stored_scores(raw_survey):
+    items = raw_survey[PSS_ITEMS + LS_ITEMS]
+    assert not items.isna().any().any()
+    assert (items[LS_ITEMS].sum(axis=1) == raw_survey["LifeSatisf"]).all()
+    # The stored Stress is not the plain item sum on every row, so it is not recomputed
+    assert (items[PSS_ITEMS].sum(axis=1) == raw_survey["Stress"]).sum() == 476
+    assert len(raw_survey) == 549
+    assert add_missing_scores(raw_survey) is raw_survey
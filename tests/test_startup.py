@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# What streamlit_app.py imports from the package
+APP_MODULES = ("worklife.analyses", "worklife.animation", "worklife.bitmaps", "worklife.data", "worklife.discussion",
+               "worklife.effects", "worklife.engine", "worklife.figures", "worklife.instrumentation",
+               "worklife.prefetch", "worklife.resampling", "worklife.schema", "worklife.store",
+               "worklife.waves")
+
+HEAVY = ("matplotlib", "seaborn", "scipy.stats", "streamlit_lottie")
+
+
+def _python(code, **env):
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          env=dict(os.environ, WORKLIFE_RESULTS_STORE="off", **env), timeout=300)
+
+
+def test_app_modules_leave_the_heavy_imports_for_later():
+    done = _python(f"import sys\nimport {', '.join(APP_MODULES)}\n"
+                   f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))")
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.strip() == ""
+
+
+def test_first_page_without_network_access():
+    # The animation is read from disk; the download it falls back to is
+    # configured but must not be needed, nor hold up the page
+    code = """
+import os, socket, sys
+
+attempts = []
+
+def refuse(*args, **kwargs):
+    attempts.append(args)
+    raise OSError("network access disabled")
+
+socket.socket.connect = refuse
+socket.create_connection = refuse
+socket.getaddrinfo = refuse
+
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("streamlit_app.py", default_timeout=120).run()
+if app.exception:
+    sys.exit(app.exception[0].message)
+print(app.markdown[0].value.splitlines()[0])
+print("network attempts:", len(attempts))
+sys.stdout.flush()
+os._exit(0)  # don't wait for the sections warmed in the background
+"""
+    done = _python(code, WORKLIFE_LOTTIE_URL="https://lottie.invalid/header.json")
+    assert done.returncode == 0, done.stderr[-2000:]
+    assert "Work, Stress and Life Satisfaction Study" in done.stdout
+    assert "network attempts: 0" in done.stdout
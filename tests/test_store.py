@@ -0,0 +1,70 @@
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from worklife import store
+from worklife.store import SharedResults
+
+pytestmark = pytest.mark.skipif(store.fcntl is None, reason="no cross-process locking here")
+
+# Tries the lock of byte range 0 of a lock file from another process
+OTHER_PROCESS = """
+import fcntl, sys
+with open(sys.argv[1], "a+b") as handle:
+    try:
+        fcntl.lockf(handle, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, 0)
+    except OSError:
+        print("busy")
+    else:
+        print("free")
+"""
+
+
+@pytest.fixture
+def results(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "LOCK_SLOTS", 1)  # every key shares byte range 0
+    return SharedResults(tmp_path / "results.sqlite", version="test")
+
+
+def _other_process(results):
+    done = subprocess.run([sys.executable, "-c", OTHER_PROCESS, str(results.path.with_suffix(".lock"))],
+                          capture_output=True, text=True, timeout=60)
+    return done.stdout.strip()
+
+
+def test_threads_sharing_a_lock_range_take_turns(results):
+    entered, release, order = threading.Event(), threading.Event(), []
+
+    def first():
+        with results.locked("a"):
+            order.append("a in")
+            entered.set()
+            release.wait(5)
+            order.append("a out")
+
+    def second():
+        entered.wait(5)
+        with results.locked("b"):
+            order.append("b in")
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for thread in threads:
+        thread.start()
+    entered.wait(5)
+    threads[1].join(0.3)
+    assert order == ["a in"]  # "b" waits, rather than sharing the process's lock
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert order == ["a in", "a out", "b in"]
+    assert results._slots == {}
+
+
+def test_nested_keys_of_one_range_keep_the_process_lock(results):
+    with results.locked("outer"):
+        with results.locked("inner"):
+            pass
+        assert _other_process(results) == "busy"
+    assert _other_process(results) == "free"
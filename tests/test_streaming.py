@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from worklife.associations import screen_associations
+from worklife.schema import CATEGORICAL_COLUMNS
+from worklife.streaming import CrosstabAccumulator, summarize_survey
+
+
+def test_merge_of_tables_with_different_levels():
+    accumulator = CrosstabAccumulator(["a", "b"])
+    accumulator.merge("a", "b", pd.DataFrame([[1, 2]], index=[1], columns=[1, 2]))
+    # Row level 9 only here, column level 1 only in the first table
+    accumulator.merge("a", "b", pd.DataFrame([[3], [4]], index=[1, 9], columns=[2]))
+    table = accumulator.crosstab("a", "b")
+    expected = pd.DataFrame([[1, 5], [0, 4]], index=[1, 9], columns=[1, 2])
+    pd.testing.assert_frame_equal(table, expected, check_dtype=False)
+    assert table.to_numpy().dtype == np.int64
+    pd.testing.assert_frame_equal(accumulator.crosstab("b", "a"), expected.T, check_dtype=False)
+
+
+def test_code_outside_the_schema_in_one_chunk(raw_survey, write_csv):
+    frame = raw_survey.copy()
+    frame.loc[300, "HUorEUorNONEuCo"] = 9
+    summary = summarize_survey(write_csv(frame), chunk_rows=50)
+
+    table = summary.crosstab("HUorEUorNONEuCo", "gender")
+    expected = pd.crosstab(frame["HUorEUorNONEuCo"], frame["gender"])
+    assert table.to_numpy().tolist() == expected.to_numpy().tolist()
+    assert list(table.index) == list(expected.index)
+
+    screening = screen_associations(summary, CATEGORICAL_COLUMNS)
+    assert len(screening) and screening["p-value"].notna().any()
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from worklife.groups import GroupIndex
+from worklife.summaries import binned_kde, box_stats, histogram
+
+
+def test_kde_of_no_values_is_an_empty_curve():
+    for values in ([], [np.nan, np.nan]):
+        grid, density = binned_kde(values)
+        assert len(grid) == len(density) == 0
+
+
+def test_groups_of_a_nullable_outcome_drop_missing_answers():
+    frame = pd.DataFrame({
+        "group": pd.Categorical([1, 2, 1, 2, 1, 2], categories=[1, 2, 3]),
+        "score": pd.array([4, pd.NA, 6, 3, pd.NA, 5], dtype="Int8"),
+    })
+    first, second, empty = GroupIndex(frame).split("group", "score")
+
+    assert first.dtype == np.float64
+    assert first.tolist() == [4.0, 6.0]
+    assert second.tolist() == [3.0, 5.0]
+    assert len(empty) == 0
+    # An empty group gives an empty box and an empty curve instead of raising
+    assert np.isnan(box_stats([empty])[0]["med"])
+    assert histogram(empty)[0].sum() == 0
+    assert len(binned_kde(empty)[0]) == 0
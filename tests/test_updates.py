@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from worklife.analyses import SECTIONS, Table, analyses
+from worklife.bitmaps import BitmapIndex, filter_dataset
+from worklife.comparisons import merge_moments
+from worklife.data import DATA_PATH, load_survey
+from worklife.engine import ROW_TABLES, StatsEngine
+from worklife.groups import GroupIndex
+from worklife.streaming import SurveySummary
+from worklife.updates import append_responses
+
+
+def test_merge_moments_matches_one_pass():
+    values = np.random.default_rng(0).normal(size=101)
+    a, b = values[:37], values[37:]
+    n, mean, ss = merge_moments(len(a), a.mean(), ((a - a.mean()) ** 2).sum(),
+                                len(b), b.mean(), ((b - b.mean()) ** 2).sum())
+    assert n == len(values)
+    assert mean == pytest.approx(values.mean(), abs=1e-14)
+    assert ss == pytest.approx(((values - values.mean()) ** 2).sum(), rel=1e-12)
+
+
+@pytest.fixture(scope="module")
+def appended(raw_survey, tmp_path_factory):
+    """The workbook as its first 400 rows plus two appended batches."""
+    directory = tmp_path_factory.mktemp("split")
+    raw_survey.head(400).to_csv(directory / "first.csv", index=False)
+    dataset = load_survey(directory / "first.csv", cache_dir=directory / "cache", summarize=True)
+    stats = StatsEngine()
+    for batch in (raw_survey.iloc[400:480], raw_survey.iloc[480:]):
+        dataset = append_responses(dataset, batch, stats)
+    return dataset, stats
+
+
+def test_appends_match_a_full_load(appended, survey):
+    dataset, stats = appended
+    fresh = StatsEngine()
+    assert len(dataset.frame) == len(survey.frame)
+    for analysis in analyses():
+        merged, full = stats.run(dataset, analysis), fresh.run(survey, analysis)
+        assert merged.statistic == pytest.approx(full.statistic, rel=1e-10, abs=1e-12), analysis
+        assert merged.p_value == pytest.approx(full.p_value, rel=1e-8, abs=1e-12), analysis
+        assert merged.significant == full.significant
+    for block in (b for blocks in SECTIONS.values() for b in blocks if isinstance(b, Table)):
+        if block.kind in ROW_TABLES:
+            continue
+        merged, full = stats.table(dataset, block), fresh.table(survey, block)
+        numbers = full.select_dtypes("number").columns
+        np.testing.assert_allclose(merged[numbers].to_numpy(float), full[numbers].to_numpy(float),
+                                   rtol=1e-8, atol=1e-10, err_msg=block.kind)
+
+
+@pytest.fixture(scope="module")
+def summarized(tmp_path_factory):
+    return load_survey(DATA_PATH, cache_dir=tmp_path_factory.mktemp("cache"), summarize=True)
+
+
+def test_append_with_a_new_category_code(summarized, raw_survey):
+    batch = raw_survey.head(5).assign(HUorEUorNONEuCo=9)
+    stats = StatsEngine()
+    updated = append_responses(summarized, batch, stats)
+
+    combined = pd.concat([raw_survey, batch], ignore_index=True)
+    expected = pd.crosstab(combined["HUorEUorNONEuCo"], combined["gender"])
+    table = updated.crosstab("HUorEUorNONEuCo", "gender")
+    assert list(table.index) == [1, 2, 3, 9]
+    assert table.to_numpy().tolist() == expected.to_numpy().tolist()
+
+    block = next(b for b in SECTIONS["Categorical Associations"] if isinstance(b, Table))
+    associations = stats.table(updated, block)
+    assert associations["p-value"].notna().all()
+
+
+def test_appends_need_running_statistics(survey, raw_survey):
+    with pytest.raises(ValueError, match="summarize=True"):
+        append_responses(survey, raw_survey.head(5), StatsEngine())
+
+
+def test_append_work_does_not_grow_with_the_dataset(raw_survey, write_csv, monkeypatch):
+    summarized_rows = []
+    update = SurveySummary.update
+    monkeypatch.setattr(SurveySummary, "update",
+                        lambda summary, chunk: summarized_rows.append(len(chunk)) or update(summary, chunk))
+    batch = raw_survey.head(7)
+    for copies in (1, 20):
+        path = write_csv(pd.concat([raw_survey] * copies, ignore_index=True), f"x{copies}.csv")
+        dataset = load_survey(path, cache_dir=path.parent / "cache", summarize=True)
+        summarized_rows.clear()
+
+        updated = append_responses(dataset, batch, StatsEngine())
+        updated = append_responses(updated, batch, StatsEngine())
+
+        # Only the batches went through the statistics, and the rows were never concatenated
+        assert summarized_rows == [len(batch), len(batch)]
+        assert "frame" not in vars(updated)
+        assert updated.summary.rows == len(raw_survey) * copies + 2 * len(batch)
+
+
+def test_appended_indexes_match_rebuilt_ones(summarized, raw_survey):
+    columns = ["HUorEUorNONEuCo", "CompanySize", "schooling1to3"]
+    for column in columns:
+        summarized.groups.layout(column)
+        summarized.bitmaps.levels(column)
+    # 549 old rows don't fill their last bitmap byte; the batch has a code the workbook doesn't have
+    updated = append_responses(summarized, raw_survey.head(5).assign(HUorEUorNONEuCo=9), StatsEngine())
+    assert updated._previous_groups is summarized.groups
+    assert updated._previous_bitmaps is summarized.bitmaps
+
+    rebuilt_groups, rebuilt_bitmaps = GroupIndex(updated.frame), BitmapIndex(updated.frame)
+    for column in columns:
+        levels, order, offsets = updated.groups._orders[column]
+        expected = rebuilt_groups.layout(column)
+        assert levels == expected[0]
+        np.testing.assert_array_equal(order, expected[1])
+        np.testing.assert_array_equal(offsets, expected[2])
+        levels, packed = updated.bitmaps._bitmaps[column]
+        assert levels == rebuilt_bitmaps.levels(column)
+        np.testing.assert_array_equal(packed, rebuilt_bitmaps._column(column)[1])
+
+    selected = filter_dataset(updated, {"HUorEUorNONEuCo": [9]})
+    assert len(selected.frame) == 5
+    assert selected.summary is None
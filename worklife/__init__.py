@@ -0,0 +1,5 @@
+"""Data loading and analysis helpers behind ``streamlit_app.py``.
+
+Nothing in this package imports Streamlit, so the same code can be used from
+scripts and batch jobs as well as from the app.
+"""
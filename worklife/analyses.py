@@ -0,0 +1,299 @@
+"""Declarative description of the analysis sections.
+
+Each section is a sequence of blocks, rendered in order:
+
+- ``Text``: a piece of markdown (section titles, headers);
+- ``Analysis``: one statistical test plus the wording used to report it;
+- ``Plot``: one figure;
+- ``Table``: a table of results (e.g. every pairwise correlation).
+
+The app renders these blocks with Streamlit, but nothing here depends on it,
+so the same registry can be run headless (see ``worklife.engine.run_all``).
+"""
+from dataclasses import dataclass
+
+from worklife.schema import CATEGORICAL_COLUMNS, LS_ITEMS, PSS_ITEMS
+
+
+@dataclass(frozen=True)
+class Text:
+    markdown: str
+
+
+@dataclass(frozen=True)
+class Analysis:
+    kind: str                 # "ttest", "anova", "pearson" or "chi2"
+    outcome: str              # outcome column (first variable for pearson/chi2)
+    by: str                   # grouping column (second variable for pearson/chi2)
+    levels: tuple = ()        # group codes compared by ttest/anova, in order
+    stat_label: str = ""
+    p_label: str = "P-value"
+    significant: str = ""
+    not_significant: str = ""
+
+    @property
+    def key(self):
+        """What the result depends on; the wording is deliberately left out."""
+        return self.kind, self.outcome, self.by, self.levels
+
+
+@dataclass(frozen=True)
+class Plot:
+    kind: str                 # "box", "hist", "reg", "scatter", "count" or "heatmap"
+    x: str = None
+    y: str = None
+    hue: str = None           # grouping column for "hist" overlays and "count" bars
+    levels: tuple = ()        # groups of ``hue`` drawn by "hist"
+    colors: tuple = ()
+    labels: tuple = ()
+    labelled: bool = False    # show the schema labels instead of the codes on x
+    palette: object = None
+    color: str = None
+    xlabel: str = ""
+    ylabel: str = ""
+    title: str = ""
+    columns: tuple = ()       # variables shown by "heatmap"
+    size: tuple = (6, 4)
+
+
+@dataclass(frozen=True)
+class Table:
+    kind: str                 # "correlations", "screening", "associations", "effects", "ols", "subsets" or "logit"
+    columns: tuple = ()       # restrict the table to these variables (default: all); predictors of a model
+    by: tuple = ()            # grouping columns the outcomes are screened against
+    correction: str = None    # "holm" or "bh" multiple-comparison correction
+    outcome: str = None       # modelled variable of "ols", "subsets" and "logit"
+    levels: tuple = ()        # outcome codes counted as the event by "logit"
+
+
+def _ttest(outcome, by, stat_label="T-test Statistic", p_label="P-value", **wording):
+    return Analysis("ttest", outcome, by, (1, 2), stat_label, p_label, **wording)
+
+
+def _anova(outcome, by, **wording):
+    return Analysis("anova", outcome, by, (1, 2, 3), "F-statistic", **wording)
+
+
+def _pearson(outcome, by, stat_label="Pearson's Correlation Coefficient", **wording):
+    return Analysis("pearson", outcome, by, (), stat_label, **wording)
+
+
+EXERCISE_AXIS = "Exercise Habits (1=Leisure, 2=Competitive, 3=No Sport)"
+HEALTH_AXIS = "Perceived Health (1 = Least Healthy, 7 = Most Healthy)"
+INCOME_AXIS = "Income Level (1 = Low, 7 = High)"
+
+# Person-level variables shown in the correlation heatmap (the items are in the table)
+KEY_VARIABLES = ("age", "perceivedhealth1to7", "income1to7", "SportsHistoryYears",
+                 "SportSocSupport1to10ZeroNoSport", "Stress", "LifeSatisf")
+
+WORKPLACE_FACTORS = ("CompanySize", "CompanySize4cat", "JobPositionEmployeeManager",
+                     "GovOrPrivateCo", "HUorEUorNONEuCo")
+
+# Candidate predictors of the regression models
+REGRESSORS = ("income1to7", "perceivedhealth1to7", "JobPositionEmployeeManager", "CompanySize",
+              "LeisureCompOrNoSport")
+EXERCISE_PREDICTORS = ("income1to7", "perceivedhealth1to7", "JobPositionEmployeeManager", "CompanySize",
+                       "Childhood7to16SportsYesNo")
+
+SECTIONS = {
+    "Company Size & Wellbeing": (
+        Text("# (A) Company Size & Well-Being (Stress & Life Satisfaction)"),
+        Text("### Stress"),
+        _ttest("Stress", "CompanySize",
+               stat_label="T-statistic (Stress)", p_label="P-value (Stress)",
+               significant="There is a statistically significant difference between small and large companies in stress.",
+               not_significant="There is no significant difference in stress between small and large companies."),
+        Text("### Life Satisfaction"),
+        _ttest("LifeSatisf", "CompanySize",
+               stat_label="T-statistic (Life Satisfaction)", p_label="P-value (Life Satisfaction)",
+               significant="There is a statistically significant difference between small and large companies in life satisfaction.",
+               not_significant="There is no significant difference in life satisfaction between small and large companies."),
+        Text("## Boxplot Comparison (Stress)"),
+        Plot("box", "CompanySize", "Stress", labelled=True, xlabel="Company Size", ylabel="Stress Level"),
+        Text("## Boxplot Comparison (Life Satisfaction)"),
+        Plot("box", "CompanySize", "LifeSatisf", labelled=True, xlabel="Company Size", ylabel="Life Satisfaction"),
+        Text("## Histogram of Stress Distribution"),
+        Plot("hist", "Stress", hue="CompanySize", levels=(1, 2), colors=("blue", "red"),
+             labels=("Small Companies", "Large Companies"), xlabel="Stress Level"),
+        Text("## Histogram of Life Satisfaction Distribution"),
+        Plot("hist", "LifeSatisf", hue="CompanySize", levels=(1, 2), colors=("blue", "red"),
+             labels=("Small Companies", "Large Companies"), xlabel="Life Satisfaction Level"),
+    ),
+    "Income & Wellbeing": (
+        Text("# (B) Income & Wellbeing"),
+        Text("## Correlation Between Stress and Income"),
+        _pearson("Stress", "income1to7",
+                 significant="There is a statistically significant correlation between stress and income.",
+                 not_significant="There is no significant correlation between stress and income."),
+        Text("## Scatterplot: Stress vs. Income"),
+        Plot("reg", "income1to7", "Stress", xlabel=INCOME_AXIS, ylabel="Stress Level",
+             title="Relationship Between Stress and Income"),
+        Text("## Correlation Between Life Satisfaction and Income"),
+        _pearson("LifeSatisf", "income1to7",
+                 significant="There is a statistically significant correlation between life satisfaction and income.",
+                 not_significant="There is no significant correlation between life satisfaction and income."),
+        Text("## Scatterplot: Life Satisfaction vs. Income"),
+        Plot("reg", "income1to7", "LifeSatisf", xlabel=INCOME_AXIS, ylabel="Life Satisfaction Level",
+             title="Relationship Between Life Satisfaction and Income"),
+    ),
+    "Education & Wellbeing": (
+        Text("## **Education Level & Well-Being (Stress & Life Satisfaction)**"),
+        Text("### **(A) Stress Levels by Education Level**"),
+        _anova("Stress", "schooling1to3",
+               significant="There is a statistically significant difference in stress levels across education levels.",
+               not_significant="There is no significant difference in stress levels across education levels."),
+        Plot("box", "schooling1to3", "Stress", labelled=True, xlabel="Education Level", ylabel="Stress"),
+        Text("### **(B) Life Satisfaction by Education Level**"),
+        _anova("LifeSatisf", "schooling1to3",
+               significant="There is a statistically significant difference in life satisfaction across education levels.",
+               not_significant="There is no significant difference in life satisfaction across education levels."),
+        Plot("box", "schooling1to3", "LifeSatisf", labelled=True, xlabel="Education Level", ylabel="Life Satisfaction"),
+        Text("## **Education Level & Perceived Income**"),
+        Text("### **Income Levels by Education Level**"),
+        _anova("income1to7", "schooling1to3",
+               significant="There is a statistically significant difference in perceived income across education levels.",
+               not_significant="There is no significant difference in perceived income across education levels."),
+        Plot("box", "schooling1to3", "income1to7", labelled=True, xlabel="Education Level",
+             ylabel="Perceived Income (1 to 7)"),
+    ),
+    "Life Satisfaction & Stress": (
+        Text("# Life Satisfaction & Stress"),
+        Text("## Correlation Between Stress and Life Satisfaction"),
+        _pearson("Stress", "LifeSatisf",
+                 significant="There is a statistically significant correlation between stress and life satisfaction.",
+                 not_significant="There is no significant correlation between stress and life satisfaction."),
+        Text("## Scatterplot: Stress vs. Life Satisfaction"),
+        Plot("reg", "Stress", "LifeSatisf", xlabel="Stress Level", ylabel="Life Satisfaction Level",
+             title="Relationship Between Stress and Life Satisfaction"),
+    ),
+    "Employment Type Analysis": (
+        Text("# (C) Employment Type Analysis - Stress Levels"),
+        Text("## Stress Levels Between Employees and Managers"),
+        _ttest("Stress", "JobPositionEmployeeManager",
+               significant="There is a statistically significant difference in stress levels between employees and managers.",
+               not_significant="There is no significant difference in stress levels between employees and managers."),
+        Text("## Boxplot: Stress Levels of Employees vs. Managers"),
+        Plot("box", "JobPositionEmployeeManager", "Stress", labelled=True, palette=("blue", "orange"),
+             xlabel="Job Position", ylabel="Stress Level",
+             title="Comparison of Stress Levels Between Employees and Managers"),
+        Text("### Employment Type Analysis - Life Satisfaction"),
+        Text("## Life Satisfaction Between Employees and Managers"),
+        _ttest("LifeSatisf", "JobPositionEmployeeManager",
+               significant="There is a statistically significant difference in life satisfaction between employees and managers.",
+               not_significant="There is no significant difference in life satisfaction between employees and managers."),
+        Text("## Boxplot: Life Satisfaction of Employees vs. Managers"),
+        Plot("box", "JobPositionEmployeeManager", "LifeSatisf", labelled=True, palette=("blue", "orange"),
+             xlabel="Job Position", ylabel="Life Satisfaction Score",
+             title="Comparison of Life Satisfaction Between Employees and Managers"),
+    ),
+    "Perceived Health & Stress": (
+        Text("# (D) Perceived Health - Stress Levels"),
+        Text("## Relationship Between Stress and Perceived Health"),
+        _pearson("Stress", "perceivedhealth1to7", stat_label="Pearson Correlation Coefficient",
+                 significant="There is a statistically significant relationship between stress levels and perceived health.",
+                 not_significant="There is no significant correlation between stress levels and perceived health."),
+        Text("## Scatterplot: Stress vs. Perceived Health"),
+        Plot("scatter", "perceivedhealth1to7", "Stress", color="purple", xlabel=HEALTH_AXIS,
+             ylabel="Stress Score", title="Scatterplot of Stress vs. Perceived Health"),
+        Text("## Boxplot: Stress Across Perceived Health Levels"),
+        Plot("box", "perceivedhealth1to7", "Stress", palette="coolwarm", xlabel=HEALTH_AXIS,
+             ylabel="Stress Score", title="Comparison of Stress Across Different Perceived Health Levels"),
+        Text("## Relationship Between Life Satisfaction and Perceived Health"),
+        _pearson("LifeSatisf", "perceivedhealth1to7", stat_label="Pearson Correlation Coefficient",
+                 significant="There is a statistically significant relationship between life satisfaction and perceived health.",
+                 not_significant="There is no significant correlation between life satisfaction and perceived health."),
+        Text("## Scatterplot: Life Satisfaction vs. Perceived Health"),
+        Plot("scatter", "perceivedhealth1to7", "LifeSatisf", color="teal", xlabel=HEALTH_AXIS,
+             ylabel="Life Satisfaction Score", title="Scatterplot of Life Satisfaction vs. Perceived Health"),
+        Text("## Boxplot: Life Satisfaction Across Perceived Health Levels"),
+        Plot("box", "perceivedhealth1to7", "LifeSatisf", palette="viridis", xlabel=HEALTH_AXIS,
+             ylabel="Life Satisfaction Score",
+             title="Comparison of Life Satisfaction Across Different Perceived Health Levels"),
+    ),
+    "Exercise Habits & Stress": (
+        Text("# (E) Exercise Habits - Stress Levels"),
+        Text("## Stress Across Exercise Habits"),
+        Plot("box", "LeisureCompOrNoSport", "Stress", palette="muted", xlabel=EXERCISE_AXIS,
+             ylabel="Stress Level", title="Comparison of Stress Across Exercise Habits"),
+        _anova("Stress", "LeisureCompOrNoSport",
+               significant="There is a significant difference in stress levels based on exercise habits.",
+               not_significant="There is no significant difference in stress levels based on exercise habits."),
+        Text("## Life Satisfaction Across Exercise Habits"),
+        Plot("box", "LeisureCompOrNoSport", "LifeSatisf", palette="muted", xlabel=EXERCISE_AXIS,
+             ylabel="Life Satisfaction Score", title="Comparison of Life Satisfaction Across Exercise Habits"),
+        _anova("LifeSatisf", "LeisureCompOrNoSport",
+               significant="There is a significant difference in life satisfaction based on exercise habits.",
+               not_significant="There is no significant difference in life satisfaction based on exercise habits."),
+    ),
+    "Current Exercise Habits vs Childhood Sports History": (
+        Text("## Current Exercise Habits vs Childhood Sports History"),
+        Plot("count", "LeisureCompOrNoSport", hue="Childhood7to16SportsYesNo", palette="muted",
+             xlabel="Current Exercise Habits (1=Leisure, 2=Competitive, 3=No Sport)", ylabel="Count",
+             title="Comparison of Current Exercise Habits by Childhood Sports History"),
+        Analysis("chi2", "Childhood7to16SportsYesNo", "LeisureCompOrNoSport", (), "Chi-Square Statistic",
+                 significant="There is a significant association between childhood sports history and current exercise habits.",
+                 not_significant="There is no significant association between childhood sports history and current exercise habits."),
+    ),
+    "Correlation Matrix": (
+        Text("# Correlation Matrix"),
+        Text("Pearson correlations between the numeric survey variables, computed for all pairs at once."),
+        Plot("heatmap", columns=KEY_VARIABLES, title="Pearson Correlations Between Key Variables", size=(8, 6)),
+        Text("## All Pairwise Correlations"),
+        Table("correlations"),
+    ),
+    "Item Screening": (
+        Text("# Item Screening"),
+        Text("Every SWL and PSS item compared across each workplace factor (Welch t-test for two groups, "
+             "one-way ANOVA otherwise). With this many tests some will be significant by chance, so the "
+             "Holm-adjusted p-value is the one to read."),
+        Table("screening", columns=tuple(LS_ITEMS + PSS_ITEMS), by=WORKPLACE_FACTORS, correction="holm"),
+    ),
+    "Categorical Associations": (
+        Text("# Categorical Associations"),
+        Text("Every pair of coded questions (demographics, workplace, exercise) tested for association "
+             "with a chi-square test; Cramér's V gives the strength (0 = none, 1 = perfect). Where expected "
+             "counts are too small for the chi-square approximation, the p-value comes from Fisher's exact "
+             "test (2x2 tables) or a Monte Carlo exact test. Read the Holm-adjusted p-value."),
+        Table("associations", columns=tuple(CATEGORICAL_COLUMNS), correction="holm"),
+    ),
+    "Regression Models": (
+        Text("# Regression Models"),
+        Text("Linear regressions of stress and life satisfaction on income, perceived health, job position, "
+             "company size and exercise habits. Coded variables enter as indicators against their first "
+             "level (employee, small company, leisure sport)."),
+        Text("## Stress"),
+        Table("ols", columns=REGRESSORS, outcome="Stress"),
+        Text("### Model Comparison"),
+        Text("Every subset of the predictors, best BIC first; `stepwise` marks the models visited by "
+             "forward selection."),
+        Table("subsets", columns=REGRESSORS, outcome="Stress"),
+        Text("## Life Satisfaction"),
+        Table("ols", columns=REGRESSORS, outcome="LifeSatisf"),
+        Text("### Model Comparison"),
+        Table("subsets", columns=REGRESSORS, outcome="LifeSatisf"),
+        Text("## Who Exercises?"),
+        Text("Logistic regression of doing any sport (leisure or competitive, against no sport) on the "
+             "workplace factors and childhood sports history."),
+        Table("logit", columns=EXERCISE_PREDICTORS, outcome="LeisureCompOrNoSport", levels=(1, 2)),
+    ),
+    "Effect Sizes & Power": (
+        Text("# Effect Sizes & Power"),
+        Text("How large each effect is, not only whether it passes p < 0.05: Cohen's d and Hedges' g "
+             "(bias-corrected) for the t-tests, eta and omega squared for the ANOVAs, r for the correlations "
+             "and Cramér's V for the chi-square test, each labelled small, medium or large by Cohen's "
+             "conventions. The last column is the number of respondents a new survey wave would need to "
+             "detect an effect of that size with 80% power at the 0.05 level."),
+        Table("effects"),
+    ),
+}
+
+
+def analyses(section=None):
+    """All ``Analysis`` blocks, of one section or of every section."""
+    names = [section] if section else list(SECTIONS)
+    return [block for name in names for block in SECTIONS[name] if isinstance(block, Analysis)]
+
+
+def plots(section=None):
+    names = [section] if section else list(SECTIONS)
+    return [block for name in names for block in SECTIONS[name] if isinstance(block, Plot)]
@@ -0,0 +1,73 @@
+"""The header animation.
+
+The animation ships with the app as ``assets/header_lottie.json`` and is read
+from disk. ``WORKLIFE_LOTTIE_URL`` can name one to download when that file is
+missing; nothing is fetched unless it is set. The download runs on a
+background thread, so a slow or unreachable host (DNS resolution included,
+which the socket timeout doesn't cover) never holds up a page: the header
+stays empty until the download has finished. A failed download is not
+remembered as the result; it is tried again after ``RETRY_SECONDS``.
+"""
+import json
+import os
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+LOTTIE_PATH = Path(__file__).resolve().parent.parent / "assets" / "header_lottie.json"
+LOTTIE_URL = os.environ.get("WORKLIFE_LOTTIE_URL", "")
+RETRY_SECONDS = 60
+
+
+def read_animation(path=LOTTIE_PATH):
+    """The animation saved at ``path``, or None when it is missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+class Download:
+    """A JSON document fetched once on a background thread."""
+
+    def __init__(self, url, timeout=5, retry_seconds=RETRY_SECONDS):
+        self.url = url
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._result = None
+        self._thread = None
+        self._retry_at = 0.0
+
+    def result(self):
+        """The document, or None while it is being fetched or after a failure.
+
+        Starts the download if it hasn't run yet, or failed more than
+        ``retry_seconds`` ago; never waits for it.
+        """
+        with self._lock:
+            if self._result is None and self._thread is None and time.monotonic() >= self._retry_at:
+                self._thread = threading.Thread(target=self._fetch, name="worklife-lottie", daemon=True)
+                self._thread.start()
+            return self._result
+
+    def wait(self, timeout=None):
+        """Wait for a running download; for tests and scripts."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self._result
+
+    def _fetch(self):
+        try:
+            with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+                result = json.load(response)
+        except (OSError, ValueError):
+            result = None
+        with self._lock:
+            self._result = result
+            self._thread = None
+            if result is None:
+                self._retry_at = time.monotonic() + self.retry_seconds
@@ -0,0 +1,194 @@
+"""Chi-square tests of association between the coded (categorical) columns.
+
+``pair_counts`` counts the contingency tables of many column pairs in one pass
+over integer codes: each pair gets its own range of bins, every (pair, row)
+maps to one bin, and a single ``np.bincount`` per block of rows fills all the
+tables at once. ``AssociationIndex`` does this once per dataset for every pair
+of categorical columns, so a screen of all pairs costs about as much as one
+``pd.crosstab``.
+
+``association_test`` reports Pearson's chi-square (with Yates' correction for
+2x2 tables, as ``scipy.stats.chi2_contingency``), Cramér's V and the expected
+counts. When the chi-square approximation is doubtful by Cochran's rule (an
+expected count below 1, or more than 20% below 5) the p-value comes from an
+exact test instead: Fisher's for 2x2 tables, otherwise a Monte Carlo test on
+tables drawn with the observed margins.
+"""
+import itertools
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import chdtrc
+
+from worklife.groups import codes_and_levels
+from worklife.resampling import SEED
+
+MIN_EXPECTED = 5
+SPARSE_SHARE = 0.2          # Cochran: at most 20% of expected counts below MIN_EXPECTED
+MONTE_CARLO_TABLES = 10_000
+BLOCK_ROWS = 1 << 16        # rows per bincount, bounding the (pairs x rows) index array
+
+
+@dataclass(frozen=True)
+class Association:
+    statistic: float        # Pearson chi-square (Yates-corrected for 2x2 tables)
+    dof: int
+    p_value: float
+    n: int
+    cramers_v: float
+    min_expected: float
+    sparse_share: float     # share of cells with an expected count below MIN_EXPECTED
+    method: str             # "chi-square", "Fisher exact" or "Monte Carlo exact"
+    warning: str = ""
+    cohens_w: float = np.nan  # sqrt(chi-square / n), the effect size power calculations use
+
+
+def pair_counts(codes, sizes, pairs=None, block_rows=BLOCK_ROWS):
+    """Contingency counts of pairs of integer-coded columns, all in one pass.
+
+    ``codes`` is a (columns, rows) array of codes, -1 for missing; column i
+    has ``sizes[i]`` levels. Returns {(i, j): (sizes[i], sizes[j]) counts} for
+    ``pairs`` (every i < j by default). Rows missing either code are skipped.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    if pairs is None:
+        pairs = list(itertools.combinations(range(len(sizes)), 2))
+    if not pairs:
+        return {}
+    first, second = np.array(pairs).T
+    cells = sizes[first] * sizes[second]
+    offsets = np.concatenate([[0], np.cumsum(cells)])
+    dropped = offsets[-1]  # one extra bin collects the rows with a missing code
+    counts = np.zeros(dropped + 1, dtype=np.int64)
+    for start in range(0, codes.shape[1], block_rows):
+        a, b = codes[first, start:start + block_rows], codes[second, start:start + block_rows]
+        flat = offsets[:-1, None] + a * sizes[second][:, None] + b
+        flat[(a < 0) | (b < 0)] = dropped
+        counts += np.bincount(flat.ravel(), minlength=dropped + 1)
+    return {pair: counts[offsets[k]:offsets[k + 1]].reshape(sizes[pair[0]], sizes[pair[1]])
+            for k, pair in enumerate(pairs)}
+
+
+def cramers_v(counts):
+    """Cramér's V of a contingency table (uncorrected chi-square)."""
+    counts = _observed(counts)
+    n = counts.sum()
+    if n == 0 or min(counts.shape) < 2:
+        return np.nan
+    expected = np.outer(counts.sum(axis=1), counts.sum(axis=0)) / n
+    return float(np.sqrt(((counts - expected) ** 2 / expected).sum() / (n * (min(counts.shape) - 1))))
+
+
+def _observed(counts):
+    """The table as floats without empty rows and columns (undeclared answers, filtered-out groups)."""
+    counts = np.asarray(counts, dtype=np.float64)
+    return counts[counts.sum(axis=1) > 0][:, counts.sum(axis=0) > 0]
+
+
+def _monte_carlo(counts, expected, statistic, n_tables, seed):
+    from scipy.stats import random_table  # imported on first use, like scipy.stats elsewhere
+
+    tables = random_table(counts.sum(axis=1), counts.sum(axis=0)).rvs(
+        n_tables, random_state=np.random.default_rng(seed))
+    simulated = ((tables - expected) ** 2 / expected).sum(axis=(1, 2))
+    extreme = np.count_nonzero(simulated >= statistic * (1 - 1e-12))
+    return (1 + extreme) / (n_tables + 1)
+
+
+def association_test(counts, correction=True, exact=True, n_tables=MONTE_CARLO_TABLES, seed=SEED):
+    """Chi-square test of independence of a contingency table, exact when cells are sparse."""
+    counts = _observed(counts)
+    n = int(counts.sum())
+    if n == 0 or min(counts.shape) < 2:
+        # A filter can leave no respondent with both answers, or only one answer
+        return Association(np.nan, 0, np.nan, n, np.nan, np.nan, np.nan, "chi-square")
+    expected = np.outer(counts.sum(axis=1), counts.sum(axis=0)) / n
+    dof = (counts.shape[0] - 1) * (counts.shape[1] - 1)
+    plain = ((counts - expected) ** 2 / expected).sum()
+    statistic = plain
+    if dof == 1 and correction:
+        # Yates: move each count up to 0.5 towards its expected value
+        diff = expected - counts
+        corrected = counts + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+        statistic = ((corrected - expected) ** 2 / expected).sum()
+    p_value = chdtrc(dof, statistic)
+    v = np.sqrt(plain / (n * (min(counts.shape) - 1)))
+
+    min_expected = expected.min()
+    sparse_share = np.mean(expected < MIN_EXPECTED)
+    method, warning = "chi-square", ""
+    if min_expected < 1 or sparse_share > SPARSE_SHARE:
+        warning = (f"{sparse_share:.0%} of expected counts are below {MIN_EXPECTED} "
+                   f"(smallest {min_expected:.2f}); the chi-square approximation is unreliable")
+        if exact:
+            if counts.shape == (2, 2):
+                from scipy.stats import fisher_exact
+
+                p_value, method = fisher_exact(counts.astype(np.int64)).pvalue, "Fisher exact"
+            else:
+                p_value = _monte_carlo(counts, expected, plain, n_tables, seed)
+                method = "Monte Carlo exact"
+            warning += f", so the p-value is from the {method} test"
+    return Association(float(statistic), int(dof), float(p_value), n, float(v), float(min_expected),
+                       float(sparse_share), method, warning, float(np.sqrt(plain / n)))
+
+
+def screen_associations(dataset, columns):
+    """One row per pair of ``columns``: chi-square, Cramér's V and the exact-test fallback."""
+    records = []
+    for a, b in itertools.combinations(columns, 2):
+        result = association_test(dataset.crosstab(a, b))
+        records.append({"variable 1": a, "variable 2": b, "chi²": result.statistic, "dof": result.dof,
+                        "p-value": result.p_value, "Cramér's V": result.cramers_v, "n": result.n,
+                        "min. expected": result.min_expected, "method": result.method})
+    return pd.DataFrame(records)
+
+
+class AssociationIndex:
+    """Contingency tables of every pair of categorical columns of a frame.
+
+    All pairs are counted together the first time any table is asked for;
+    pairs involving other (non-categorical) columns are counted on demand.
+    """
+
+    def __init__(self, frame):
+        self._frame = frame
+        self.columns = [column for column in frame.columns
+                        if isinstance(frame[column].dtype, pd.CategoricalDtype)]
+        self._levels = {}
+        self._tables = None  # (a, b) -> counts, a before b in self.columns
+        self._lock = threading.Lock()
+
+    def _all(self):
+        if self._tables is None:
+            with self._lock:
+                if self._tables is None:
+                    coded = [codes_and_levels(self._frame[column]) for column in self.columns]
+                    self._levels.update(zip(self.columns, (levels for _, levels in coded)))
+                    codes = np.array([codes for codes, _ in coded]).reshape(len(coded), len(self._frame))
+                    counts = pair_counts(codes, [len(levels) for _, levels in coded])
+                    self._tables = {(self.columns[i], self.columns[j]): table
+                                    for (i, j), table in counts.items()}
+        return self._tables
+
+    def _pair(self, a, b):
+        (codes_a, levels_a), (codes_b, levels_b) = (codes_and_levels(self._frame[a]),
+                                                    codes_and_levels(self._frame[b]))
+        counts = pair_counts(np.array([codes_a, codes_b]), [len(levels_a), len(levels_b)])[0, 1]
+        return counts, levels_a, levels_b
+
+    def table(self, a, b):
+        """Counts of every (a, b) combination, levels of ``a`` down the rows (like ``pd.crosstab``)."""
+        if a in self.columns and b in self.columns and a != b:
+            tables = self._all()
+            if (a, b) in tables:
+                counts = tables[a, b]
+            else:
+                counts = tables[b, a].T
+            levels_a, levels_b = self._levels[a], self._levels[b]
+        else:
+            counts, levels_a, levels_b = self._pair(a, b)
+        return pd.DataFrame(counts, index=pd.Index(levels_a, name=a), columns=pd.Index(levels_b, name=b))
@@ -0,0 +1,126 @@
+"""Selecting respondents by their answers to the coded questions.
+
+``BitmapIndex`` keeps one packed bitmap (``np.packbits``, one bit per
+respondent) for every level of every categorical column, built the first time
+the column is filtered on. A filter such as "private-sector managers in
+Hungary" is then a handful of bitwise operations on n/8 bytes: OR over the
+chosen levels of one column, AND across columns.
+
+``extended`` derives the index of a frame with rows appended
+(``worklife.updates``) from this one by packing the bits of the new rows only.
+
+``filter_dataset`` turns a selection into a new ``Dataset`` of the matching
+rows, with a fingerprint derived from the parent's and the filter, so results
+and figures of every distinct selection are cached separately.
+"""
+import hashlib
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from worklife.groups import codes_and_levels
+
+# Set bits in every byte value
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class BitmapIndex:
+    def __init__(self, frame):
+        self._frame = frame
+        self.rows = len(frame)
+        self._bitmaps = {}  # column -> (levels, packed bitmaps, one row per level)
+        self._lock = threading.Lock()
+
+    def _column(self, column):
+        entry = self._bitmaps.get(column)
+        if entry is None:
+            with self._lock:
+                entry = self._bitmaps.get(column)
+                if entry is None:
+                    codes, levels = codes_and_levels(self._frame[column])
+                    bits = codes[None, :] == np.arange(len(levels))[:, None]
+                    entry = self._bitmaps[column] = (levels, np.packbits(bits, axis=1))
+        return entry
+
+    def levels(self, column):
+        return self._column(column)[0]
+
+    def extended(self, frame):
+        """The index of ``frame``, whose first rows are the rows this index was built on.
+
+        Bitmaps already built here get the bits of the new rows appended; the
+        others are built from ``frame`` when first filtered on.
+        """
+        index = BitmapIndex(frame)
+        with self._lock:
+            bitmaps = dict(self._bitmaps)
+        for column, (levels, packed) in bitmaps.items():
+            values = frame[column]
+            # Appended categories come after the old ones (see worklife.updates)
+            if not isinstance(values.dtype, pd.CategoricalDtype) or \
+                    list(values.cat.categories[:len(levels)]) != levels:
+                continue
+            all_levels = list(values.cat.categories)
+            codes = values.iloc[self.rows:].cat.codes.to_numpy()
+            bits = codes[None, :] == np.arange(len(all_levels))[:, None]
+            # Levels new in this batch have no bits among the old rows
+            packed = np.concatenate([packed, np.zeros((len(all_levels) - len(levels), packed.shape[1]),
+                                                       dtype=np.uint8)])
+            index._bitmaps[column] = (all_levels, _append_bits(packed, self.rows, bits))
+        return index
+
+    def everyone(self):
+        return np.packbits(np.ones(self.rows, dtype=bool))
+
+    def select(self, filters):
+        """Bitmap of the rows matching ``filters`` ({column: levels to keep})."""
+        selected = self.everyone()
+        for column, wanted in filters.items():
+            if not wanted:
+                continue
+            levels, bitmaps = self._column(column)
+            rows = [levels.index(level) for level in wanted if level in levels]
+            column_bits = np.bitwise_or.reduce(bitmaps[rows], axis=0) if rows \
+                else np.zeros_like(selected)
+            selected &= column_bits
+        return selected
+
+    def count(self, bitmap):
+        return int(_POPCOUNT[bitmap].sum())
+
+    def positions(self, bitmap):
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.rows))
+
+
+def _append_bits(packed, rows, bits):
+    """Packed bitmaps of ``rows`` rows followed by the unpacked ``bits``, packed."""
+    used = rows % 8
+    if not used:
+        return np.concatenate([packed, np.packbits(bits, axis=1)], axis=1)
+    # The last byte is partly filled: repack its bits together with the new ones
+    tail = np.concatenate([np.unpackbits(packed[:, -1:], axis=1)[:, :used], bits], axis=1)
+    return np.concatenate([packed[:, :-1], np.packbits(tail, axis=1)], axis=1)
+
+
+def normalize_filters(filters):
+    """Drop empty selections and fix the order, so equal filters compare equal."""
+    return tuple((column, tuple(sorted(levels))) for column, levels in sorted(filters.items()) if levels)
+
+
+def filter_dataset(dataset, filters):
+    """The rows of ``dataset`` matching ``filters``, as a Dataset of their own."""
+    filters = normalize_filters(dict(filters))
+    if not filters:
+        return dataset
+    index = dataset.bitmaps
+    positions = index.positions(index.select(dict(filters)))
+    digest = hashlib.sha256(dataset.fingerprint.encode())
+    digest.update(json.dumps(filters, default=str).encode())
+    from worklife.data import Dataset  # worklife.data imports this module
+
+    frame = dataset.frame.iloc[positions].reset_index(drop=True)
+    raw_bytes = dataset.raw_bytes * len(frame) // max(len(dataset.frame), 1)
+    # A plain Dataset: running statistics and appended batches describe all rows, not the selection
+    return Dataset(frame, digest.hexdigest(), dataset.source, raw_bytes)
@@ -0,0 +1,150 @@
+"""Welch t-tests and one-way ANOVAs for many outcomes at once.
+
+Both tests only need the count, mean and variance of each group, so
+``group_moments`` computes those for every outcome in one grouped aggregation
+over the dataset's group index, and the tests are then evaluated on the
+resulting (groups x outcomes) arrays. The statistics are the same as
+``scipy.stats.ttest_ind(..., equal_var=False)`` and ``scipy.stats.f_oneway``.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import fdtrc, stdtr
+
+
+@dataclass(eq=False)
+class GroupMoments:
+    levels: list
+    outcomes: list
+    n: np.ndarray       # (groups, outcomes) counts of non-missing values
+    mean: np.ndarray
+    var: np.ndarray     # sample variance (ddof=1)
+
+    def select(self, levels):
+        idx = [self.levels.index(level) for level in levels]
+        return GroupMoments(list(levels), self.outcomes, self.n[idx], self.mean[idx], self.var[idx])
+
+
+def group_moments(dataset, by, outcomes, levels=None):
+    """Per-group counts, means and variances of ``outcomes`` grouped by ``by``."""
+    all_levels, order, offsets = dataset.groups.layout(by)
+    outcomes = list(outcomes)
+    x = dataset.frame[outcomes].to_numpy(dtype=np.float64, na_value=np.nan)[order[offsets[0]:]]
+    n, mean, ss = block_moments(x, np.diff(offsets))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = ss / (n - 1)
+    moments = GroupMoments(list(all_levels), outcomes, n, mean, var)
+    return moments.select(levels) if levels is not None else moments
+
+
+def block_moments(x, sizes):
+    """Counts, means and sums of squared deviations of consecutive row blocks of ``x``.
+
+    Block i is the next ``sizes[i]`` rows; missing values (NaN) are skipped.
+    Returns three (blocks, columns) arrays.
+    """
+    present = ~np.isnan(x)
+    x = np.where(present, x, 0.0)
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    nonempty = sizes > 0
+    starts = bounds[:-1][nonempty]
+    shape = (len(sizes), x.shape[1])
+    n = np.zeros(shape)
+    sums = np.zeros(shape)
+    ss = np.zeros(shape)
+    if len(starts):
+        n[nonempty] = np.add.reduceat(present, starts, axis=0)
+        sums[nonempty] = np.add.reduceat(x, starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / n
+        # Second pass on the deviations from the group means, for numerical stability
+        dev = np.where(present, x - np.repeat(np.nan_to_num(mean), sizes, axis=0), 0.0)
+        if len(starts):
+            ss[nonempty] = np.add.reduceat(dev * dev, starts, axis=0)
+    return n, mean, ss
+
+
+def merge_moments(n_a, mean_a, ss_a, n_b, mean_b, ss_b):
+    """Combine counts, means and sums of squared deviations of two disjoint
+    samples (Chan et al.'s parallel update); works elementwise on arrays."""
+    n = n_a + n_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = np.nan_to_num(mean_b) - np.nan_to_num(mean_a)
+        mean = np.where(n > 0, np.nan_to_num(mean_a) + delta * n_b / n, np.nan)
+        ss = np.where(n > 0, np.nan_to_num(ss_a) + np.nan_to_num(ss_b) + delta * delta * n_a * n_b / n, 0.0)
+    return n, mean, ss
+
+
+def welch(moments):
+    """Welch t-test of the first group against the second, per outcome."""
+    (n1, n2), (m1, m2), (v1, v2) = moments.n[:2], moments.mean[:2], moments.var[:2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        se1, se2 = v1 / n1, v2 / n2
+        t = (m1 - m2) / np.sqrt(se1 + se2)
+        dof = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+        p = 2 * stdtr(dof, -np.abs(t))
+    return t, dof, p
+
+
+def anova(moments):
+    """One-way ANOVA across all groups in ``moments``, per outcome."""
+    n, mean, var = moments.n, moments.mean, moments.var
+    k = (n > 0).sum(axis=0)
+    total = n.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grand = np.nansum(n * mean, axis=0) / total
+        ss_between = np.nansum(n * (mean - grand) ** 2, axis=0)
+        ss_within = np.nansum((n - 1) * var, axis=0)
+        dof_between, dof_within = k - 1, total - k
+        f = (ss_between / dof_between) / (ss_within / dof_within)
+        p = fdtrc(dof_between, dof_within, f)
+    return f, (dof_between, dof_within), p
+
+
+def adjust_pvalues(p, method):
+    """Holm ("holm") or Benjamini-Hochberg ("bh") adjusted p-values."""
+    p = np.asarray(p, dtype=np.float64)
+    flat = p.ravel()
+    ok = ~np.isnan(flat)
+    adjusted = np.full_like(flat, np.nan)
+    values = flat[ok]
+    m = len(values)
+    if m:
+        order = np.argsort(values)
+        ranked = values[order]
+        if method == "holm":
+            steps = np.maximum.accumulate((m - np.arange(m)) * ranked)
+        elif method == "bh":
+            steps = np.minimum.accumulate((m / np.arange(m, 0, -1)) * ranked[::-1])[::-1]
+        else:
+            raise ValueError(f"Unknown correction: {method!r}")
+        result = np.empty(m)
+        result[order] = np.minimum(steps, 1.0)
+        adjusted[ok] = result
+    return adjusted.reshape(p.shape)
+
+
+def compare_groups(dataset, by, outcomes, levels=None, test=None, correction=None):
+    """Compare the groups of ``by`` on every outcome; one row per outcome.
+
+    ``test`` is "welch" or "anova" and defaults to Welch for two groups and
+    ANOVA otherwise. ``correction`` ("holm" or "bh") adds an adjusted p-value
+    column over the outcomes.
+    """
+    moments = dataset.group_moments(by, outcomes, levels)
+    test = test or ("welch" if len(moments.levels) == 2 else "anova")
+    if test == "welch":
+        statistic, dof, p = welch(moments)
+        dof_columns = {"df": dof}
+    else:
+        statistic, (dof_between, dof_within), p = anova(moments)
+        dof_columns = {"df between": dof_between, "df within": dof_within}
+    table = pd.DataFrame({"outcome": moments.outcomes, "test": test, "statistic": statistic,
+                          **dof_columns, "p-value": p})
+    for i, level in enumerate(moments.levels):
+        table[f"n ({level})"] = moments.n[i].astype(np.int64)
+        table[f"mean ({level})"] = moments.mean[i]
+    if correction:
+        table[f"p ({correction})"] = adjust_pvalues(p, correction)
+    return table
@@ -0,0 +1,117 @@
+"""Pearson correlations between every pair of numeric columns at once.
+
+Instead of one ``scipy.stats.pearsonr`` call per pair, the whole matrix is a
+single product of the centred columns. The p-values come from the same
+t-distribution test that ``pearsonr`` uses and the confidence intervals from
+the Fisher z-transform, both evaluated on the full matrix at once.
+
+Missing answers are handled pairwise: each pair uses the rows where both
+columns are present.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtri, stdtr
+
+
+@dataclass(eq=False)
+class CorrelationMatrix:
+    columns: list
+    r: np.ndarray
+    p: np.ndarray
+    n: np.ndarray
+    ci_low: np.ndarray
+    ci_high: np.ndarray
+    confidence: float = 0.95
+
+    def _ij(self, a, b):
+        return self.columns.index(a), self.columns.index(b)
+
+    def pair(self, a, b):
+        """(r, p, n, ci_low, ci_high) for one pair of columns."""
+        i, j = self._ij(a, b)
+        return (float(self.r[i, j]), float(self.p[i, j]), int(self.n[i, j]),
+                float(self.ci_low[i, j]), float(self.ci_high[i, j]))
+
+    def r_frame(self, columns=None):
+        columns = list(columns or self.columns)
+        idx = [self.columns.index(c) for c in columns]
+        return pd.DataFrame(self.r[np.ix_(idx, idx)], index=columns, columns=columns)
+
+    def to_frame(self, columns=None):
+        """One row per distinct pair, strongest correlations first."""
+        columns = list(columns or self.columns)
+        idx = np.array([self.columns.index(c) for c in columns])
+        i, j = np.triu_indices(len(idx), k=1)
+        i, j = idx[i], idx[j]
+        table = pd.DataFrame({
+            "Variable 1": np.array(self.columns, dtype=object)[i],
+            "Variable 2": np.array(self.columns, dtype=object)[j],
+            "r": self.r[i, j],
+            "p-value": self.p[i, j],
+            f"CI low ({self.confidence:.0%})": self.ci_low[i, j],
+            f"CI high ({self.confidence:.0%})": self.ci_high[i, j],
+            "n": self.n[i, j],
+        })
+        return table.iloc[np.argsort(-np.abs(table["r"].to_numpy()), kind="stable")].reset_index(drop=True)
+
+
+def numeric_columns(frame):
+    return [col for col in frame.columns
+            if pd.api.types.is_numeric_dtype(frame[col])
+            and not isinstance(frame[col].dtype, pd.CategoricalDtype)]
+
+
+def correlation_matrix(frame, columns=None, confidence=0.95):
+    columns = list(columns or numeric_columns(frame))
+    x = frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    present = ~np.isnan(x)
+
+    if present.all():
+        n = np.full((len(columns), len(columns)), float(len(x)))
+        z = x - x.mean(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z /= np.sqrt((z * z).sum(axis=0))
+            r = z.T @ z
+    else:
+        # Pairwise-complete sums: entry [i, j] only counts rows where both i and j are present
+        m = present.astype(np.float64)
+        x0 = np.where(present, x - np.nanmean(x, axis=0), 0.0)
+        n = m.T @ m
+        sx = x0.T @ m                   # sum of column i over the rows shared with j
+        sxx = (x0 * x0).T @ m
+        sxy = x0.T @ x0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = sxy - sx * sx.T / n
+            var_i = sxx - sx * sx / n
+            var_j = var_i.T
+            r = cov / np.sqrt(var_i * var_j)
+    return _from_r(columns, r, n, confidence)
+
+
+def correlation_from_comoments(columns, n, ss, co, confidence=0.95):
+    """The matrix from pairwise accumulated moments (see ``worklife.streaming``).
+
+    ``n[i, j]`` counts the rows where both i and j are present, ``ss[i, j]`` is
+    the sum of squared deviations of column i over those rows and ``co[i, j]``
+    their co-moment.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = co / np.sqrt(ss * ss.T)
+    return _from_r(list(columns), r, n, confidence)
+
+
+def _from_r(columns, r, n, confidence):
+    r = np.clip(r, -1.0, 1.0)
+    np.fill_diagonal(r, np.where(np.isnan(np.diag(r)), np.nan, 1.0))
+    dof = n - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+        p = np.where(np.abs(r) == 1.0, 0.0, 2 * stdtr(dof, -np.abs(t)))
+        z_crit = ndtri(0.5 + confidence / 2)
+        half_width = z_crit / np.sqrt(n - 3)
+        fisher_z = np.arctanh(r)
+        ci_low = np.tanh(fisher_z - half_width)
+        ci_high = np.tanh(fisher_z + half_width)
+    return CorrelationMatrix(columns, r, p, n.astype(np.int64), ci_low, ci_high, confidence)
@@ -0,0 +1,226 @@
+"""Loading the survey workbook.
+
+Parsing ``Cleaned_Work_life.xlsx`` through openpyxl is by far the slowest step
+of a rerun, so the workbook is only parsed once: the parsed frame is published
+as a memory-mapped column file in the cache directory (see
+``worklife.mapped``), together with a small record describing the source
+file. Later loads, in this process or any other, map that file instead of
+reading it, so every server process shares one copy of the data in the page
+cache; they only go back to the workbook when its size, mtime or content hash
+changes, and then publish a new version that replaces the old one atomically.
+Files left by the cache formats before the mapped one are deleted on load.
+
+Columns are converted to the compact types declared in ``worklife.schema``
+before they are published, so the mapped file holds the typed frame.
+
+Raw survey exports that only have the item columns get their ``Stress`` and
+``LifeSatisf`` scores derived on load (see ``worklife.scoring``).
+"""
+import hashlib
+import os
+import re
+from dataclasses import dataclass, replace
+from functools import cached_property
+from pathlib import Path
+
+import pandas as pd
+
+from worklife.associations import AssociationIndex
+from worklife.bitmaps import BitmapIndex
+from worklife.comparisons import group_moments
+from worklife.correlation import correlation_matrix
+from worklife.regression import DesignCache
+from worklife.groups import GroupIndex
+from worklife.instrumentation import recorder
+from worklife.mapped import attach, publish, read_current, set_current
+from worklife.schema import apply_schema, memory_bytes
+from worklife.scoring import add_missing_scores, score_scales
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "Cleaned_Work_life.xlsx"
+CACHE_DIR = Path(os.environ.get("WORKLIFE_CACHE_DIR", DATA_PATH.parent / ".cache"))
+
+# Bump whenever the cached layout or the way columns are prepared changes, so
+# stale cache files are rebuilt instead of being read back.
+CACHE_FORMAT = 4
+
+# Files the formats before the mapped one (1 to 3) wrote: <stem>-<tag>.feather
+# (.parquet for format 1) plus a .json record
+LEGACY_FILE = re.compile(r".+-[0-9a-f]{10}\.(parquet|feather|json)")
+
+
+@dataclass(eq=False)
+class Dataset:
+    """A loaded survey frame plus the fingerprint of the file it came from."""
+    frame: pd.DataFrame
+    fingerprint: str
+    source: str = ""
+    raw_bytes: int = 0  # size of the frame with pandas' default dtypes
+    # Running statistics (worklife.streaming.SurveySummary), built by
+    # load_survey(summarize=True) and kept up to date by worklife.updates;
+    # when set, the tests are computed from them.
+    summary: object = None
+
+    @property
+    def memory_bytes(self):
+        return memory_bytes(self.frame)
+
+    @cached_property
+    def groups(self):
+        return GroupIndex(self.frame)
+
+    @cached_property
+    def designs(self):
+        return DesignCache(self.frame)
+
+    @cached_property
+    def associations(self):
+        return AssociationIndex(self.frame)
+
+    @cached_property
+    def bitmaps(self):
+        return BitmapIndex(self.frame)
+
+    @cached_property
+    def correlations(self):
+        """Pearson correlations between all numeric columns, computed in one pass."""
+        if self.summary is not None:
+            return self.summary.correlations
+        return correlation_matrix(self.frame)
+
+    def group_moments(self, by, outcomes, levels=None):
+        if self.summary is not None:
+            return self.summary.group_moments(by, outcomes, levels)
+        return group_moments(self, by, outcomes, levels)
+
+    def crosstab(self, a, b):
+        """Counts of every (a, b) combination, levels of ``a`` down the rows."""
+        if self.summary is not None:
+            return self.summary.crosstab(a, b)
+        return self.associations.table(a, b)
+
+    @cached_property
+    def reliability(self):
+        """Cronbach's alpha of each questionnaire scale (items are stored in scoring direction)."""
+        return score_scales(self.frame, recode_reversed=False).alpha
+
+
+def source_signature(path=DATA_PATH):
+    """Cheap (path, mtime, size) triple used to notice that a file changed."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_source(path):
+    """Parse a survey file into a DataFrame based on its extension."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+    if suffix == ".csv":
+        return pd.read_csv(path)
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    raise ValueError(f"Unsupported survey file type: {path.name}")
+
+
+def _cache_root(path, cache_dir):
+    # Different workbooks with the same file name must not share a cache entry
+    tag = hashlib.sha1(str(path).encode()).hexdigest()[:10]
+    return Path(cache_dir) / f"{path.stem}-{tag}.mapped"
+
+
+_swept = set()  # cache directories this process has cleared of legacy files
+
+
+def _remove_legacy_files(cache_dir):
+    """Delete what earlier cache formats left in ``cache_dir`` (once per process)."""
+    cache_dir = Path(cache_dir)
+    if cache_dir in _swept:
+        return
+    _swept.add(cache_dir)
+    try:
+        for entry in cache_dir.iterdir():
+            if LEGACY_FILE.fullmatch(entry.name) and entry.is_file():
+                entry.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _read_current(root):
+    current = read_current(root)
+    return current if current and current.get("format") == CACHE_FORMAT else None
+
+
+def load_survey(path=DATA_PATH, cache_dir=CACHE_DIR, summarize=False):
+    """Load a survey file, attaching its published mapped copy when possible.
+
+    The cache is a pure speed-up: if it can't be read or written (read-only
+    filesystem, a column it can't store, ...) the source file is parsed directly.
+
+    ``summarize=True`` also builds the running statistics that
+    ``worklife.updates`` merges appended responses into (one pass over the
+    rows); the tests of such a dataset are computed from them.
+    """
+    path = Path(path).resolve()
+    with recorder.span("load", path.name):
+        dataset = _load_survey(path, cache_dir)
+    if summarize:
+        from worklife.streaming import summarize_frame  # it imports this module
+
+        with recorder.span("load", f"summarize {path.name}"):
+            # Not the plain Dataset's fingerprint: results differ from it in the last bits
+            fingerprint = f"{dataset.fingerprint}:summary"
+            summary = summarize_frame(dataset.frame, fingerprint, dataset.source)
+            dataset = replace(dataset, fingerprint=fingerprint, summary=summary)
+    return dataset
+
+
+def _load_survey(path, cache_dir):
+    _, mtime_ns, size = source_signature(path)
+    _remove_legacy_files(cache_dir)
+    root = _cache_root(path, cache_dir)
+    current = _read_current(root)
+
+    if current and current["mtime_ns"] == mtime_ns and current["size"] == size:
+        try:
+            return Dataset(attach(root, current), current["sha256"], str(path), current["raw_bytes"])
+        except Exception:
+            pass
+
+    digest = file_hash(path)
+    if current and current["sha256"] == digest:
+        # Touched (e.g. re-copied) but unchanged: refresh the record only
+        try:
+            frame = attach(root, current)
+        except Exception:
+            frame = None
+        if frame is not None:
+            current.update(mtime_ns=mtime_ns, size=size)
+            try:
+                set_current(root, current)
+            except OSError:
+                pass
+            return Dataset(frame, digest, str(path), current["raw_bytes"])
+
+    with recorder.span("load", f"parse {path.name}"):
+        raw = read_source(path)
+    with recorder.span("load", "apply schema"):
+        frame = add_missing_scores(apply_schema(raw))
+    current = {"format": CACHE_FORMAT, "version": f"v{CACHE_FORMAT}-{digest[:16]}", "source": str(path),
+               "mtime_ns": mtime_ns, "size": size, "sha256": digest, "raw_bytes": memory_bytes(raw)}
+    try:
+        publish(frame, root, current)
+        # Drop the parsed copy for the shared mapping
+        frame = attach(root, current)
+    except Exception:
+        pass
+    return Dataset(frame, digest, str(path), current["raw_bytes"])
@@ -0,0 +1,164 @@
+"""The Discussion page, written from the results of the analysis sections.
+
+``discussion`` reads every registered test through the engine once, in
+section order, and turns each result into a sentence (direction, statistic,
+p-value and effect size), so the page always matches the data and the
+filters. The results come from the engine's memo: once the sections have
+been computed (by a viewer or the prefetcher) the page costs a few dictionary
+lookups and some string formatting; a test nobody has run yet is computed
+once and shared like any other.
+"""
+import numpy as np
+
+from worklife.analyses import SECTIONS, analyses
+from worklife.effects import ALPHA, MAGNITUDES, effect_sizes
+from worklife.engine import engine
+from worklife.schema import LABELS
+
+# How variables read in a sentence
+NAMES = {
+    "Stress": "stress",
+    "LifeSatisf": "life satisfaction",
+    "income1to7": "income",
+    "perceivedhealth1to7": "perceived health",
+    "schooling1to3": "education level",
+    "LeisureCompOrNoSport": "current exercise habits",
+    "Childhood7to16SportsYesNo": "childhood sports participation",
+    "CompanySize": "company size",
+    "JobPositionEmployeeManager": "job position",
+}
+
+# How the compared groups read in a sentence (default: the schema labels)
+GROUPS = {
+    "CompanySize": {1: "employees of small companies", 2: "employees of large companies"},
+    "JobPositionEmployeeManager": {1: "employees", 2: "managers"},
+}
+
+# Discussion headings and the sections reported under each; sections not
+# listed here get a heading of their own
+HEADINGS = {
+    "Workplace Environment and Well-Being": ("Company Size & Wellbeing", "Employment Type Analysis"),
+    "Financial Factors and Well-Being": ("Income & Wellbeing",),
+    "Education and Well-Being": ("Education & Wellbeing",),
+    "Interplay Between Stress and Life Satisfaction": ("Life Satisfaction & Stress",),
+    "Health and Lifestyle Factors": ("Perceived Health & Stress", "Exercise Habits & Stress",
+                                     "Current Exercise Habits vs Childhood Sports History"),
+}
+
+SYMBOLS = {"ttest": "t", "anova": "F", "pearson": "r", "chi2": "χ²"}
+
+
+def _name(column):
+    return NAMES.get(column, column)
+
+
+def _group(column, level):
+    return GROUPS.get(column, {}).get(level) or str(LABELS.get(column, {}).get(level, f"{column} = {level}"))
+
+
+def _join(names):
+    return names[0] if len(names) == 1 else ", ".join(names[:-1]) + " and " + names[-1]
+
+
+def _p(p_value):
+    return "p < 0.001" if p_value < 0.001 else f"p = {p_value:.3f}"
+
+
+def _statistics(analysis, result):
+    """The parenthesis after a finding, e.g. ``(*r = -0.182, p < 0.001*; small)``."""
+    text = f"*{SYMBOLS[analysis.kind]} = {result.statistic:.3f}, {_p(result.p_value)}*"
+    effect = effect_sizes(analysis, result)[-1]
+    details = []
+    if analysis.kind != "pearson" and np.isfinite(effect.estimate):
+        details.append(f"{effect.name} = {effect.estimate:.2f}")  # r is the statistic already
+    if effect.magnitude:
+        details.append(effect.magnitude)
+    return f"({text}; {', '.join(details)})" if details else f"({text})"
+
+
+def finding(analysis, result):
+    """One sentence reporting ``result``."""
+    outcome, by = _name(analysis.outcome), _name(analysis.by)
+    if not np.isfinite(result.p_value):
+        return f"There were too few respondents to relate **{outcome}** to **{by}**."
+    stats = _statistics(analysis, result)
+    significant = result.p_value < ALPHA
+    if analysis.kind == "ttest":
+        first, second = (_group(analysis.by, level) for level in analysis.levels[:2])
+        if not significant:
+            return (f"There was **no significant difference** in **{outcome}** between **{first}** and "
+                    f"**{second}** {stats}.")
+        mean = result.details["mean"]
+        higher, lower = (first, second) if mean[0] > mean[1] else (second, first)
+        return f"**{higher.capitalize()}** reported **higher {outcome}** than **{lower}** {stats}."
+    if analysis.kind == "anova":
+        if not significant:
+            return f"**{outcome.capitalize()}** did **not differ significantly** across **{by}** {stats}."
+        mean = np.asarray(result.details["mean"], dtype=np.float64)
+        levels = [level for level, m in zip(analysis.levels, mean) if np.isfinite(m)]
+        mean = mean[np.isfinite(mean)]
+        return (f"**{outcome.capitalize()}** differed **significantly** across **{by}** {stats}, highest for "
+                f"{_group(analysis.by, levels[int(mean.argmax())])} and lowest for "
+                f"{_group(analysis.by, levels[int(mean.argmin())])}.")
+    if analysis.kind == "pearson":
+        if not significant:
+            return f"**{by.capitalize()}** was **not significantly correlated** with **{outcome}** {stats}."
+        direction = "higher" if result.statistic > 0 else "lower"
+        return f"Higher **{by}** went with **{direction} {outcome}** {stats}."
+    if not significant:
+        return f"There was **no significant association** between **{outcome}** and **{by}** {stats}."
+    return f"There was a **significant association** between **{outcome}** and **{by}** {stats}."
+
+
+def _conclusion(results):
+    tested = [(analysis, result) for analysis, result in results if np.isfinite(result.p_value)]
+    significant = [(analysis, result) for analysis, result in tested if result.p_value < ALPHA]
+    verb = "was" if len(significant) == 1 else "were"
+    lines = [f"{len(significant)} of the {len(tested)} tests {verb} significant at α = {ALPHA}."]
+
+    def strength(item):
+        analysis, result = item
+        effect = effect_sizes(analysis, result)[-1]
+        rank = MAGNITUDES.index(effect.magnitude) if effect.magnitude else -1
+        return -rank, result.p_value
+
+    strongest = sorted(significant, key=strength)[:3]
+    if strongest:
+        described = [f"{_name(a.outcome)} and {_name(a.by)} ({effect_sizes(a, r)[-1].magnitude or 'unknown size'})"
+                     for a, r in strongest]
+        lines.append("The strongest relationships were between " + "; ".join(described) + ".")
+    for outcome in ("Stress", "LifeSatisf"):
+        related = list(dict.fromkeys(_name(a.by if a.outcome == outcome else a.outcome)
+                                     for a, r in significant if outcome in (a.outcome, a.by)))
+        unrelated = list(dict.fromkeys(_name(a.by if a.outcome == outcome else a.outcome)
+                                       for a, r in tested if outcome in (a.outcome, a.by)
+                                       and r.p_value >= ALPHA))
+        if related:
+            lines.append(f"**{_name(outcome).capitalize()}** was related to {_join(related)}"
+                         + (f", but not to {_join(unrelated)}." if unrelated else "."))
+        elif unrelated:
+            lines.append(f"**{_name(outcome).capitalize()}** was not related to {_join(unrelated)}.")
+    return lines
+
+
+def discussion(dataset, stats=engine):
+    """Markdown of the Discussion page for ``dataset``, from the results of ``stats``."""
+    by_heading = {}
+    results = []
+    for section in SECTIONS:
+        heading = next((name for name, sections in HEADINGS.items() if section in sections), section)
+        for analysis in analyses(section):
+            result = stats.run(dataset, analysis)
+            results.append((analysis, result))
+            by_heading.setdefault(heading, []).append(finding(analysis, result))
+
+    parts = ["# **Summary and Discussion of Findings**",
+             "This study explored factors that may influence stress and life satisfaction: company size, "
+             "job position, income, education, perceived health and exercise habits. Every finding below is "
+             "computed from the data currently selected."]
+    for heading, findings in by_heading.items():
+        parts.append(f"## **{heading}**")
+        parts.append("\n".join(f"- {line}" for line in findings))
+    parts.append("## **Conclusion**")
+    parts.append(" ".join(_conclusion(results)))
+    return "\n\n".join(parts) + "\n"
@@ -0,0 +1,215 @@
+"""Effect sizes of the tests and the power to detect them.
+
+Every test reports how large its effect is, not only whether it passes
+p < 0.05:
+
+- t-tests: Cohen's d (pooled standard deviation) and Hedges' g, its
+  small-sample bias correction, with normal-approximation confidence intervals;
+- ANOVAs: eta squared and omega squared (less biased; clipped at 0);
+- correlations: r with its Fisher-z interval (``worklife.correlation``);
+- chi-square tests: Cramér's V (``worklife.associations``), with Cohen's w
+  for the power calculations.
+
+Magnitudes use Cohen's conventional small / medium / large thresholds.
+
+``power`` gives the power of each test for a total number of respondents
+(t-tests: two equal groups) and is built on SciPy's noncentral t, F and
+chi-square distribution ufuncs, so whole grids of effect sizes and sample
+sizes are evaluated in one broadcast call. ``sample_size`` inverts it by a
+bisection on integers that runs for all effect sizes at once.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import chdtri, chndtr, fdtri, ncfdtr, nctdtr, ndtr, ndtri, stdtrit
+
+ALPHA = 0.05
+CONFIDENCE = 0.95
+POWER = 0.8
+MAX_N = 10_000_000
+
+# Cohen's small, medium and large effects, by the scale of the estimate
+THRESHOLDS = {"d": (0.2, 0.5, 0.8), "eta2": (0.01, 0.06, 0.14), "r": (0.1, 0.3, 0.5), "w": (0.1, 0.3, 0.5)}
+MAGNITUDES = ("negligible", "small", "medium", "large")
+
+# Fewest respondents each test can be run on
+MIN_N = {"ttest": 4, "pearson": 4, "chi2": 2}
+
+
+@dataclass(frozen=True)
+class Effect:
+    name: str                   # "Cohen's d", "Hedges' g", "eta squared", "omega squared", "r" or "Cramér's V"
+    estimate: float
+    ci: tuple = (np.nan, np.nan)
+    magnitude: str = ""
+    power_kind: str = ""        # argument of ``power``/``sample_size`` for this effect
+    power_effect: float = np.nan  # the estimate on the scale ``power`` expects
+
+
+def magnitude(scale, value):
+    """"negligible", "small", "medium" or "large" by Cohen's thresholds; "" when unknown."""
+    if value is None or not np.isfinite(value):
+        return ""
+    return MAGNITUDES[int(np.searchsorted(THRESHOLDS[scale], abs(value), side="right"))]
+
+
+def cohens_d(n, mean, var, confidence=CONFIDENCE):
+    """Cohen's d and Hedges' g of the first group against the second, with their CIs.
+
+    ``n``, ``mean`` and ``var`` have the groups on the first axis (as
+    ``GroupMoments``); returns (d, d_low, d_high, g, g_low, g_high).
+    """
+    (n1, n2), (m1, m2), (v1, v2) = n[:2], mean[:2], var[:2]
+    z = ndtri(0.5 + confidence / 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d = (m1 - m2) / np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+        g = d * (1 - 3 / (4 * (n1 + n2) - 9))
+        half = [z * np.sqrt((n1 + n2) / (n1 * n2) + e * e / (2 * (n1 + n2))) for e in (d, g)]
+    return d, d - half[0], d + half[0], g, g - half[1], g + half[1]
+
+
+def eta_squared(n, mean, var):
+    """Eta squared and omega squared over all groups with observations (groups on the first axis)."""
+    n, mean, var = (np.asarray(a, dtype=np.float64) for a in (n, mean, var))
+    k = (n > 0).sum(axis=0)
+    total = n.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grand = np.nansum(n * mean, axis=0) / total
+        ss_between = np.nansum(n * (mean - grand) ** 2, axis=0)
+        ss_within = np.nansum((n - 1) * var, axis=0)
+        ms_within = ss_within / (total - k)
+        eta2 = ss_between / (ss_between + ss_within)
+        omega2 = np.maximum((ss_between - (k - 1) * ms_within) / (ss_between + ss_within + ms_within), 0.0)
+    return eta2, omega2
+
+
+def effect_sizes(analysis, result):
+    """The ``Effect``s of one test result, the headline one last."""
+    details = result.details
+    if analysis.kind == "ttest":
+        d, g = details.get("cohens_d", np.nan), details.get("hedges_g", np.nan)
+        return [Effect("Cohen's d", d, details.get("d_ci", (np.nan, np.nan)), magnitude("d", d), "ttest", abs(d)),
+                Effect("Hedges' g", g, details.get("g_ci", (np.nan, np.nan)), magnitude("d", g), "ttest", abs(g))]
+    if analysis.kind == "anova":
+        eta2, omega2 = details.get("eta_squared", np.nan), details.get("omega_squared", np.nan)
+        return [Effect("eta squared", eta2, magnitude=magnitude("eta2", eta2), power_kind="anova",
+                       power_effect=eta2),
+                Effect("omega squared", omega2, magnitude=magnitude("eta2", omega2), power_kind="anova",
+                       power_effect=omega2)]
+    if analysis.kind == "pearson":
+        r = result.statistic
+        return [Effect("r", r, details.get("ci", (np.nan, np.nan)), magnitude("r", r), "pearson", abs(r))]
+    w = details.get("cohens_w", np.nan)
+    return [Effect("Cramér's V", details.get("cramers_v", np.nan), magnitude=magnitude("w", w),
+                   power_kind="chi2", power_effect=w)]
+
+
+def describe(effects):
+    """One line for the effects of a test, e.g. ``r = -0.182 [-0.262, -0.100] (small)``."""
+    parts = []
+    for effect in effects:
+        text = f"{effect.name} = {effect.estimate:.3f}"
+        if np.isfinite(effect.ci).all():
+            text += f" [{effect.ci[0]:.3f}, {effect.ci[1]:.3f}]"
+        parts.append(text)
+    headline = effects[-1].magnitude
+    return "; ".join(parts) + (f" ({headline})" if headline else "")
+
+
+# ------------ Power ----------------#
+
+def _cdf(values):
+    # The noncentral CDFs return NaN rather than 0 where they underflow (large noncentralities)
+    return np.nan_to_num(values, nan=0.0)
+
+
+def power(kind, effect, n, alpha=ALPHA, groups=3, dof=1):
+    """Power of the test of ``kind`` to detect ``effect`` among ``n`` respondents in total.
+
+    ``effect`` is Cohen's d ("ttest", two equal groups), eta squared
+    ("anova", ``groups`` groups of equal size), r ("pearson") or Cohen's w
+    ("chi2" with ``dof`` degrees of freedom). ``effect`` and ``n`` broadcast
+    against each other, so a grid costs one call. Sample sizes too small for
+    the test give NaN.
+    """
+    effect = np.abs(np.asarray(effect, dtype=np.float64))
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if kind == "ttest":
+            dof_t = n - 2
+            critical = stdtrit(dof_t, 1 - alpha / 2)
+            noncentrality = effect * np.sqrt(n) / 2   # d * sqrt(n1 n2 / (n1 + n2)) with n1 = n2 = n/2
+            lower = _cdf(nctdtr(dof_t, noncentrality, -critical))
+            result = 1 - _cdf(nctdtr(dof_t, noncentrality, critical)) + lower
+            minimum = MIN_N["ttest"]
+        elif kind == "anova":
+            dof_between, dof_within = groups - 1, n - groups
+            critical = fdtri(dof_between, dof_within, 1 - alpha)
+            result = 1 - _cdf(ncfdtr(dof_between, dof_within, effect / (1 - effect) * n, critical))
+            minimum = groups + 1
+        elif kind == "pearson":
+            z = np.arctanh(np.minimum(effect, 1 - 1e-12)) * np.sqrt(n - 3)
+            critical = ndtri(1 - alpha / 2)
+            result = ndtr(z - critical) + ndtr(-z - critical)
+            minimum = MIN_N["pearson"]
+        elif kind == "chi2":
+            result = 1 - _cdf(chndtr(chdtri(dof, alpha), dof, effect * effect * n))
+            minimum = MIN_N["chi2"]
+        else:
+            raise ValueError(f"Unknown test: {kind!r}")
+    return np.where(n >= minimum, np.clip(result, 0.0, 1.0), np.nan)
+
+
+def power_grid(kind, effects, ns, alpha=ALPHA, groups=3, dof=1):
+    """Power for every (n, effect) pair: one row per n, one column per effect size."""
+    effects, ns = np.asarray(effects, dtype=np.float64), np.asarray(ns)
+    grid = power(kind, effects[None, :], ns[:, None], alpha, groups, dof)
+    return pd.DataFrame(grid, index=pd.Index(ns, name="respondents"), columns=effects)
+
+
+def sample_size(kind, effect, power_target=POWER, alpha=ALPHA, groups=3, dof=1, max_n=MAX_N):
+    """Fewest respondents giving at least ``power_target``; NaN when even ``max_n`` doesn't.
+
+    Works on arrays of effect sizes: every bisection step evaluates ``power``
+    for all of them in one call.
+    """
+    effect = np.asarray(effect, dtype=np.float64)
+    minimum = groups + 1 if kind == "anova" else MIN_N[kind]
+    low = np.full(effect.shape, minimum, dtype=np.int64)
+    high = np.full(effect.shape, max_n, dtype=np.int64)
+
+    def enough(n):
+        return power(kind, effect, n, alpha, groups, dof) >= power_target
+
+    reachable = enough(high)
+    done_at_minimum = enough(low)
+    # Invariant: power(low) < target <= power(high)
+    while np.any(high - low > 1):
+        middle = (low + high) // 2
+        ok = enough(middle)
+        high = np.where(ok, middle, high)
+        low = np.where(ok, low, middle)
+    n = np.where(done_at_minimum, low, high).astype(np.float64)
+    return np.where(reachable, n, np.nan)[()]
+
+
+def effect_table(results, alpha=ALPHA, power_target=POWER, confidence=CONFIDENCE):
+    """One row per effect of each (section, analysis, result), with the sample size to detect it."""
+    records = []
+    for section, analysis, result in results:
+        n = result.details.get("n", np.nan)
+        n = sum(n) if isinstance(n, tuple) else n
+        groups = len(analysis.levels) or 3
+        for effect in effect_sizes(analysis, result):
+            needed = np.nan
+            if effect.power_kind and np.isfinite(effect.power_effect) and effect.power_effect > 0:
+                needed = sample_size(effect.power_kind, effect.power_effect, power_target, alpha,
+                                     groups=groups, dof=result.details.get("dof", 1))
+            records.append({"section": section, "outcome": analysis.outcome, "by": analysis.by,
+                            "effect": effect.name, "estimate": effect.estimate,
+                            f"CI low ({confidence:.0%})": effect.ci[0],
+                            f"CI high ({confidence:.0%})": effect.ci[1],
+                            "magnitude": effect.magnitude, "n": n,
+                            f"n for {power_target:.0%} power": needed})
+    return pd.DataFrame(records)
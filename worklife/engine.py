@@ -0,0 +1,270 @@
+"""Runs the analyses declared in ``worklife.analyses``.
+
+Results are memoized on (dataset fingerprint, analysis key): a test is computed
+once per dataset and process, however often the sidebar changes and however
+many sessions look at it. The results of the ``MAX_DATASETS`` most recently
+used datasets are kept; every filter combination is a dataset of its own, so
+a long-running server drops the results of subsets nobody looks at any more
+(the shared store still has them).
+
+T-tests and ANOVAs that share a grouping are computed together: the first one
+requested runs all of its registered siblings in one batched comparison.
+
+Concurrent requests for the same result (viewers opening one section at the
+same time, the prefetcher warming the section a viewer just opened) compute
+it once; the others wait for that computation. The process-wide ``engine``
+also goes through the shared store of ``worklife.store``, so the server
+processes of a machine compute each result once between them.
+
+The tests only use ``group_moments``, ``crosstab`` and ``correlations`` of the
+dataset, so they run the same on a ``Dataset`` and on the accumulated
+statistics of a streamed file (``worklife.streaming.SurveySummary``).
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from worklife.analyses import SECTIONS, analyses
+from worklife.associations import association_test, screen_associations
+from worklife.comparisons import adjust_pvalues, anova, compare_groups, welch
+from worklife.effects import cohens_d, effect_table, eta_squared
+from worklife.instrumentation import recorder
+from worklife.regression import logistic, model_comparison, ols
+from worklife.resampling import N_RESAMPLES, SEED, resample
+from worklife.store import SingleFlight, shared_results
+
+ALPHA = 0.05
+MAX_DATASETS = 48  # datasets whose results the memo keeps, least recently used dropped first
+
+
+@dataclass(frozen=True)
+class Result:
+    statistic: float
+    p_value: float
+    details: dict = field(default_factory=dict, compare=False)
+
+    @property
+    def significant(self):
+        return self.p_value < ALPHA
+
+
+# Each test function returns {analysis key: Result}, so one call may fill in
+# several analyses at once.
+
+def _siblings(analysis):
+    """Outcomes of every registered analysis that shares this one's grouping."""
+    outcomes = [analysis.outcome]
+    for other in analyses():
+        if (other.kind, other.by, other.levels) == (analysis.kind, analysis.by, analysis.levels) \
+                and other.outcome not in outcomes:
+            outcomes.append(other.outcome)
+    return outcomes
+
+
+def _group_test(dataset, analysis):
+    outcomes = _siblings(analysis)
+    moments = dataset.group_moments(analysis.by, outcomes, analysis.levels)
+    if analysis.kind == "ttest":
+        statistic, dof, p = welch(moments)
+        d, d_low, d_high, g, g_low, g_high = cohens_d(moments.n, moments.mean, moments.var)
+    else:
+        statistic, dof, p = anova(moments)
+        eta2, omega2 = eta_squared(moments.n, moments.mean, moments.var)
+    results = {}
+    for i, outcome in enumerate(outcomes):
+        details = {"n": tuple(int(n) for n in moments.n[:, i]),
+                   "mean": tuple(float(m) for m in moments.mean[:, i]),
+                   "var": tuple(float(v) for v in moments.var[:, i])}
+        if analysis.kind == "ttest":
+            details.update(dof=float(dof[i]), cohens_d=float(d[i]), d_ci=(float(d_low[i]), float(d_high[i])),
+                           hedges_g=float(g[i]), g_ci=(float(g_low[i]), float(g_high[i])))
+        else:
+            details.update(dof=(float(dof[0][i]), float(dof[1][i])), eta_squared=float(eta2[i]),
+                           omega_squared=float(omega2[i]))
+        key = (analysis.kind, outcome, analysis.by, analysis.levels)
+        results[key] = Result(float(statistic[i]), float(p[i]), details)
+    return results
+
+
+def _pearson(dataset, analysis):
+    # Every pair comes out of the dataset's correlation matrix
+    r, p_value, n, ci_low, ci_high = dataset.correlations.pair(analysis.outcome, analysis.by)
+    return {analysis.key: Result(r, p_value, {"n": n, "ci": (ci_low, ci_high)})}
+
+
+def _chi2(dataset, analysis):
+    association = association_test(dataset.crosstab(analysis.outcome, analysis.by))
+    return {analysis.key: Result(association.statistic, association.p_value,
+                                 {"dof": association.dof, "n": association.n,
+                                  "cramers_v": association.cramers_v, "cohens_w": association.cohens_w,
+                                  "method": association.method, "warning": association.warning})}
+
+
+TESTS = {"ttest": _group_test, "anova": _group_test, "pearson": _pearson, "chi2": _chi2}
+
+
+def _correlations(dataset, block):
+    columns = list(block.columns) or dataset.correlations.columns
+    return dataset.correlations.to_frame(columns)
+
+
+def _screening(dataset, block):
+    """Every outcome against every grouping column, with one correction over the whole family."""
+    tables = []
+    for by in block.by:
+        table = compare_groups(dataset, by, block.columns)
+        tables.append(table[["outcome", "test", "statistic", "p-value"]].assign(factor=by))
+    screening = pd.concat(tables, ignore_index=True)[["factor", "outcome", "test", "statistic", "p-value"]]
+    if block.correction:
+        screening[f"p ({block.correction})"] = adjust_pvalues(screening["p-value"], block.correction)
+    return screening.sort_values("p-value", kind="stable").reset_index(drop=True)
+
+
+def _associations(dataset, block):
+    """Every pair of coded columns, with one correction over the whole family."""
+    table = screen_associations(dataset, block.columns)
+    if block.correction:
+        table[f"p ({block.correction})"] = adjust_pvalues(table["p-value"], block.correction)
+    return table.sort_values("p-value", kind="stable").reset_index(drop=True)
+
+
+def _effects(dataset, block, stats):
+    """Effect sizes of every registered test, from the results ``stats`` has (or computes once)."""
+    results = [(section, analysis, stats.run(dataset, analysis))
+               for section in SECTIONS for analysis in analyses(section)]
+    return effect_table(results)
+
+
+def _ols(dataset, block):
+    return ols(dataset.designs.get(block.outcome, block.columns))
+
+
+def _subsets(dataset, block):
+    return model_comparison(dataset.designs.get(block.outcome, block.columns))
+
+
+def _logit(dataset, block):
+    return logistic(dataset.designs.get(block.outcome, block.columns), block.levels)
+
+
+TABLES = {"correlations": _correlations, "screening": _screening, "associations": _associations,
+          "ols": _ols, "subsets": _subsets, "logit": _logit}
+
+# Tables built from the results of the tests, read through an engine so they
+# reuse the results already computed
+RESULT_TABLES = {"effects": _effects}
+
+# Tables fitted on the rows themselves, which a streamed SurveySummary doesn't keep
+ROW_TABLES = {"ols", "subsets", "logit"}
+
+
+def compute_table(dataset, block, stats=None):
+    """The DataFrame shown by a ``Table`` block; ``stats`` (default: a new engine) runs the tests."""
+    if block.kind in RESULT_TABLES:
+        return RESULT_TABLES[block.kind](dataset, block, StatsEngine() if stats is None else stats)
+    return TABLES[block.kind](dataset, block)
+
+
+def _span_name(analysis):
+    return f"{analysis.kind} {analysis.outcome} by {analysis.by}"
+
+
+class StatsEngine:
+    def __init__(self, store=None, max_datasets=MAX_DATASETS):
+        self.store = store  # a worklife.store.SharedResults, or None for this process only
+        self.max_datasets = max_datasets
+        self._results = OrderedDict()  # fingerprint -> {key: result}, least recently used first
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def cached(self, dataset, analysis):
+        """The memoized result, or None if it hasn't been computed yet."""
+        with self._lock:
+            return self._results.get(dataset.fingerprint, {}).get(analysis.key)
+
+    def _memo(self, fingerprint):
+        # Called with self._lock held: the results of one dataset, now the most recently used
+        memo = self._results.get(fingerprint)
+        if memo is None:
+            memo = self._results[fingerprint] = {}
+            while len(self._results) > self.max_datasets:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(fingerprint)
+        return memo
+
+    def _get(self, key):
+        with self._lock:
+            return self._memo(key[0]).get(key[1])
+
+    def _keep(self, key, result):
+        """Memoize ``result`` unless another call got there first; returns the memoized one."""
+        with self._lock:
+            return self._memo(key[0]).setdefault(key[1], result)
+
+    def _memoized(self, key, compute):
+        """The memo, then the shared store, then ``compute()``; concurrent misses of a key compute once."""
+        result = self._get(key)
+        if result is not None:
+            return result
+
+        def load():
+            # A call for the same key may have finished since the first look
+            result = self._get(key)
+            if result is None:
+                result = compute() if self.store is None else self.store.get_or_compute(key, compute)
+                result = self._keep(key, result)
+            return result
+
+        return self._flight.do(key, load)
+
+    def run(self, dataset, analysis):
+        key = (dataset.fingerprint, analysis.key)
+
+        def compute():
+            with recorder.span("test", _span_name(analysis)):
+                computed = TESTS[analysis.kind](dataset, analysis)
+            # Siblings computed along the way are kept (and shared) too
+            for other_key, other in computed.items():
+                if other_key != analysis.key:
+                    self._keep((dataset.fingerprint, other_key), other)
+                    if self.store is not None:
+                        self.store.put((dataset.fingerprint, other_key), other)
+            return computed[analysis.key]
+
+        return self._memoized(key, compute)
+
+    def table(self, dataset, block):
+        """Memoized ``compute_table``; callers must not modify the returned frame."""
+        def compute():
+            with recorder.span("table", " ".join(filter(None, (block.kind, block.outcome)))):
+                return compute_table(dataset, block, self)
+
+        return self._memoized((dataset.fingerprint, block), compute)
+
+    def resampled(self, dataset, analysis, n_resamples=N_RESAMPLES, seed=SEED):
+        """Memoized permutation p-value and bootstrap CI (``worklife.resampling``)."""
+        def compute():
+            with recorder.span("resample", _span_name(analysis)):
+                return resample(dataset, analysis, n_resamples, seed)
+
+        key = (dataset.fingerprint, ("resample",) + analysis.key + (n_resamples, seed))
+        return self._memoized(key, compute)
+
+    def forget(self, fingerprint):
+        """Drop every result computed for one dataset."""
+        with self._lock:
+            self._results.pop(fingerprint, None)
+
+
+# Shared by everything in the process (all Streamlit sessions included) and,
+# through the store, with the other server processes
+engine = StatsEngine(shared_results)
+
+
+def run_all(dataset, stats=engine):
+    """Run every analysis of every section; returns {section: [(analysis, result), ...]}."""
+    return {section: [(analysis, stats.run(dataset, analysis)) for analysis in analyses(section)]
+            for section in SECTIONS}
@@ -0,0 +1,132 @@
+"""Rendered figures, cached as image bytes.
+
+Every viewer of a section sees the same charts, so each ``Plot`` is drawn
+once per (dataset fingerprint, plot, theme, format) and the encoded PNG/SVG
+bytes are kept in a least-recently-used cache with a total byte budget.
+Figures are closed as soon as they have been encoded, so long-running servers
+don't accumulate them. Concurrent requests for a figure that isn't cached yet
+draw it once, and the bytes are also kept in the shared store of
+``worklife.store`` for the other server processes.
+
+matplotlib, seaborn and the plotting code are imported by the first figure
+drawn, not with this module: together they take most of the app's start-up
+time, and a viewer reading a section without figures never needs them.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from worklife.instrumentation import recorder
+from worklife.store import SingleFlight, shared_results
+
+# The same savefig options st.pyplot uses, so cached images look identical
+SAVE_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+
+THEMES = {"light": "default", "dark": "dark_background"}
+
+# Above this many rows figures are drawn from summary statistics (see worklife.summaries)
+SUMMARY_ROWS = int(os.environ.get("WORKLIFE_SUMMARY_ROWS", 100_000))
+
+# pyplot and seaborn keep global state and are not safe to drive from
+# several threads at once.
+_draw_lock = threading.Lock()
+
+
+class FigureCache:
+    """LRU cache of image bytes bounded by their total size."""
+
+    def __init__(self, max_bytes=64 << 20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._items.move_to_end(key)
+            return data
+
+    def peek(self, key):
+        """Like ``get``, without counting a hit or miss or refreshing the entry."""
+        with self._lock:
+            return self._items.get(key)
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+figure_cache = FigureCache(int(os.environ.get("WORKLIFE_FIGURE_CACHE_MB", 64)) << 20)
+_flight = SingleFlight()
+
+
+def resolve_mode(dataset, mode="auto"):
+    if mode == "auto":
+        return "summary" if len(dataset.frame) > SUMMARY_ROWS else "raw"
+    return mode
+
+
+def render_figure(dataset, plot, theme="light", fmt="png", mode="raw"):
+    """Draw ``plot`` and return the encoded image bytes, closing the figure."""
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    from worklife.plots import draw
+
+    with _draw_lock, matplotlib.style.context(THEMES.get(theme, "default")), \
+            recorder.span("figure", f"{plot.kind} {plot.title or plot.y or plot.x} [{mode}]"):
+        fig = draw(dataset, plot, mode)
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, **SAVE_OPTIONS)
+        finally:
+            plt.close(fig)
+    return buffer.getvalue()
+
+
+def render(dataset, plot, theme="light", fmt="png", mode="auto", cache=figure_cache, store=shared_results):
+    """Image bytes for ``plot``, from the cache (or the shared store) when it was rendered before.
+
+    ``mode`` is "raw", "summary" or "auto" (summary above ``SUMMARY_ROWS`` rows).
+    """
+    mode = resolve_mode(dataset, mode)
+    key = (dataset.fingerprint, plot, theme, fmt, mode)
+    data = cache.get(key)
+    if data is None:
+        def load():
+            data = cache.peek(key)
+            if data is None:
+                def draw():
+                    return render_figure(dataset, plot, theme, fmt, mode)
+
+                data = draw() if store is None else store.get_or_compute(("figure",) + key, draw)
+                cache.put(key, data)
+            return data
+
+        data = _flight.do(key, load)
+    return data
@@ -0,0 +1,133 @@
+"""Row positions of every group, computed once per dataset.
+
+The sections compare outcomes between the groups of a coded column
+(company size, job position, education, exercise habits, ...). Building those
+groups with boolean masks rescans the whole frame for every group of every
+outcome. ``GroupIndex`` instead sorts the rows of each grouping column once
+(a stable permutation plus the offset where each group starts), after which
+every group is a contiguous slice of the permuted rows.
+
+``extended`` derives the index of a frame with rows appended
+(``worklife.updates``) from this one: only the new rows are sorted, and each
+group's new rows follow its old ones, which is the permutation a full sort
+would give.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class GroupIndex:
+    def __init__(self, frame):
+        self._frame = frame
+        self._orders = {}   # column -> (levels, order, offsets)
+        self._sorted = {}   # (column, outcome) -> (outcome values in group order, offsets)
+        self._lock = threading.Lock()
+
+    def _order(self, column):
+        entry = self._orders.get(column)
+        if entry is None:
+            with self._lock:
+                entry = self._orders.get(column)
+                if entry is None:
+                    entry = self._orders[column] = _build_order(self._frame[column])
+        return entry
+
+    def extended(self, frame):
+        """The index of ``frame``, whose first rows are the rows this index was built on.
+
+        Group layouts already built here are extended with the new rows only;
+        the others are built from ``frame`` when first used.
+        """
+        start = len(self._frame)
+        index = GroupIndex(frame)
+        with self._lock:
+            orders = dict(self._orders)
+        for column, (levels, order, offsets) in orders.items():
+            values = frame[column]
+            # Appended categories come after the old ones (see worklife.updates)
+            if not isinstance(values.dtype, pd.CategoricalDtype) or \
+                    list(values.cat.categories[:len(levels)]) != levels:
+                continue
+            all_levels, new_order, new_offsets = _build_order(values.iloc[start:])
+            new_order = new_order + start
+            # Missing rows first, then each group's old rows followed by its new ones
+            pieces = [order[:offsets[0]], new_order[:new_offsets[0]]]
+            counts = np.zeros(len(all_levels), dtype=np.int64)
+            for i in range(len(all_levels)):
+                if i < len(levels):
+                    pieces.append(order[offsets[i]:offsets[i + 1]])
+                    counts[i] += offsets[i + 1] - offsets[i]
+                pieces.append(new_order[new_offsets[i]:new_offsets[i + 1]])
+                counts[i] += new_offsets[i + 1] - new_offsets[i]
+            missing = offsets[0] + new_offsets[0]
+            index._orders[column] = (all_levels, np.concatenate(pieces),
+                                     np.concatenate([[0], np.cumsum(counts)]) + missing)
+        return index
+
+    def layout(self, column):
+        """(levels, order, offsets): rows ``order[offsets[i]:offsets[i + 1]]`` form group i."""
+        return self._order(column)
+
+    def levels(self, column):
+        """Group codes of ``column`` in sorted order."""
+        return self._order(column)[0]
+
+    def counts(self, column):
+        return np.diff(self._order(column)[2])
+
+    def positions(self, column, level):
+        """Row positions (into the frame) of the rows in one group."""
+        levels, order, offsets = self._order(column)
+        i = levels.index(level)
+        return order[offsets[i]:offsets[i + 1]]
+
+    def sorted_values(self, column, outcome):
+        """(values, offsets): ``outcome`` as float64 with missing answers dropped,
+        reordered so group i of ``column`` is ``values[offsets[i]:offsets[i + 1]]``."""
+        key = (column, outcome)
+        entry = self._sorted.get(key)
+        if entry is None:
+            levels, order, offsets = self._order(column)
+            # Nullable Int8/Int16 columns hold pd.NA, which to_numpy() would keep as objects
+            values = self._frame[outcome].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+            present = ~np.isnan(values)
+            if not present.all():
+                kept = np.concatenate([[0], np.cumsum(present)])
+                values, offsets = values[present], kept[offsets]
+            entry = self._sorted[key] = values, offsets
+        return entry
+
+    def split(self, column, outcome, levels=None):
+        """Values of ``outcome`` for each group of ``column``, missing answers dropped.
+
+        Returns one float64 array per level (all levels by default), each a
+        view into the cached sorted copy of ``outcome``.
+        """
+        all_levels = self._order(column)[0]
+        values, offsets = self.sorted_values(column, outcome)
+        if levels is None:
+            levels = all_levels
+        slices = []
+        for level in levels:
+            i = all_levels.index(level)
+            slices.append(values[offsets[i]:offsets[i + 1]])
+        return slices
+
+
+def codes_and_levels(values):
+    """Integer codes (-1 for missing) and the sorted levels they index."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), list(values.cat.categories)
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, list(uniques)
+
+
+def _build_order(values):
+    codes, levels = codes_and_levels(values)
+    # Missing values get code -1, so they sort first and sit before offsets[0]
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[codes >= 0], minlength=len(levels))
+    offsets = np.concatenate([[0], np.cumsum(counts)]) + np.count_nonzero(codes < 0)
+    return levels, order, offsets
@@ -0,0 +1,157 @@
+"""Where a rerun spends its time: wall time, CPU time and peak allocations.
+
+The loader, the engine and the figure renderer wrap their work in
+``recorder.span(category, name)``. While the recorder is disabled (the
+default) ``span`` returns a shared no-op context manager, so the only cost is
+one attribute check per computation; cache hits aren't instrumented at all.
+
+Enabled (``WORKLIFE_PROFILE=1`` or from the app's developer panel), every
+span adds to per-(category, name) totals: count, wall time, CPU time of the
+calling thread and, when memory tracing is on, the peak of memory allocated
+during the span as seen by ``tracemalloc``. Peaks of nested spans in one
+thread are carried up to the enclosing span; spans running concurrently in
+other threads (background prefetching) share tracemalloc's single peak
+counter, so their peaks are approximate.
+
+The totals can be exported as JSON or in the Prometheus text format.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+@dataclass
+class SpanStats:
+    category: str
+    name: str
+    count: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    max_wall_seconds: float = 0.0
+    peak_bytes: int = 0       # largest allocation peak of a single call (0 without tracing)
+
+
+class _Span:
+    __slots__ = ("recorder", "key", "wall", "cpu", "start_bytes", "peak_seen")
+
+    def __init__(self, recorder, category, name):
+        self.recorder = recorder
+        self.key = (category, name)
+
+    def __enter__(self):
+        self.peak_seen = 0
+        if self.recorder.trace_memory and tracemalloc.is_tracing():
+            self.start_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            self.start_bytes = None
+        self.recorder._stack().append(self)
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        peak = 0
+        stack = self.recorder._stack()
+        stack.pop()
+        if self.start_bytes is not None and tracemalloc.is_tracing():
+            absolute = max(tracemalloc.get_traced_memory()[1], self.peak_seen)
+            peak = max(absolute - self.start_bytes, 0)
+            if stack:
+                stack[-1].peak_seen = max(stack[-1].peak_seen, absolute)
+        self.recorder._add(self.key, wall, cpu, peak)
+        return False
+
+
+class Recorder:
+    def __init__(self, enabled=False, trace_memory=False):
+        self.enabled = False
+        self.trace_memory = False
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if enabled:
+            self.enable(trace_memory)
+
+    def enable(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+
+    def span(self, category, name):
+        """Context manager timing one piece of work; a no-op while disabled."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, category, name)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, key, wall, cpu, peak):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = SpanStats(*key)
+            stats.count += 1
+            stats.wall_seconds += wall
+            stats.cpu_seconds += cpu
+            stats.max_wall_seconds = max(stats.max_wall_seconds, wall)
+            stats.peak_bytes = max(stats.peak_bytes, peak)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        """Totals per span, slowest first, as plain dicts."""
+        with self._lock:
+            stats = [asdict(s) for s in self._stats.values()]
+        return sorted(stats, key=lambda s: s["wall_seconds"], reverse=True)
+
+    def to_json(self):
+        return json.dumps({"spans": self.snapshot(), "trace_memory": self.trace_memory}, indent=2)
+
+    def to_prometheus(self, prefix="worklife"):
+        metrics = [
+            ("span_calls_total", "counter", "Number of instrumented calls.", "count"),
+            ("span_wall_seconds_total", "counter", "Wall time spent in the span.", "wall_seconds"),
+            ("span_cpu_seconds_total", "counter", "CPU time of the calling thread.", "cpu_seconds"),
+            ("span_max_wall_seconds", "gauge", "Slowest single call.", "max_wall_seconds"),
+            ("span_peak_bytes", "gauge", "Largest allocation peak of a single call.", "peak_bytes"),
+        ]
+        snapshot = self.snapshot()
+        lines = []
+        for metric, kind, help_text, field in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for stats in snapshot:
+                labels = f'category="{_escape(stats["category"])}",name="{_escape(stats["name"])}"'
+                lines.append(f"{prefix}_{metric}{{{labels}}} {stats[field]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared by everything in the process, like the stats engine
+recorder = Recorder(enabled=os.environ.get("WORKLIFE_PROFILE", "") not in ("", "0"),
+                    trace_memory=os.environ.get("WORKLIFE_PROFILE_MEMORY", "1") != "0")
@@ -0,0 +1,163 @@
+"""Survey frames published as memory-mapped column files.
+
+The loader writes the typed frame once; every process that loads the same
+survey afterwards maps the file and wraps its bytes in a DataFrame without
+copying them, so however many server processes run, the operating system's
+page cache holds a single physical copy of the data.
+
+Each survey file gets a directory in the cache directory::
+
+    Cleaned_Work_life-1a2b3c4d5e.mapped/
+        CURRENT                  JSON: the live version and the source it was parsed from
+        v4-0123456789abcdef/     one directory per version, never changed once published
+            columns.bin          every column's array, 64-byte aligned
+            schema.json          name, kind, dtype and offsets of each column
+
+A new version is written to a temporary directory and renamed into place,
+then ``CURRENT`` is replaced atomically (``os.replace``), so a reader sees
+either the old version or the new one, never half of either. Older versions
+are removed after the swap; processes that still map them keep their pages
+(the file is only unlinked) and the next load attaches the new version; a
+load that loses a race with a swap falls back to parsing the source.
+
+Columns are stored by kind: plain NumPy arrays as they are, categoricals as
+their codes (categories in the schema), nullable integer/float/boolean columns
+as values plus a mask. Anything else (text) is stored as codes and rebuilt on
+attach, which copies it. The arrays of an attached frame are read-only.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ALIGNMENT = 64
+CURRENT = "CURRENT"
+COLUMNS = "columns.bin"
+SCHEMA = "schema.json"
+
+
+def _encode(values):
+    """(schema entry, [arrays]) of one column."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return ({"kind": "category", "categories": dtype.categories.tolist(),
+                 "categories_dtype": str(dtype.categories.dtype), "ordered": bool(dtype.ordered)},
+                [np.asarray(values.array.codes)])
+    if isinstance(values.array, (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)):
+        numpy_dtype = dtype.numpy_dtype
+        data = values.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0))
+        return {"kind": "masked", "dtype": str(dtype)}, [data, values.isna().to_numpy()]
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufmM":
+        return {"kind": "array"}, [values.to_numpy()]
+    codes, uniques = pd.factorize(values)
+    return {"kind": "encoded", "dtype": str(dtype), "uniques": uniques.tolist()}, [codes]
+
+
+def _decode(entry, arrays):
+    kind = entry["kind"]
+    if kind == "category":
+        categories = pd.Index(entry["categories"], dtype=entry["categories_dtype"])
+        dtype = pd.CategoricalDtype(categories, ordered=entry["ordered"])
+        return pd.Categorical.from_codes(arrays[0], dtype=dtype)
+    if kind == "masked":
+        data, mask = arrays
+        return pd.api.types.pandas_dtype(entry["dtype"]).construct_array_type()(data, mask, copy=False)
+    if kind == "array":
+        return arrays[0]
+    # Code -1 (missing) picks the None appended at the end
+    uniques = np.array(entry["uniques"] + [None], dtype=object)
+    return pd.array(uniques[arrays[0]], dtype=entry["dtype"])
+
+
+def _write_version(frame, directory):
+    columns, offset = [], 0
+    with open(directory / COLUMNS, "wb") as handle:
+        for name in frame.columns:
+            entry, arrays = _encode(frame[name])
+            entry["name"] = name
+            entry["arrays"] = []
+            for array in arrays:
+                array = np.ascontiguousarray(array)
+                padding = -offset % ALIGNMENT
+                handle.write(b"\0" * padding)
+                offset += padding
+                handle.write(array.tobytes())
+                entry["arrays"].append({"dtype": array.dtype.str, "offset": offset, "length": len(array)})
+                offset += array.nbytes
+            columns.append(entry)
+    with open(directory / SCHEMA, "w") as handle:
+        json.dump({"rows": len(frame), "columns": columns}, handle)
+
+
+def read_current(root):
+    """The ``CURRENT`` record of a published survey, or None."""
+    try:
+        with open(Path(root) / CURRENT) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def set_current(root, current):
+    """Atomically point ``root`` at ``current`` (a record naming a published version)."""
+    root = Path(root)
+    tmp = root / f"{CURRENT}.{os.getpid()}.tmp"
+    with open(tmp, "w") as handle:
+        json.dump(current, handle)
+    os.replace(tmp, root / CURRENT)
+
+
+def publish(frame, root, current):
+    """Write ``frame`` as version ``current["version"]`` of ``root`` and make it current.
+
+    ``current`` is stored as the ``CURRENT`` record. A version another process
+    has already published is reused as it is.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    version = root / current["version"]
+    if not (version / SCHEMA).exists():
+        tmp = root / f".{current['version']}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        try:
+            _write_version(frame, tmp)
+            os.rename(tmp, version)
+        except OSError:
+            # Lost the race to another process publishing the same version
+            if not (version / SCHEMA).exists():
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    set_current(root, current)
+    for old in root.iterdir():
+        if old.is_dir() and not old.name.startswith(".") and old.name != current["version"]:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _map_version(directory):
+    with open(directory / SCHEMA) as handle:
+        schema = json.load(handle)
+    path = directory / COLUMNS
+    # An empty file (no rows) can't be mapped
+    buffer = np.memmap(path, dtype=np.uint8, mode="r") if path.stat().st_size else np.zeros(0, np.uint8)
+    data = {}
+    for entry in schema["columns"]:
+        arrays = []
+        for spec in entry["arrays"]:
+            dtype = np.dtype(spec["dtype"])
+            start = spec["offset"]
+            arrays.append(np.asarray(buffer[start:start + spec["length"] * dtype.itemsize]).view(dtype))
+        data[entry["name"]] = _decode(entry, arrays)
+    return pd.DataFrame(data, index=pd.RangeIndex(schema["rows"]), copy=False)
+
+
+def attach(root, current):
+    """The frame of the version named by ``current``, backed by the mapped file.
+
+    Raises ``OSError`` when that version isn't there (any more).
+    """
+    return _map_version(Path(root) / current["version"])
@@ -0,0 +1,150 @@
+"""Draws the ``Plot`` blocks of ``worklife.analyses``.
+
+There are two ways to draw each plot. "raw" mode hands the rows to seaborn,
+as the app always did. "summary" mode draws from the statistics in
+``worklife.summaries`` and is meant for cohorts too large for seaborn.
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+
+from worklife.groups import codes_and_levels
+from worklife.schema import LABELS, label
+from worklife.summaries import binned_kde, box_stats, histogram, linear_fit_band, point_counts
+
+
+def _box(dataset, plot, ax):
+    frame = dataset.frame
+    x = label(frame[plot.x], plot.x) if plot.labelled else frame[plot.x]
+    palette = list(plot.palette) if isinstance(plot.palette, tuple) else plot.palette
+    sns.boxplot(x=x, y=frame[plot.y], ax=ax, palette=palette)
+
+
+def _hist(dataset, plot, ax):
+    groups = dataset.groups.split(plot.hue, plot.x, plot.levels)
+    for values, color, name in zip(groups, plot.colors, plot.labels):
+        sns.histplot(values, color=color, label=name, kde=True, alpha=0.6, ax=ax)
+    ax.legend()
+
+
+def _reg(dataset, plot, ax):
+    frame = dataset.frame
+    sns.regplot(x=frame[plot.x], y=frame[plot.y], ax=ax, scatter_kws={'alpha': 0.6}, line_kws={'color': 'red'})
+
+
+def _scatter(dataset, plot, ax):
+    frame = dataset.frame
+    sns.scatterplot(x=frame[plot.x], y=frame[plot.y], ax=ax, alpha=0.6, color=plot.color)
+
+
+def _count(dataset, plot, ax):
+    sns.countplot(data=dataset.frame, x=plot.x, hue=plot.hue, ax=ax, palette=plot.palette)
+
+
+def _heatmap(dataset, plot, ax):
+    r = dataset.correlations.r_frame(plot.columns)
+    sns.heatmap(r, vmin=-1, vmax=1, cmap="coolwarm", annot=True, fmt=".2f", square=True, ax=ax)
+
+
+DRAW = {"box": _box, "hist": _hist, "reg": _reg, "scatter": _scatter, "count": _count, "heatmap": _heatmap}
+
+
+# ------------ Summary mode ----------------#
+
+def _tick_labels(plot, levels):
+    labels = LABELS.get(plot.x, {}) if plot.labelled else {}
+    return [labels.get(level, str(level)) for level in levels]
+
+
+def _colors(palette, count):
+    if palette is None:
+        return [sns.color_palette()[0]] * count
+    return sns.color_palette(list(palette) if isinstance(palette, tuple) else palette, count)
+
+
+def _box_summary(dataset, plot, ax):
+    levels = dataset.groups.levels(plot.x)
+    stats = box_stats(dataset.groups.split(plot.x, plot.y))
+    for entry, name in zip(stats, _tick_labels(plot, levels)):
+        entry["label"] = name
+    boxes = ax.bxp(stats, positions=range(len(stats)), widths=0.8, patch_artist=True,
+                   medianprops={"color": "0.25"}, flierprops={"marker": "o", "markerfacecolor": "none"})
+    for patch, color in zip(boxes["boxes"], _colors(plot.palette, len(stats))):
+        patch.set_facecolor(color)
+    ax.set_xlabel(plot.x)
+    ax.set_ylabel(plot.y)
+
+
+def _hist_summary(dataset, plot, ax):
+    groups = dataset.groups.split(plot.hue, plot.x, plot.levels)
+    for values, color, name in zip(groups, plot.colors, plot.labels):
+        counts, edges = histogram(values)
+        widths = np.diff(edges)
+        ax.bar(edges[:-1], counts, width=widths, align="edge", color=color, alpha=0.6,
+               edgecolor="black", linewidth=0.5, label=name)
+        grid, density = binned_kde(values)
+        # Scale the density to counts per bin, like histplot(kde=True)
+        ax.plot(grid, density * counts.sum() * widths.mean(), color=color)
+    ax.set_xlabel(plot.x)
+    ax.set_ylabel("Count")
+    ax.legend()
+
+
+def _points(ax, x, y, **kwargs):
+    xs, ys, counts = point_counts(x, y)
+    # Marker area grows with the number of rows at a point, from seaborn's default size up
+    sizes = 36 * (1 + np.log10(counts))
+    ax.scatter(xs, ys, s=sizes, **kwargs)
+
+
+def _reg_summary(dataset, plot, ax):
+    frame = dataset.frame
+    _points(ax, frame[plot.x], frame[plot.y], alpha=0.6)
+    grid, fit, low, high = linear_fit_band(frame[plot.x], frame[plot.y])
+    ax.plot(grid, fit, color="red")
+    ax.fill_between(grid, low, high, color="red", alpha=0.15, linewidth=0)
+    ax.set_xlabel(plot.x)
+    ax.set_ylabel(plot.y)
+
+
+def _scatter_summary(dataset, plot, ax):
+    frame = dataset.frame
+    _points(ax, frame[plot.x], frame[plot.y], alpha=0.6, color=plot.color)
+    ax.set_xlabel(plot.x)
+    ax.set_ylabel(plot.y)
+
+
+def _count_summary(dataset, plot, ax):
+    x_codes, levels = codes_and_levels(dataset.frame[plot.x])
+    hue_codes, hue_levels = codes_and_levels(dataset.frame[plot.hue])
+    ok = (x_codes >= 0) & (hue_codes >= 0)
+    cells = x_codes[ok].astype(np.int64) * len(hue_levels) + hue_codes[ok]
+    counts = np.bincount(cells, minlength=len(levels) * len(hue_levels)).reshape(len(levels), len(hue_levels))
+    width = 0.8 / len(hue_levels)
+    positions = np.arange(len(levels))
+    for j, (hue, color) in enumerate(zip(hue_levels, _colors(plot.palette, len(hue_levels)))):
+        ax.bar(positions - 0.4 + (j + 0.5) * width, counts[:, j], width=width, color=color, label=str(hue))
+    ax.set_xticks(positions, [str(level) for level in levels])
+    ax.set_xlabel(plot.x)
+    ax.set_ylabel("count")
+    ax.legend(title=plot.hue)
+
+
+SUMMARY_DRAW = {"box": _box_summary, "hist": _hist_summary, "reg": _reg_summary,
+                "scatter": _scatter_summary, "count": _count_summary, "heatmap": _heatmap}
+
+
+def draw(dataset, plot, mode="raw"):
+    """Draw one plot into a new figure and return the figure.
+
+    ``mode`` is "raw" (seaborn on the rows) or "summary" (precomputed statistics).
+    """
+    fig, ax = plt.subplots(figsize=plot.size)
+    (SUMMARY_DRAW if mode == "summary" else DRAW)[plot.kind](dataset, plot, ax)
+    if plot.xlabel:
+        ax.set_xlabel(plot.xlabel)
+    if plot.ylabel:
+        ax.set_ylabel(plot.ylabel)
+    if plot.title:
+        ax.set_title(plot.title)
+    return fig
@@ -0,0 +1,91 @@
+"""Background warm-up of the sections a viewer hasn't opened yet.
+
+The app computes the selected section right away. Afterwards a ``Prefetcher``
+hands the remaining sections to a small thread pool, which runs their
+analyses, tables and figures so that their results are already memoized
+(``worklife.engine``) or cached (``worklife.figures``) when the viewer switches
+sections.
+
+Lifecycle: one ``Prefetcher`` per viewer session, all sharing a process-wide
+executor that bounds the number of worker threads. Warming a different
+dataset (a new workbook, another filter) cancels the work still queued or
+running for the previous one. A section is only skipped while its warm-up is
+queued or running: once done it can be queued again, since the engine's and
+the figure cache's LRU may have evicted what it computed. A warm-up that
+fails is logged, and the viewer gets the error when opening the section.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from worklife.analyses import SECTIONS, Analysis, Plot, Table
+from worklife.engine import engine
+from worklife.figures import render
+
+log = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.environ.get("WORKLIFE_PREFETCH_WORKERS", 2))
+
+
+def make_executor(max_workers=MAX_WORKERS):
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="worklife-prefetch")
+
+
+def warm_section(dataset, section, theme="light", cancelled=None, stats=engine):
+    """Compute every block of ``section``; stops early once ``cancelled`` is set."""
+    for block in SECTIONS[section]:
+        if cancelled is not None and cancelled.is_set():
+            return
+        if isinstance(block, Analysis):
+            stats.run(dataset, block)
+        elif isinstance(block, Table):
+            stats.table(dataset, block)
+        elif isinstance(block, Plot):
+            render(dataset, block, theme=theme)
+
+
+class Prefetcher:
+    def __init__(self, executor):
+        self._executor = executor
+        # Re-entrant: a future that is already done runs its callback in warm()
+        self._lock = threading.RLock()
+        self._fingerprint = None
+        self._cancelled = threading.Event()
+        self._futures = {}  # (section, theme) -> Future, while queued or running
+
+    def warm(self, dataset, sections, theme="light"):
+        """Queue ``sections`` of ``dataset`` for background computation."""
+        with self._lock:
+            if dataset.fingerprint != self._fingerprint:
+                self._cancel()
+                self._fingerprint = dataset.fingerprint
+            for section in sections:
+                key = (section, theme)
+                if key not in self._futures:
+                    future = self._futures[key] = self._executor.submit(
+                        warm_section, dataset, section, theme, self._cancelled)
+                    future.add_done_callback(lambda done, key=key: self._done(key, done))
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+        if not future.cancelled() and future.exception() is not None:
+            log.error("Warming %r failed", key[0], exc_info=future.exception())
+
+    def cancel(self):
+        with self._lock:
+            self._cancel()
+            self._fingerprint = None
+
+    def _cancel(self):
+        self._cancelled.set()
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+        self._cancelled = threading.Event()
+
+    def pending(self):
+        with self._lock:
+            return sum(not future.done() for future in self._futures.values())
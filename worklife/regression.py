@@ -0,0 +1,247 @@
+"""Regression models of the well-being scores.
+
+A ``Design`` is built once per (dataset, outcome, candidate predictors): the
+complete cases, the one-hot encoded predictor matrix (first level of each
+coded column as the reference) and the R factor of one QR decomposition of
+``[X y]``. Every sub-model is then fitted from R alone: the QR of the few
+columns of R a sub-model uses gives its coefficients and residual sum of
+squares exactly as a QR of the full data would, at a cost that depends on the
+number of predictors only. Sub-models with the same number of parameters are
+decomposed together as one stacked ``np.linalg.qr`` call, so all-subsets
+comparisons of hundreds of models take milliseconds.
+
+Binary outcomes (e.g. whether someone exercises at all) are fitted by
+logistic regression with iteratively reweighted least squares on the same
+design.
+"""
+import itertools
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import solve_triangular
+from scipy.special import expit, ndtr, ndtri, stdtr, stdtrit
+
+from worklife.groups import codes_and_levels
+from worklife.schema import LABELS
+
+# All-subsets search above this many candidate predictors would fit too many
+# models; larger candidate sets are searched stepwise only.
+MAX_ALL_SUBSETS = 12
+
+
+@dataclass(eq=False)
+class Design:
+    outcome: str
+    terms: list         # candidate predictors
+    names: list         # design column names, "Intercept" first
+    columns: dict       # term -> positions of its design columns
+    x: np.ndarray
+    y: np.ndarray
+    r: np.ndarray       # R of the QR decomposition of [x y]
+
+    @property
+    def n(self):
+        return len(self.y)
+
+    @cached_property
+    def full_rank(self):
+        """Whether the design columns are linearly independent (no dummy a combination of others)."""
+        p = len(self.names)
+        # The singular values of R are those of x
+        s = np.linalg.svd(self.r[:p, :p], compute_uv=False)
+        return bool(s.min() > s.max() * max(self.x.shape) * np.finfo(np.float64).eps)
+
+    @property
+    def fittable(self):
+        """Whether the model with every candidate can be fitted: more complete cases than design
+        columns, independent columns and an outcome that varies (a filter may break any of them)."""
+        return self.n > len(self.names) and np.ptp(self.y) > 0 and self.full_rank
+
+    def positions(self, terms):
+        return [0] + [i for term in terms for i in self.columns[term]]
+
+
+def _level_name(column, level):
+    return f"{column} = {LABELS.get(column, {}).get(level, level)}"
+
+
+def build_design(frame, outcome, terms):
+    terms = list(terms)
+    rows = frame[[outcome] + terms].dropna()
+    blocks, names, columns = [np.ones((len(rows), 1))], ["Intercept"], {}
+    for term in terms:
+        values = rows[term]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, levels = codes_and_levels(values)
+            present = [i for i in range(len(levels)) if (codes == i).any()]
+            dummies = [(codes == i).astype(np.float64) for i in present[1:]]
+            labels = [_level_name(term, levels[i]) for i in present[1:]]
+        else:
+            dummies = [values.to_numpy(dtype=np.float64)]
+            labels = [term]
+        columns[term] = list(range(len(names), len(names) + len(dummies)))
+        names += labels
+        blocks += [d[:, None] for d in dummies]
+    x = np.hstack(blocks)
+    y = rows[outcome].to_numpy(dtype=np.float64)
+    r = np.linalg.qr(np.column_stack([x, y]), mode="r")
+    return Design(outcome, terms, names, columns, x, y, r)
+
+
+class DesignCache:
+    """Designs of one frame, built once per (outcome, candidate predictors)."""
+
+    def __init__(self, frame):
+        self._frame = frame
+        self._designs = {}
+        self._lock = threading.Lock()
+
+    def get(self, outcome, terms):
+        key = (outcome, tuple(terms))
+        design = self._designs.get(key)
+        if design is None:
+            with self._lock:
+                design = self._designs.get(key)
+                if design is None:
+                    design = self._designs[key] = build_design(self._frame, outcome, terms)
+        return design
+
+
+# ------------ Ordinary least squares ----------------#
+
+def _triangles(design, subsets):
+    """Stacked R factors of [X_S y] for subsets with the same number of columns."""
+    y = design.r.shape[1] - 1
+    picks = np.array([design.positions(subset) + [y] for subset in subsets])
+    stacked = np.transpose(design.r[:, picks], (1, 0, 2))
+    return np.linalg.qr(stacked, mode="r")
+
+
+def _information(rss, n, k):
+    with np.errstate(divide="ignore"):
+        log_likelihood_term = n * np.log(rss / n)
+    return log_likelihood_term + 2 * k, log_likelihood_term + k * np.log(n)
+
+
+def fit_subsets(design, subsets=None):
+    """R², AIC and BIC of every model (all subsets of the candidates by default)."""
+    if subsets is None:
+        subsets = [combo for size in range(len(design.terms) + 1)
+                   for combo in itertools.combinations(design.terms, size)]
+    by_size = {}
+    for subset in subsets:
+        by_size.setdefault(len(design.positions(subset)), []).append(tuple(subset))
+
+    n = design.n
+    tss = ((design.y - design.y.mean()) ** 2).sum()
+    records = []
+    for k, group in by_size.items():
+        rss = _triangles(design, group)[:, k, k] ** 2
+        aic, bic = _information(rss, n, k)
+        for subset, model_rss, model_aic, model_bic in zip(group, rss, aic, bic):
+            records.append({"model": " + ".join(subset) or "(intercept only)", "terms": subset,
+                            "parameters": k, "R²": 1 - model_rss / tss,
+                            "adj. R²": 1 - (model_rss / (n - k)) / (tss / (n - 1)),
+                            "AIC": model_aic, "BIC": model_bic})
+    return pd.DataFrame(records)
+
+
+def forward_stepwise(design, criterion="AIC"):
+    """Models visited by forward selection on ``criterion``, in order."""
+    chosen, path = (), []
+    current = fit_subsets(design, [chosen]).iloc[0]
+    path.append(current)
+    while len(chosen) < len(design.terms):
+        candidates = [chosen + (term,) for term in design.terms if term not in chosen]
+        fits = fit_subsets(design, candidates)
+        best = fits.loc[fits[criterion].idxmin()]
+        if best[criterion] >= current[criterion]:
+            break
+        chosen, current = best["terms"], best
+        path.append(current)
+    return pd.DataFrame(path).reset_index(drop=True)
+
+
+def model_comparison(design, criterion="BIC"):
+    """All-subsets table (or the stepwise path for many candidates), best model first."""
+    if not design.fittable:
+        return pd.DataFrame()
+    if len(design.terms) > MAX_ALL_SUBSETS:
+        table = forward_stepwise(design, criterion)
+    else:
+        table = fit_subsets(design)
+        path = set(forward_stepwise(design, criterion)["terms"])
+        table["stepwise"] = table["terms"].map(path.__contains__)
+    table = table.sort_values(criterion, kind="stable").reset_index(drop=True)
+    return table.drop(columns="terms")
+
+
+def ols(design, terms=None, confidence=0.95):
+    """Coefficient table of the OLS fit of the outcome on ``terms`` (default: all)."""
+    if not design.fittable:
+        return pd.DataFrame()
+    terms = design.terms if terms is None else list(terms)
+    k = len(design.positions(terms))
+    rr = _triangles(design, [terms])[0]
+    r_x, qty = rr[:k, :k], rr[:k, k]
+    coef = solve_triangular(r_x, qty)
+    dof = design.n - k
+    sigma2 = rr[k, k] ** 2 / dof
+    r_inv = solve_triangular(r_x, np.eye(k))
+    se = np.sqrt(sigma2 * (r_inv * r_inv).sum(axis=1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = coef / se
+    half_width = stdtrit(dof, 0.5 + confidence / 2) * se
+    return pd.DataFrame({
+        "term": [design.names[i] for i in design.positions(terms)],
+        "coefficient": coef, "std. error": se, "t": t, "p-value": 2 * stdtr(dof, -np.abs(t)),
+        f"CI low ({confidence:.0%})": coef - half_width, f"CI high ({confidence:.0%})": coef + half_width,
+    })
+
+
+# ------------ Logistic regression ----------------#
+
+def logistic(design, events, confidence=0.95, max_iter=50, tol=1e-10):
+    """Logistic regression of "outcome in ``events``" on all candidates, by IRLS.
+
+    Returns the coefficient table with odds ratios and Wald tests, or an empty
+    table when the estimates don't exist: everyone or no one has the event, or
+    the predictors separate the two (IRLS then doesn't converge).
+    """
+    if not design.fittable:
+        return pd.DataFrame()
+    x = design.x
+    y = np.isin(design.y, np.asarray(events, dtype=np.float64)).astype(np.float64)
+    if y.min() == y.max():
+        return pd.DataFrame()
+    beta = np.zeros(x.shape[1])
+    try:
+        for _ in range(max_iter):
+            mu = np.clip(expit(x @ beta), 1e-12, 1 - 1e-12)
+            w = mu * (1 - mu)
+            z = x @ beta + (y - mu) / w
+            sqrt_w = np.sqrt(w)
+            q, r = np.linalg.qr(x * sqrt_w[:, None])
+            step = solve_triangular(r, q.T @ (z * sqrt_w)) - beta
+            beta += step
+            if np.abs(step).max() < tol:
+                break
+        else:
+            return pd.DataFrame()
+        mu = expit(x @ beta)
+        r = np.linalg.qr(x * np.sqrt(mu * (1 - mu))[:, None], mode="r")
+        r_inv = solve_triangular(r, np.eye(len(beta)))
+    except np.linalg.LinAlgError:
+        return pd.DataFrame()
+    se = np.sqrt((r_inv * r_inv).sum(axis=1))
+    z = beta / se
+    half_width = ndtri(0.5 + confidence / 2) * se
+    return pd.DataFrame({
+        "term": design.names, "coefficient": beta, "odds ratio": np.exp(beta), "std. error": se,
+        "z": z, "p-value": 2 * ndtr(-np.abs(z)),
+        f"OR CI low ({confidence:.0%})": np.exp(beta - half_width),
+        f"OR CI high ({confidence:.0%})": np.exp(beta + half_width),
+    })
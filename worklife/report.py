@@ -0,0 +1,264 @@
+"""Static reports of every analysis section, without Streamlit.
+
+    python -m worklife.report Cleaned_Work_life.xlsx wave2.xlsx --out reports --jobs 4
+
+For each workbook this writes ``<out>/<workbook name>/`` (plus a digest of
+its path when several workbooks share a name) containing
+``report.html`` (or ``report.md`` with ``--format md``) with the figures
+embedded, and ``results.json`` with every test result in machine-readable
+form. Each (workbook, section) pair is an independent task run in a process
+pool; the workers share the on-disk dataset cache of ``worklife.data``.
+
+With ``--stream`` files are read in chunks into summary statistics
+(``worklife.streaming``) instead of being loaded whole, for exports larger
+than memory. Such reports have every test and table but no figures or
+regression models. Reading the file is then most of the work and there is
+no cache to share it through, so each workbook is one task: it is read once
+and its sections are computed from the one summary.
+"""
+import argparse
+import base64
+import html
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+
+from worklife.analyses import SECTIONS, Analysis, Plot, Table, Text  # noqa: E402
+from worklife.data import load_survey  # noqa: E402
+from worklife.engine import ROW_TABLES, engine  # noqa: E402
+from worklife.figures import render  # noqa: E402
+from worklife.streaming import summarize_survey  # noqa: E402
+
+_datasets = {}  # per worker process: path -> Dataset
+
+
+def _dataset(path, stream=False):
+    if (path, stream) not in _datasets:
+        _datasets[path, stream] = summarize_survey(path) if stream else load_survey(path)
+    return _datasets[path, stream]
+
+
+def run_section(path, section, stream=False):
+    """Compute one section of one workbook; returns plain, picklable blocks."""
+    dataset = _dataset(path, stream)
+    blocks = []
+    for block in SECTIONS[section]:
+        if isinstance(block, Text):
+            blocks.append({"type": "text", "markdown": block.markdown})
+        elif isinstance(block, Analysis):
+            result = engine.run(dataset, block)
+            blocks.append({"type": "analysis", "kind": block.kind, "outcome": block.outcome,
+                           "by": block.by, "levels": list(block.levels),
+                           "stat_label": block.stat_label, "p_label": block.p_label,
+                           "statistic": result.statistic, "p_value": result.p_value,
+                           "significant": result.significant, "details": result.details,
+                           "verdict": block.significant if result.significant else block.not_significant})
+        elif isinstance(block, Plot) and not stream:
+            blocks.append({"type": "plot", "png": render(dataset, block), "title": block.title})
+        elif isinstance(block, Table) and not (stream and block.kind in ROW_TABLES):
+            blocks.append({"type": "table", "kind": block.kind,
+                           # via to_json so NaN becomes null and numpy scalars become plain numbers
+                           "records": json.loads(engine.table(dataset, block).to_json(orient="records"))})
+    rows = dataset.rows if stream else len(dataset.frame)
+    return {"path": path, "section": section, "fingerprint": dataset.fingerprint,
+            "rows": rows, "blocks": blocks}
+
+
+def run_workbook(path, sections, stream=False):
+    """``run_section`` for each of ``sections`` of one workbook, in one process."""
+    return [run_section(path, section, stream) for section in sections]
+
+
+# ------------ Output formats ----------------#
+
+def _inline_markdown(text):
+    return re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", html.escape(text))
+
+
+def _text_html(markdown):
+    match = re.match(r"(#{1,6})\s+(.*)", markdown.strip())
+    if match:
+        level = len(match.group(1))
+        return f"<h{level}>{_inline_markdown(match.group(2))}</h{level}>"
+    return f"<p>{_inline_markdown(markdown.strip())}</p>"
+
+
+def _table_html(records, limit=50):
+    if not records:
+        return "<p><em>No rows.</em></p>"
+    columns = list(records[0])
+    head = "".join(f"<th>{html.escape(str(c))}</th>" for c in columns)
+    rows = "".join("<tr>" + "".join(f"<td>{_cell(r[c])}</td>" for c in columns) + "</tr>"
+                   for r in records[:limit])
+    more = f"<p><em>{len(records) - limit} more rows in results.json</em></p>" if len(records) > limit else ""
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>{more}"
+
+
+def _table_markdown(records, limit=50):
+    if not records:
+        return "_No rows._"
+    columns = list(records[0])
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    lines += ["| " + " | ".join(_cell(r[c]) for c in columns) + " |" for r in records[:limit]]
+    if len(records) > limit:
+        lines.append(f"\n_{len(records) - limit} more rows in results.json_")
+    return "\n".join(lines)
+
+
+def _cell(value):
+    return f"{value:.4g}" if isinstance(value, float) else html.escape(str(value))
+
+
+def _png_uri(png):
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+def to_html(title, sections):
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    for section in sections:
+        parts.append(f"<section><h2 class='section'>{html.escape(section['section'])}</h2>")
+        for block in section["blocks"]:
+            if block["type"] == "text":
+                parts.append(_text_html(block["markdown"]))
+            elif block["type"] == "analysis":
+                verdict_class = "significant" if block["significant"] else "not-significant"
+                parts.append(f"<p><strong>{html.escape(block['stat_label'])}:</strong> {block['statistic']:.3f}<br>"
+                             f"<strong>{html.escape(block['p_label'])}:</strong> {block['p_value']:.5f}</p>"
+                             f"<p class='{verdict_class}'>{html.escape(block['verdict'])}</p>")
+            elif block["type"] == "plot":
+                parts.append(f"<img src='{_png_uri(block['png'])}' alt='{html.escape(block['title'])}'>")
+            elif block["type"] == "table":
+                parts.append(_table_html(block["records"]))
+        parts.append("</section>")
+    style = ("body{font-family:sans-serif;max-width:60rem;margin:auto}img{max-width:100%}"
+             ".significant{color:#1b7a3a}.not-significant{color:#555}"
+             "table{border-collapse:collapse;font-size:.85rem}td,th{border:1px solid #ccc;padding:2px 6px}")
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            f"<style>{style}</style></head><body>{''.join(parts)}</body></html>")
+
+
+def to_markdown(title, sections):
+    parts = [f"# {title}"]
+    for section in sections:
+        parts.append(f"# {section['section']}")
+        for block in section["blocks"]:
+            if block["type"] == "text":
+                parts.append(block["markdown"])
+            elif block["type"] == "analysis":
+                parts.append(f"**{block['stat_label']}:** {block['statistic']:.3f}  \n"
+                             f"**{block['p_label']}:** {block['p_value']:.5f}\n\n> {block['verdict']}")
+            elif block["type"] == "plot":
+                parts.append(f"![{block['title']}]({_png_uri(block['png'])})")
+            elif block["type"] == "table":
+                parts.append(_table_markdown(block["records"]))
+    return "\n\n".join(parts) + "\n"
+
+
+def _plain(value):
+    """``value`` with NaN and infinities as None and NumPy scalars as Python numbers."""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def to_json(sections):
+    first = sections[0]
+    return _plain({
+        "source": first["path"],
+        "fingerprint": first["fingerprint"],
+        "rows": first["rows"],
+        "sections": {
+            section["section"]: [{key: value for key, value in block.items() if key != "type"}
+                                 for block in section["blocks"] if block["type"] in ("analysis", "table")]
+            for section in sections
+        },
+    })
+
+
+# ------------ Batch driver ----------------#
+
+def run_reports(paths, sections=None, jobs=None, stream=False):
+    """Compute ``sections`` (default: all) for every workbook; returns {path: [section results]}."""
+    paths = [str(Path(path).resolve()) for path in paths]
+    sections = list(sections or SECTIONS)
+    jobs = jobs or os.cpu_count() or 1
+    if stream:
+        task, tasks = run_workbook, [(path, sections, stream) for path in paths]
+    else:
+        task, tasks = run_section, [(path, section, stream) for path in paths for section in sections]
+    if jobs == 1:
+        results = [task(*arguments) for arguments in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(task, *zip(*tasks)))
+    if stream:
+        results = [result for workbook in results for result in workbook]
+    by_path = {path: [] for path in paths}
+    for result in results:
+        by_path[result["path"]].append(result)
+    return by_path
+
+
+def _report_names(paths):
+    """{path: directory name}: the file's stem, plus a digest of the path where stems collide."""
+    stems = [Path(path).stem for path in paths]
+    return {path: stem if stems.count(stem) == 1
+            else f"{stem}-{hashlib.sha1(str(path).encode()).hexdigest()[:8]}"
+            for path, stem in zip(paths, stems)}
+
+
+def write_reports(by_path, out_dir, fmt="html"):
+    out_dir = Path(out_dir)
+    written = []
+    names = _report_names(list(by_path))
+    for path, sections in by_path.items():
+        target = out_dir / names[path]
+        target.mkdir(parents=True, exist_ok=True)
+        title = f"Work, Stress and Life Satisfaction Study: {Path(path).name}"
+        if fmt == "md":
+            (target / "report.md").write_text(to_markdown(title, sections), encoding="utf-8")
+        else:
+            (target / "report.html").write_text(to_html(title, sections), encoding="utf-8")
+        with open(target / "results.json", "w", encoding="utf-8") as handle:
+            json.dump(to_json(sections), handle, indent=2, allow_nan=False)
+        written.append(target)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write static reports of every analysis section.")
+    parser.add_argument("workbooks", nargs="+", help="survey files (.xlsx, .csv or .parquet)")
+    parser.add_argument("--out", default="reports", help="output directory (default: reports)")
+    parser.add_argument("--format", choices=["html", "md"], default="html")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--section", action="append", choices=list(SECTIONS),
+                        help="only this section (repeatable)")
+    parser.add_argument("--stream", action="store_true",
+                        help="read files in chunks into summary statistics (no figures)")
+    args = parser.parse_args(argv)
+
+    by_path = run_reports(args.workbooks, args.section, args.jobs, args.stream)
+    for target in write_reports(by_path, args.out, args.format):
+        print(target)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
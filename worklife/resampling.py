@@ -0,0 +1,252 @@
+"""Permutation p-values and bootstrap confidence intervals.
+
+The parametric tests assume roughly normal outcomes, which summed Likert
+scales often aren't. ``resample`` gives a distribution-free second opinion for
+the t-test, ANOVA and Pearson analyses:
+
+- the permutation p-value shuffles the group labels (or, for a correlation,
+  one of the two variables) and counts how often the shuffled statistic is at
+  least as extreme as the observed one;
+- the bootstrap interval resamples respondents with replacement (within each
+  group for group comparisons) and takes percentiles of the mean difference
+  (t-tests), eta squared (ANOVAs) or r (correlations).
+
+Resamples are drawn in blocks as index matrices, one row per resample, and
+evaluated for the whole block at once: group sums come from a single
+``bincount`` over (resample, group) pairs and correlations from one
+matrix-vector product. A block holds at most ``BLOCK`` resamples and, on
+large cohorts, fewer, so that it stays within ``CELL_BUDGET`` (resample x
+respondent) cells: its matrices take a few dozen bytes per cell, whatever the
+number of rows. Each block has its own child of ``SeedSequence(seed)``, so the
+result depends only on the seed, the number of resamples and the number of
+respondents, not on how the blocks are spread over worker processes.
+
+The worker processes are started with "spawn", not fork: the pool is created
+from inside the multi-threaded Streamlit server, and a forked child would
+inherit locks held by its other threads. The pool is created on first use and
+shut down when the process exits.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from worklife.comparisons import GroupMoments, anova, welch
+
+N_RESAMPLES = 10_000
+SEED = 20240501
+BLOCK = 1_000  # resamples drawn and evaluated together
+CELL_BUDGET = 2_000_000  # (resample x respondent) cells per block: about 100 MB of matrices
+
+# Below this many (resample x respondent) cells per analysis the work runs in
+# the calling process; starting worker processes would cost more.
+PARALLEL_CELLS = 20_000_000
+
+RESAMPLED_KINDS = ("ttest", "anova", "pearson")
+
+CI_LABELS = {"ttest": "mean difference", "anova": "eta squared", "pearson": "r"}
+
+
+@dataclass(frozen=True)
+class Resampled:
+    p_value: float          # permutation p-value
+    ci: tuple               # percentile bootstrap interval
+    estimate: float         # the statistic the interval is for, on the observed data
+    ci_label: str
+    n_resamples: int
+    confidence: float = 0.95
+
+
+# ------------ Statistics of many resamples at once ----------------#
+
+def _group_moments(x, labels, k):
+    """Per-group n, mean, variance for every row of ``labels``: (k, resamples) arrays.
+
+    ``x`` is either one value per respondent, shared by all rows, or a matrix
+    with a row of values per row of ``labels``.
+    """
+    rows = labels.shape[0]
+    flat = (labels + k * np.arange(rows)[:, None]).ravel()
+    values = np.tile(x, rows) if x.ndim == 1 else x.ravel()
+    size = rows * k
+    n = np.bincount(flat, minlength=size).reshape(rows, k).T.astype(np.float64)
+    sums = np.bincount(flat, values, size).reshape(rows, k).T
+    squares = np.bincount(flat, values * values, size).reshape(rows, k).T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / n
+        var = (squares - sums * mean) / (n - 1)
+    return n, mean, var
+
+
+def _group_statistic(kind, x, labels, k):
+    n, mean, var = _group_moments(x, labels, k)
+    moments = GroupMoments(list(range(k)), None, n, mean, var)
+    return (welch if kind == "ttest" else anova)(moments)[0]
+
+
+def _effect(kind, x, labels, k):
+    """Mean difference (first minus second group) or eta squared, per row of ``labels``."""
+    n, mean, var = _group_moments(x, labels, k)
+    if kind == "ttest":
+        return mean[0] - mean[1]
+    total = n.sum(axis=0)
+    grand = (n * mean).sum(axis=0) / total
+    ss_between = (n * (mean - grand) ** 2).sum(axis=0)
+    ss_within = ((n - 1) * var).sum(axis=0)
+    return ss_between / (ss_between + ss_within)
+
+
+def _correlations(x, y, index):
+    """Pearson r of x[index[b]] and y[index[b]] for every row b."""
+    xs, ys = x[index], y[index]
+    xs = xs - xs.mean(axis=1, keepdims=True)
+    ys = ys - ys.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (xs * ys).sum(axis=1) / np.sqrt((xs * xs).sum(axis=1) * (ys * ys).sum(axis=1))
+
+
+# ------------ One seeded block ----------------#
+
+def _block(kind, x, other, k, size, seed):
+    """``size`` permutation and bootstrap statistics from one seed.
+
+    For group comparisons ``other`` holds the group labels 0..k-1, sorted;
+    for correlations it is the second variable.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    if kind == "pearson":
+        # Permuting y against fixed standardised x: r is one matrix-vector product
+        zx = (x - x.mean()) / np.sqrt(((x - x.mean()) ** 2).sum())
+        zy = (other - other.mean()) / np.sqrt(((other - other.mean()) ** 2).sum())
+        permuted = rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+        return zy[permuted] @ zx, _correlations(x, other, rng.integers(0, n, (size, n)))
+
+    permuted = rng.permuted(np.tile(other, (size, 1)), axis=1)
+    statistics = _group_statistic(kind, x, permuted, k)
+    # Stratified bootstrap: resample within each group, so group sizes stay fixed
+    counts = np.bincount(other, minlength=k)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    index = np.concatenate([start + rng.integers(0, count, (size, count))
+                            for start, count in zip(starts, counts)], axis=1)
+    return statistics, _effect(kind, x[index], np.tile(other, (size, 1)), k)
+
+
+# ------------ Driver ----------------#
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _block_size(n):
+    """Resamples per block for ``n`` respondents."""
+    return max(1, min(BLOCK, CELL_BUDGET // max(n, 1)))
+
+
+def _blocks(kind, x, other, k, sizes, seeds):
+    """``_block`` for several (size, seed) pairs in turn, concatenated."""
+    blocks = [_block(kind, x, other, k, size, seed) for size, seed in zip(sizes, seeds)]
+    return np.concatenate([block[0] for block in blocks]), np.concatenate([block[1] for block in blocks])
+
+
+def _workers():
+    return int(os.environ.get("WORKLIFE_RESAMPLE_WORKERS", os.cpu_count() or 1))
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown():
+    """Stop the worker processes; the next parallel ``resample`` starts new ones."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown)
+
+
+def _samples(dataset, analysis):
+    """(x, other, number of groups) for ``_block``, missing values dropped."""
+    frame = dataset.frame
+    if analysis.kind == "pearson":
+        pairs = frame[[analysis.outcome, analysis.by]].to_numpy(dtype=np.float64, na_value=np.nan)
+        pairs = pairs[~np.isnan(pairs).any(axis=1)]
+        return pairs[:, 0], pairs[:, 1], None
+    groups = dataset.groups.split(analysis.by, analysis.outcome, analysis.levels or None)
+    groups = [np.asarray(values, dtype=np.float64) for values in groups]
+    groups = [values[~np.isnan(values)] for values in groups]
+    x = np.concatenate(groups)
+    labels = np.repeat(np.arange(len(groups)), [len(values) for values in groups])
+    return x, labels, len(groups)
+
+
+def _observed(kind, x, other, k):
+    if kind == "pearson":
+        return _correlations(x, other, np.arange(len(x))[None, :])[0]
+    return _effect(kind, x, other[None, :], k)[0]
+
+
+def _observed_statistic(kind, x, other, k):
+    if kind == "pearson":
+        return _observed(kind, x, other, k)
+    return _group_statistic(kind, x, other[None, :], k)[0]
+
+
+def _too_small(x, other, k):
+    if k is None:
+        return len(x) < 3
+    return (np.bincount(other, minlength=k) < 2).any()
+
+
+def resample(dataset, analysis, n_resamples=N_RESAMPLES, seed=SEED, confidence=0.95, parallel=None):
+    """Permutation p-value and bootstrap CI for one t-test, ANOVA or Pearson analysis.
+
+    ``parallel`` spreads the blocks over the worker processes; by default only
+    when there is enough work (``PARALLEL_CELLS``).
+    """
+    if analysis.kind not in RESAMPLED_KINDS:
+        raise ValueError(f"No resampling for {analysis.kind!r} analyses")
+    x, other, k = _samples(dataset, analysis)
+    if _too_small(x, other, k):
+        # Nothing to resample (e.g. a filter left a group empty)
+        return Resampled(np.nan, (np.nan, np.nan), np.nan, CI_LABELS[analysis.kind], n_resamples, confidence)
+    block = _block_size(len(x))
+    sizes = [min(block, n_resamples - start) for start in range(0, n_resamples, block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if parallel is None:
+        parallel = n_resamples * len(x) >= PARALLEL_CELLS
+    if parallel:
+        # One task per worker, each running its share of the blocks one after
+        # the other: a worker holds one block at a time and receives the data once
+        shares = np.array_split(np.arange(len(sizes)), min(_workers(), len(sizes)))
+        tasks = [(analysis.kind, x, other, k, [sizes[i] for i in share], [seeds[i] for i in share])
+                 for share in shares]
+        parts = list(_executor().map(_blocks, *zip(*tasks)))
+        statistics = np.concatenate([part[0] for part in parts])
+        effects = np.concatenate([part[1] for part in parts])
+    else:
+        statistics, effects = _blocks(analysis.kind, x, other, k, sizes, seeds)
+
+    observed = _observed_statistic(analysis.kind, x, other, k)
+    if analysis.kind == "anova":
+        extreme = statistics >= observed - 1e-12 * abs(observed)
+    else:
+        extreme = np.abs(statistics) >= abs(observed) - 1e-12 * abs(observed)
+    p_value = (1 + np.count_nonzero(extreme)) / (n_resamples + 1)
+    tail = (1 - confidence) / 2
+    low, high = np.nanquantile(effects, [tail, 1 - tail])
+    return Resampled(float(p_value), (float(low), float(high)), float(_observed(analysis.kind, x, other, k)),
+                     CI_LABELS[analysis.kind], n_resamples, confidence)
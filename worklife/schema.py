@@ -0,0 +1,119 @@
+"""Column types for the survey frame.
+
+Every column of the workbook is a small integer code or score, but pandas reads
+them all as int64/float64. The schema below declares what each column is:
+
+- coded groups become ``category`` columns whose categories are the integer
+  codes used in the questionnaire, so ``df[col] == 1`` keeps working and
+  group-bys run on the compact category codes;
+- item scores, 1-7 scales and summed scale scores become ``int8`` (or the
+  nullable ``Int8`` when a column has missing answers); a fractional value in
+  one of them is an error rather than being truncated;
+- the few genuinely continuous columns become ``float32``.
+
+The human-readable label for each code lives in ``LABELS``, which is the one
+place the app looks them up.
+"""
+import pandas as pd
+
+# The published workbook misspells this column; use the documented name.
+COLUMN_ALIASES = {"GovOrPrivaqteCo": "GovOrPrivateCo"}
+
+LS_ITEMS = [f"ls{i}" for i in range(1, 6)]
+PSS_ITEMS = [f"pss{i}" for i in range(1, 15)]
+
+LABELS = {
+    "schooling1to3": {1: "Elementary", 2: "High School", 3: "University"},
+    "GovOrPrivateCo": {1: "Government", 2: "Private"},
+    "JobPositionEmployeeManager": {1: "Employee", 2: "Manager"},
+    "HUorEUorNONEuCo": {1: "Hungary", 2: "European Union", 3: "Outside the EU"},
+    "CompanySize4cat": {1: "Up to 10", 2: "11 to 100", 3: "101 to 1,000", 4: "Over 1,000"},
+    "Childhood7to16SportsYesNo": {1: "Yes", 2: "No"},
+    "LeisureCompOrNoSport": {1: "Leisure", 2: "Competitive", 3: "No Sport"},
+    "CompanySize": {1: "Small Companies", 2: "Large Companies"},
+}
+
+# Codes with a natural order (education, company size) get ordered categories
+ORDERED = {"schooling1to3", "CompanySize4cat", "CompanySize"}
+
+SCHEMA = {
+    "gender": "category",
+    "age": "int8",
+    "perceivedhealth1to7": "int8",
+    "income1to7": "int8",
+    "schooling1to3": "category",
+    "GovOrPrivateCo": "category",
+    "JobPositionEmployeeManager": "category",
+    "HUorEUorNONEuCo": "category",
+    "CompanySize4cat": "category",
+    "Childhood7to16SportsYesNo": "category",
+    "SportsHistoryYears": "float32",
+    "LeisureCompOrNoSport": "category",
+    "SportSocSupport1to10ZeroNoSport": "int8",
+    **{item: "int8" for item in LS_ITEMS + PSS_ITEMS},
+    "Stress": "int8",
+    "LifeSatisf": "int8",
+    "Sportgr": "category",
+    "CompanySize": "category",
+}
+
+CATEGORICAL_COLUMNS = [col for col, kind in SCHEMA.items() if kind == "category"]
+
+
+def _as_category(values, column):
+    codes = sorted(LABELS.get(column, {}))
+    # Keep codes the questionnaire doesn't know about instead of turning them into NaN
+    extra = sorted(set(values.dropna().unique()) - set(codes))
+    dtype = pd.CategoricalDtype(codes + extra, ordered=column in ORDERED)
+    return values.astype(dtype)
+
+
+def _as_int(values, kind, column):
+    present = values.dropna()
+    if pd.api.types.is_float_dtype(present) and (present % 1 != 0).any():
+        example = present[present % 1 != 0].iloc[0]
+        raise ValueError(f"Column {column!r} holds {kind} scores but has a non-integer value: {example}")
+    if values.isna().any():
+        return values.astype(kind.capitalize())  # nullable Int8 / Int16
+    lo, hi = values.min(), values.max()
+    info = pd.api.types.pandas_dtype(kind)
+    if lo < -(1 << (8 * info.itemsize - 1)) or hi >= 1 << (8 * info.itemsize - 1):
+        return pd.to_numeric(values, downcast="integer")
+    return values.astype(kind)
+
+
+def apply_schema(frame):
+    """Return a copy of ``frame`` with the declared compact dtypes applied.
+
+    Columns the schema doesn't know about are downcast to the smallest type
+    that holds their values.
+    """
+    frame = frame.rename(columns=COLUMN_ALIASES)
+    typed = {}
+    for column in frame.columns:
+        values = frame[column]
+        kind = SCHEMA.get(column)
+        if kind == "category":
+            values = _as_category(values, column)
+        elif kind and kind.startswith("int"):
+            values = _as_int(values, kind, column)
+        elif kind:
+            values = values.astype(kind)
+        elif pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, downcast="integer")
+        elif pd.api.types.is_float_dtype(values):
+            values = pd.to_numeric(values, downcast="float")
+        typed[column] = values
+    return pd.DataFrame(typed, index=frame.index)
+
+
+def memory_bytes(frame):
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def label(values, column):
+    """Map a coded column to its display labels (codes without a label stay as is)."""
+    labels = LABELS.get(column, {})
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.rename_categories(lambda code: labels.get(code, str(code)))
+    return values.map(lambda code: labels.get(code, code))
@@ -0,0 +1,126 @@
+"""Scale scores and reliability from the questionnaire items.
+
+``Stress`` is the Perceived Stress Scale total (items ``pss1``-``pss14``,
+answered 0-4, with items 4, 5, 6, 7, 9, 10 and 13 reverse-keyed) and
+``LifeSatisf`` the Satisfaction with Life Scale total (``ls1``-``ls5``,
+answered 1-7).
+
+All scales are scored together as matrix operations over one items matrix:
+
+- reverse-keyed items are recoded with a sign/offset vector
+  (``x -> low + high - x``);
+- totals are the item matrix times a 0/1 item-to-scale matrix;
+- respondents who skipped a few items get a pro-rated total (mean of the
+  answered items times the number of items) as long as they answered at
+  least ``min_answered`` of them; otherwise the score is missing;
+- Cronbach's alpha of each scale comes from the same matrices, over the
+  respondents who answered every item of the scale.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from worklife.schema import LS_ITEMS, PSS_ITEMS
+
+
+@dataclass(frozen=True)
+class Scale:
+    name: str                 # column the score is written to
+    items: tuple
+    low: int                  # lowest and highest answer of every item
+    high: int
+    reverse: tuple = ()       # items keyed in the opposite direction
+    min_answered: float = 0.8
+
+
+PSS = Scale("Stress", tuple(PSS_ITEMS), 0, 4,
+            reverse=("pss4", "pss5", "pss6", "pss7", "pss9", "pss10", "pss13"))
+SWL = Scale("LifeSatisf", tuple(LS_ITEMS), 1, 7)
+SCALES = (PSS, SWL)
+
+
+@dataclass(eq=False)
+class ScaleScores:
+    scores: pd.DataFrame      # one column per scale
+    answered: pd.DataFrame    # number of items answered, per scale
+    alpha: dict               # Cronbach's alpha per scale
+    recoded: pd.DataFrame     # the item columns after reverse-keying
+
+
+def score_scales(frame, scales=SCALES, recode_reversed=True):
+    """Score every scale whose items are all present in ``frame``.
+
+    ``recode_reversed=False`` is for frames whose reverse-keyed items were
+    already recoded (as in ``Cleaned_Work_life.xlsx``).
+    """
+    scales = [scale for scale in scales if set(scale.items) <= set(frame.columns)]
+    columns = [item for scale in scales for item in scale.items]
+    x = frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # Reverse-keying as one affine map: x * sign + offset
+    sign = np.ones(len(columns))
+    offset = np.zeros(len(columns))
+    if recode_reversed:
+        for scale in scales:
+            for item in scale.reverse:
+                i = columns.index(item)
+                sign[i], offset[i] = -1.0, scale.low + scale.high
+    x = x * sign + offset
+
+    # membership[i, s] = 1 when item i belongs to scale s
+    membership = np.zeros((len(columns), len(scales)))
+    start = 0
+    for s, scale in enumerate(scales):
+        membership[start:start + len(scale.items), s] = 1.0
+        start += len(scale.items)
+    k = membership.sum(axis=0)
+
+    present = ~np.isnan(x)
+    filled = np.where(present, x, 0.0)
+    totals = filled @ membership
+    answered = present.astype(np.float64) @ membership
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(answered >= np.array([s.min_answered for s in scales]) * k,
+                          totals * k / answered, np.nan)
+
+    # Cronbach's alpha on complete respondents: k/(k-1) * (1 - sum item variances / total variance)
+    alpha = {}
+    for s, scale in enumerate(scales):
+        complete = answered[:, s] == k[s]
+        if complete.sum() < 2 or k[s] < 2:
+            alpha[scale.name] = np.nan
+            continue
+        in_scale = membership[:, s] > 0
+        item_var = x[complete][:, in_scale].var(axis=0, ddof=1).sum()
+        total_var = totals[complete, s].var(ddof=1)
+        alpha[scale.name] = float(k[s] / (k[s] - 1) * (1 - item_var / total_var)) if total_var > 0 else np.nan
+
+    names = [scale.name for scale in scales]
+    return ScaleScores(
+        scores=pd.DataFrame(scores, columns=names, index=frame.index),
+        answered=pd.DataFrame(answered.astype(np.int64), columns=names, index=frame.index),
+        alpha=alpha,
+        recoded=pd.DataFrame(x, columns=columns, index=frame.index),
+    )
+
+
+def add_missing_scores(frame, scales=SCALES):
+    """Fill in the scale scores a raw survey export doesn't have.
+
+    A file without a scale's score column is taken to be a raw export: its
+    reverse-keyed items are recoded in place (so every frame the app sees has
+    its items in scoring direction) and the score column is added. Scales
+    whose score is already present are left untouched.
+    """
+    missing = [scale for scale in scales
+               if scale.name not in frame.columns and set(scale.items) <= set(frame.columns)]
+    if not missing:
+        return frame
+    result = score_scales(frame, missing, recode_reversed=True)
+    frame = frame.copy()
+    for scale in missing:
+        for item in scale.reverse:
+            frame[item] = result.recoded[item].astype(frame[item].dtype)
+        frame[scale.name] = result.scores[scale.name].astype("float32")
+    return frame
@@ -0,0 +1,282 @@
+"""Results shared by every viewer: one computation per dataset, however many sessions.
+
+Two layers sit behind the engine's memo and the figure cache:
+
+- ``SingleFlight`` deduplicates concurrent misses inside a process: the first
+  caller of a key computes it and every other caller of the same key waits
+  for that result instead of computing it again (a viewer opening a section
+  the prefetcher is already warming, a rollout where hundreds of sessions
+  open the same page at once).
+- ``SharedResults`` is a small key-value store in a SQLite file that several
+  server processes on one machine can share (``WORKLIFE_RESULTS_STORE``, by
+  default ``results.sqlite`` in the cache directory; ``off`` disables it).
+  Values are pickled; keys carry a digest of the package's source, so results
+  computed by other code are never read back. A miss takes a lock on the key
+  (a byte range of a lock file, ``fcntl.lockf``) and looks again before
+  computing, so across processes too a key is computed once while the others
+  wait. ``lockf`` locks belong to the process, not the thread, so each byte
+  range also has a thread lock: two threads whose keys share a range take
+  turns instead of both holding, and one releasing, the process's lock. The
+  file is kept under ``WORKLIFE_RESULTS_STORE_MB`` by dropping entries of
+  other code versions first, then the oldest.
+
+Reading a value unpickles it, which can run arbitrary code: the store trusts
+every process that can write its file. Keep it in a directory only the
+server's own user can write to.
+
+Like the parsed-workbook cache the store is a pure speed-up: when it can't be
+opened, read or written, results are computed as if it weren't there.
+"""
+import contextlib
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from worklife.data import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, a key may be computed twice
+    fcntl = None
+
+STORE_ENV = "WORKLIFE_RESULTS_STORE"
+MAX_BYTES = int(os.environ.get("WORKLIFE_RESULTS_STORE_MB", 256)) << 20
+LOCK_SLOTS = 1 << 20     # byte ranges of the lock file; keys hashing to one slot share a lock
+PRUNE_EVERY = 64         # puts between checks of the store's size
+
+
+class SingleFlight:
+    """Runs concurrent calls for the same key once; the other callers get its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the call in progress
+        self.shared = 0   # calls answered by another caller's computation
+
+    def do(self, key, compute):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            result = compute()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def code_version():
+    """Digest of the package's source files."""
+    digest = hashlib.sha1()
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+class _Slot:
+    """In-process state of one byte range of the lock file."""
+
+    def __init__(self):
+        self.lock = threading.RLock()  # re-entrant: a computation may need another key of the slot
+        self.depth = 0                 # nesting of the thread holding ``lock``
+        self.held = False              # whether that thread got the lockf lock
+        self.users = 0                 # threads holding or waiting for ``lock``
+
+
+class SharedResults:
+    """Pickled results in a SQLite file, shared by the server processes of one machine."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, version=None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.version = version or code_version()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        self._lock_file = None
+        self._slots = {}  # byte range of the lock file -> _Slot, while in use
+        self._broken = False
+        self._puts = 0
+
+    def _key(self, key):
+        return f"{self.version}:{hashlib.sha256(repr(key).encode()).hexdigest()}"
+
+    def _connect(self):
+        # Called with self._lock held
+        if self._connection is None and not self._broken:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                             check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, "
+                                   "version TEXT, value BLOB, size INTEGER, stored REAL)")
+                self._connection = connection
+            except (OSError, sqlite3.Error):
+                self._broken = True
+        return self._connection
+
+    def get(self, key):
+        """The stored value, or None."""
+        value = self._read(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _read(self, key):
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return None
+            try:
+                row = connection.execute("SELECT value FROM results WHERE key = ?",
+                                         (self._key(key),)).fetchone()
+            except sqlite3.Error:
+                return None
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return None
+
+    def put(self, key, value):
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return
+            try:
+                connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                                   (self._key(key), self.version, data, len(data), time.time()))
+                self._puts += 1
+                if self._puts % PRUNE_EVERY == 0:
+                    self._prune(connection)
+            except sqlite3.Error:
+                pass
+
+    def _prune(self, connection):
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Entries of other code versions go first, then the oldest, down to 90% of the budget
+        excess = total - int(self.max_bytes * 0.9)
+        rows = connection.execute("SELECT key, size FROM results ORDER BY version = ?, stored",
+                                  (self.version,)).fetchall()
+        victims = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        connection.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    @contextlib.contextmanager
+    def locked(self, key):
+        """Hold the cross-process lock of ``key`` (a no-op where it isn't available)."""
+        handle = self._lock_handle()
+        if handle is None:
+            yield
+            return
+        index = int(self._key(key)[-8:], 16) % LOCK_SLOTS
+        with self._lock:
+            slot = self._slots.get(index)
+            if slot is None:
+                slot = self._slots[index] = _Slot()
+            slot.users += 1
+        slot.lock.acquire()
+        try:
+            if slot.depth == 0:
+                try:
+                    fcntl.lockf(handle, fcntl.LOCK_EX, 1, index)
+                    slot.held = True
+                except OSError:
+                    slot.held = False
+            slot.depth += 1
+            try:
+                yield
+            finally:
+                slot.depth -= 1
+                # Only the outermost holder releases: the process has one lock per range
+                if slot.depth == 0 and slot.held:
+                    fcntl.lockf(handle, fcntl.LOCK_UN, 1, index)
+        finally:
+            slot.lock.release()
+            with self._lock:
+                slot.users -= 1
+                if not slot.users:
+                    del self._slots[index]
+
+    def _lock_handle(self):
+        if fcntl is None:
+            return None
+        with self._lock:
+            # One handle per process: closing any descriptor of the file would
+            # release every lock the process holds on it
+            if self._lock_file is None and not self._broken:
+                try:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._lock_file = open(self.path.with_suffix(".lock"), "a+b")
+                except OSError:
+                    self._broken = True
+            return self._lock_file
+
+    def get_or_compute(self, key, compute):
+        """The stored value of ``key``; on a miss, ``compute()`` it once across processes."""
+        value = self._read(key)
+        if value is None:
+            with self.locked(key):
+                # Another process may have computed it while this one waited for the lock
+                value = self._read(key)
+                if value is None:
+                    value = compute()
+                    self.put(key, value)
+                    self.misses += 1
+                    return value
+        self.hits += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            connection = self._connect()
+            if connection is not None:
+                try:
+                    connection.execute("DELETE FROM results")
+                except sqlite3.Error:
+                    pass
+
+
+def open_store(spec=None):
+    """The store configured by ``WORKLIFE_RESULTS_STORE``, or None when it is off."""
+    spec = os.environ.get(STORE_ENV) if spec is None else spec
+    if spec is not None and spec.strip().lower() in ("", "0", "off", "none"):
+        return None
+    return SharedResults(Path(spec) if spec else CACHE_DIR / "results.sqlite")
+
+
+# Shared by the engine and the figure cache of this process
+shared_results = open_store()
@@ -0,0 +1,274 @@
+"""Chunked ingestion of survey files too large to load at once.
+
+``iter_chunks`` reads a file a block of rows at a time (openpyxl's read-only
+mode for .xlsx, ``chunksize`` for .csv, record batches for .parquet) and
+prepares each block exactly like ``worklife.data`` prepares a whole frame.
+
+``summarize_survey`` folds the chunks into running sufficient statistics and
+drops the rows. Memory then depends on the number of columns and groups, not
+on the number of respondents. The statistics are:
+
+- per group of every categorical column: count, mean and sum of squared
+  deviations of every numeric column (t-tests, ANOVAs, screening);
+- pairwise co-moments of the numeric columns (correlations);
+- contingency counts of every pair of categorical columns (chi-square).
+
+Chunks are combined with Chan et al.'s pairwise update, so the result does not
+depend on how the file was split. A ``SurveySummary`` has the same
+``group_moments``, ``crosstab`` and ``correlations`` as a ``Dataset``, so the
+engine runs every analysis and table on it; figures still need the rows.
+"""
+import copy
+import itertools
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from worklife.associations import pair_counts
+from worklife.comparisons import GroupMoments, block_moments, merge_moments
+from worklife.correlation import correlation_from_comoments, numeric_columns
+from worklife.data import file_hash
+from worklife.schema import LABELS, apply_schema
+from worklife.scoring import add_missing_scores
+
+CHUNK_ROWS = int(os.environ.get("WORKLIFE_CHUNK_ROWS", 50_000))
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Prepared DataFrames of at most ``chunk_rows`` rows each."""
+    for chunk in _raw_chunks(Path(path), chunk_rows):
+        yield add_missing_scores(apply_schema(chunk))
+
+
+def _raw_chunks(path, chunk_rows):
+    suffix = path.suffix.lower()
+    if suffix == ".xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows)
+            while batch := list(itertools.islice(rows, chunk_rows)):
+                yield pd.DataFrame.from_records(batch, columns=header, coerce_float=True)
+        finally:
+            workbook.close()
+    elif suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Cannot stream survey file type: {path.name}")
+
+
+class GroupAccumulator:
+    """Count, mean and sum of squared deviations of every outcome in every group of one column."""
+
+    def __init__(self, column, outcomes):
+        self.column = column
+        self.outcomes = list(outcomes)
+        self.levels = sorted(LABELS.get(column, {}))  # declared codes, observed or not
+        self.n = np.zeros((len(self.levels), len(self.outcomes)))
+        self.mean = np.full_like(self.n, np.nan)
+        self.ss = np.zeros_like(self.n)
+
+    def update(self, codes, levels, x):
+        """Fold in one chunk: group ``codes`` into ``levels`` and the outcome matrix ``x``."""
+        keep = codes >= 0
+        order = np.argsort(codes[keep], kind="stable")
+        n, mean, ss = block_moments(x[keep][order], np.bincount(codes[keep], minlength=len(levels)))
+        self.merge(list(levels), n, mean, ss)
+
+    def merge(self, levels, n, mean, ss):
+        new = [level for level in levels if level not in self.levels]
+        if new:
+            self.levels = sorted(self.levels + new)
+            grow = {"n": 0.0, "mean": np.nan, "ss": 0.0}
+            for name, fill in grow.items():
+                old = getattr(self, name)
+                grown = np.full((len(self.levels), len(self.outcomes)), fill)
+                grown[[self.levels.index(level) for level in self._previous(new)]] = old
+                setattr(self, name, grown)
+        idx = [self.levels.index(level) for level in levels]
+        self.n[idx], self.mean[idx], self.ss[idx] = merge_moments(
+            self.n[idx], self.mean[idx], self.ss[idx], n, mean, ss)
+
+    def _previous(self, new):
+        return [level for level in self.levels if level not in new]
+
+    def moments(self, outcomes, levels=None):
+        cols = [self.outcomes.index(outcome) for outcome in outcomes]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = self.ss[:, cols] / (self.n[:, cols] - 1)
+        moments = GroupMoments(list(self.levels), list(outcomes), self.n[:, cols],
+                               self.mean[:, cols], var)
+        return moments.select(levels) if levels is not None else moments
+
+
+class CoMomentAccumulator:
+    """Pairwise-complete counts, means, squared deviations and co-moments of numeric columns.
+
+    Entry [i, j] of each matrix describes column i over the rows where both i
+    and j are present.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        shape = (len(self.columns), len(self.columns))
+        self.n = np.zeros(shape)
+        self.mean = np.full(shape, np.nan)
+        self.ss = np.zeros(shape)
+        self.co = np.zeros(shape)
+
+    def update(self, x):
+        present = ~np.isnan(x)
+        m = present.astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centre = np.nan_to_num(np.nanmean(x, axis=0)) if len(x) else np.zeros(len(self.columns))
+        x0 = np.where(present, x - centre, 0.0)
+        n = m.T @ m
+        sx = x0.T @ m
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = centre[:, None] + sx / n
+            ss = (x0 * x0).T @ m - sx * sx / n
+            co = x0.T @ x0 - sx * sx.T / n
+        self.merge(n, mean, ss, co)
+
+    def merge(self, n, mean, ss, co):
+        n_a, mean_a = self.n, self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = np.nan_to_num(mean) - np.nan_to_num(mean_a)
+            weight = np.where(n_a + n > 0, n_a * n / (n_a + n), 0.0)
+            self.co = np.nan_to_num(self.co) + np.nan_to_num(co) + delta * delta.T * weight
+        self.n, self.mean, self.ss = merge_moments(n_a, mean_a, self.ss, n, mean, ss)
+
+    def correlations(self, confidence=0.95):
+        return correlation_from_comoments(self.columns, self.n, self.ss, self.co, confidence)
+
+
+class CrosstabAccumulator:
+    """Contingency counts of every pair of categorical columns."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.tables = {}  # (a, b) -> DataFrame of counts, a < b in column order
+
+    def update(self, factorized):
+        """Fold in one chunk given as {column: (codes, levels)}."""
+        if len(self.columns) < 2:
+            return
+        coded = [factorized[column] for column in self.columns]
+        codes = np.array([codes for codes, _ in coded]).reshape(len(coded), -1)
+        counts = pair_counts(codes, [len(levels) for _, levels in coded])
+        for (i, j), table in counts.items():
+            # Plain level values: chunks may carry different category sets
+            self.merge(self.columns[i], self.columns[j],
+                       pd.DataFrame(table, index=list(coded[i][1]), columns=list(coded[j][1])))
+
+    def merge(self, a, b, counts):
+        old = self.tables.get((a, b))
+        if old is None:
+            self.tables[(a, b)] = counts
+            return
+        # Align on every level of both tables first: ``add`` would leave NaN in
+        # cells whose row level only one table has and column level only the other
+        index = old.index.union(counts.index, sort=False)
+        columns = old.columns.union(counts.columns, sort=False)
+        self.tables[(a, b)] = (old.reindex(index=index, columns=columns, fill_value=0)
+                               + counts.reindex(index=index, columns=columns, fill_value=0))
+
+    def crosstab(self, a, b):
+        if (a, b) in self.tables:
+            table = self.tables[(a, b)]
+        else:
+            table = self.tables[(b, a)].T
+        table = table.sort_index().sort_index(axis=1)
+        return table.astype(np.int64)
+
+
+@dataclass(eq=False)
+class SurveySummary:
+    """Sufficient statistics of a survey file; stands in for a ``Dataset`` in the engine."""
+    fingerprint: str
+    source: str = ""
+    rows: int = 0
+    groups: dict = field(default_factory=dict)  # column -> GroupAccumulator
+    comoments: CoMomentAccumulator = None
+    crosstabs: CrosstabAccumulator = None
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._correlations = None
+
+    @classmethod
+    def for_columns(cls, frame, fingerprint, source=""):
+        """An empty summary tracking the columns of ``frame``."""
+        numeric = numeric_columns(frame)
+        categorical = [col for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)]
+        return cls(fingerprint, source, 0,
+                   {col: GroupAccumulator(col, numeric) for col in categorical},
+                   CoMomentAccumulator(numeric), CrosstabAccumulator(categorical))
+
+    def update(self, chunk):
+        x = chunk[self.comoments.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        factorized = {column: pd.factorize(chunk[column], sort=True) for column in self.crosstabs.columns}
+        with self._lock:
+            for column, accumulator in self.groups.items():
+                accumulator.update(*factorized[column], x)
+            self.comoments.update(x)
+            self.crosstabs.update(factorized)
+            self.rows += len(chunk)
+            self._correlations = None
+
+    def append(self, rows, fingerprint):
+        """A new summary with the prepared ``rows`` folded in; this one is left unchanged.
+
+        Costs time proportional to ``len(rows)`` (plus the size of the
+        statistics), not to the rows seen so far.
+        """
+        with self._lock:
+            summary = SurveySummary(fingerprint, self.source, self.rows, copy.deepcopy(self.groups),
+                                    copy.deepcopy(self.comoments), copy.deepcopy(self.crosstabs))
+        summary.update(rows)
+        return summary
+
+    def group_moments(self, by, outcomes, levels=None):
+        return self.groups[by].moments(outcomes, levels)
+
+    def crosstab(self, a, b):
+        return self.crosstabs.crosstab(a, b)
+
+    @property
+    def correlations(self):
+        if self._correlations is None:
+            self._correlations = self.comoments.correlations()
+        return self._correlations
+
+
+def summarize_frame(frame, fingerprint, source=""):
+    """The ``SurveySummary`` of an already loaded, prepared frame."""
+    summary = SurveySummary.for_columns(frame, fingerprint, source)
+    for start in range(0, len(frame), CHUNK_ROWS):
+        summary.update(frame.iloc[start:start + CHUNK_ROWS])
+    return summary
+
+
+def summarize_survey(path, chunk_rows=CHUNK_ROWS):
+    """Stream ``path`` into a ``SurveySummary`` without keeping its rows."""
+    path = Path(path).resolve()
+    summary = None
+    for chunk in iter_chunks(path, chunk_rows):
+        if summary is None:
+            # Not the Dataset's fingerprint: results differ from it in the last bits
+            summary = SurveySummary.for_columns(chunk, f"{file_hash(path)}:summary", str(path))
+        summary.update(chunk)
+    if summary is None:
+        raise ValueError(f"No rows in {path.name}")
+    return summary
@@ -0,0 +1,106 @@
+"""Summary statistics the figures can be drawn from instead of raw rows.
+
+seaborn's boxplot, histplot(kde=True) and regplot work on every row, and the
+KDE and the bootstrapped regression band get slow on pooled cohorts. The
+functions here reduce the rows to what the chart actually shows, so drawing
+costs depend on the number of groups, bins and distinct values only:
+
+- ``box_stats``: quartiles, whiskers (1.5 IQR, like seaborn) and the distinct
+  outlier values of each group, in the format ``Axes.bxp`` expects;
+- ``histogram``: bin edges (numpy's "auto" rule, like seaborn) and counts;
+- ``binned_kde``: a Gaussian KDE with Scott's bandwidth evaluated by linear
+  binning onto a grid and one FFT convolution;
+- ``linear_fit_band``: the least-squares line with its analytic 95% band for
+  the mean, in place of regplot's bootstrap;
+- ``point_counts``: distinct (x, y) points with their multiplicity, for
+  scatter plots of discrete scales.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import stdtrit
+
+
+def box_stats(groups, whis=1.5):
+    stats = []
+    for values in groups:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            stats.append({"med": np.nan, "q1": np.nan, "q3": np.nan, "whislo": np.nan,
+                          "whishi": np.nan, "fliers": np.array([])})
+            continue
+        q1, med, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+        outside = values[(values < q1 - whis * iqr) | (values > q3 + whis * iqr)]
+        stats.append({"med": med, "q1": q1, "q3": q3,
+                      "whislo": inside.min(), "whishi": inside.max(),
+                      "fliers": np.unique(outside)})
+    return stats
+
+
+def histogram(values, bins="auto"):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    return counts, edges
+
+
+def binned_kde(values, gridsize=200, cut=0.0, bw_adjust=1.0):
+    """Gaussian KDE on an even grid: returns (grid, density)."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if not n:
+        return np.array([]), np.array([])
+    bandwidth = values.std(ddof=1) * n ** (-1 / 5) * bw_adjust if n > 1 else 0.0
+    lo, hi = values.min() - cut * bandwidth, values.max() + cut * bandwidth
+    grid = np.linspace(lo, hi, gridsize)
+    if bandwidth <= 0 or hi <= lo:
+        return grid, np.zeros(gridsize)
+    step = grid[1] - grid[0]
+
+    # Linear binning: split each value's weight between its two neighbouring grid points
+    position = (values - lo) / step
+    left = np.clip(np.floor(position).astype(np.int64), 0, gridsize - 2)
+    frac = position - left
+    weights = np.bincount(left, 1 - frac, gridsize) + np.bincount(left + 1, frac, gridsize)
+
+    # Convolve with the kernel sampled on the grid; padding avoids wrap-around
+    reach = min(int(np.ceil(4 * bandwidth / step)), 4 * gridsize)
+    offsets = np.arange(-reach, reach + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    size = gridsize + len(kernel) - 1
+    fft_size = 1 << int(np.ceil(np.log2(size)))
+    smoothed = np.fft.irfft(np.fft.rfft(weights, fft_size) * np.fft.rfft(kernel, fft_size), fft_size)
+    density = smoothed[reach:reach + gridsize] / n
+    return grid, np.maximum(density, 0.0)
+
+
+def linear_fit_band(x, y, gridsize=100, confidence=0.95):
+    """OLS line of y on x with the confidence band for the mean: (grid, fit, low, high)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[ok], y[ok]
+    n = len(x)
+    x_mean, y_mean = x.mean(), y.mean()
+    sxx = ((x - x_mean) ** 2).sum()
+    slope = ((x - x_mean) * (y - y_mean)).sum() / sxx
+    intercept = y_mean - slope * x_mean
+    residual_var = ((y - intercept - slope * x) ** 2).sum() / (n - 2)
+    grid = np.linspace(x.min(), x.max(), gridsize)
+    fit = intercept + slope * grid
+    half_width = stdtrit(n - 2, 0.5 + confidence / 2) * np.sqrt(
+        residual_var * (1 / n + (grid - x_mean) ** 2 / sxx))
+    return grid, fit, fit - half_width, fit + half_width
+
+
+def point_counts(x, y):
+    """Distinct (x, y) pairs and how many rows share each: (xs, ys, counts)."""
+    # Hash-based counting; np.unique(axis=0) would sort every row
+    points = pd.DataFrame({"x": np.asarray(x, dtype=np.float64), "y": np.asarray(y, dtype=np.float64)})
+    counts = points.dropna().value_counts(sort=False)
+    xs = counts.index.get_level_values("x").to_numpy()
+    ys = counts.index.get_level_values("y").to_numpy()
+    return xs, ys, counts.to_numpy()
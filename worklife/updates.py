@@ -0,0 +1,121 @@
+"""Adding newly collected responses to a loaded dataset.
+
+``append_responses`` returns a new ``Dataset`` with a batch of rows added, at
+a cost proportional to the batch, not to the rows already there:
+
+- test statistics are not recomputed from all the rows: the dataset carries
+  running statistics (``worklife.streaming.SurveySummary``: group moments,
+  correlation co-moments and crosstab counts), built when it was loaded with
+  ``load_survey(..., summarize=True)``; the batch is merged into a copy of
+  them, and the engine evaluates every analysis from the merged statistics;
+- the rows are kept as the batches they arrived in and only concatenated
+  the first time something needs them whole (figures, row tables, filters);
+- the group index and the filter bitmaps the previous dataset had built are
+  extended with the new rows when first used, not rebuilt.
+
+The new dataset gets its own fingerprint, derived from the old one and the
+batch, so cached results and figures of the old one stay valid for whoever
+still shows it.
+"""
+import hashlib
+from functools import cached_property
+
+import pandas as pd
+
+from worklife.bitmaps import BitmapIndex
+from worklife.data import Dataset
+from worklife.engine import engine, run_all
+from worklife.groups import GroupIndex
+from worklife.schema import apply_schema
+from worklife.scoring import add_missing_scores
+
+
+def prepare_rows(rows, like):
+    """Give a batch of raw rows the columns and column types of the frame ``like``."""
+    rows = add_missing_scores(apply_schema(pd.DataFrame(rows)))
+    rows = rows.reindex(columns=like.columns)
+    for column in like.columns:
+        dtype = like[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Codes the loaded frame hasn't seen yet become extra categories
+            extra = sorted(set(rows[column].dropna().unique()) - set(dtype.categories))
+            rows[column] = rows[column].astype(
+                pd.CategoricalDtype(list(dtype.categories) + extra, ordered=dtype.ordered))
+        elif rows[column].dtype != dtype:
+            if pd.api.types.is_integer_dtype(dtype) and rows[column].isna().any():
+                dtype = dtype.name.capitalize()  # int8 -> nullable Int8
+            rows[column] = rows[column].astype(dtype)
+    return rows
+
+
+def appended_fingerprint(fingerprint, rows):
+    digest = hashlib.sha256(fingerprint.encode())
+    digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _concat(chunks):
+    # Union of every chunk's categories, in order: a batch's new codes come last
+    first = chunks[0]
+    categories = {column: pd.CategoricalDtype(
+                      list(dict.fromkeys(level for chunk in chunks for level in chunk[column].dtype.categories)),
+                      ordered=first[column].dtype.ordered)
+                  for column in first.columns if isinstance(first[column].dtype, pd.CategoricalDtype)}
+    return pd.concat([chunk.astype(categories) if categories else chunk for chunk in chunks], ignore_index=True)
+
+
+class AppendedDataset(Dataset):
+    """A ``Dataset`` whose rows are kept as the batches they were appended in.
+
+    ``frame`` is concatenated the first time it is read; the tests are
+    evaluated from ``summary`` and don't read it.
+    """
+
+    def __init__(self, chunks, fingerprint, source, raw_bytes, summary, previous_groups=None,
+                 previous_bitmaps=None):
+        self.chunks = chunks
+        self.fingerprint = fingerprint
+        self.source = source
+        self.raw_bytes = raw_bytes
+        self.summary = summary
+        # The indexes of the dataset appended to, if it had built them; its
+        # rows are the first chunk
+        self._previous_groups = previous_groups
+        self._previous_bitmaps = previous_bitmaps
+
+    @cached_property
+    def frame(self):
+        return _concat(self.chunks)
+
+    @cached_property
+    def groups(self):
+        previous, self._previous_groups = self._previous_groups, None
+        return previous.extended(self.frame) if previous is not None else GroupIndex(self.frame)
+
+    @cached_property
+    def bitmaps(self):
+        previous, self._previous_bitmaps = self._previous_bitmaps, None
+        return previous.extended(self.frame) if previous is not None else BitmapIndex(self.frame)
+
+
+def append_responses(dataset, rows, stats=engine):
+    """``dataset`` plus ``rows``, with every analysis already evaluated in ``stats``.
+
+    ``dataset`` must carry running statistics: load it with
+    ``load_survey(..., summarize=True)`` or get it from an earlier append.
+    """
+    if dataset.summary is None:
+        raise ValueError("Responses can only be appended to a dataset loaded with summarize=True")
+    loaded = vars(dataset)  # what the previous dataset has already computed
+    if isinstance(dataset, AppendedDataset) and "frame" not in loaded:
+        chunks = dataset.chunks
+    else:
+        chunks = (dataset.frame,)
+    rows = prepare_rows(rows, chunks[-1])
+    fingerprint = appended_fingerprint(dataset.fingerprint, rows)
+    summary = dataset.summary.append(rows, fingerprint)
+    raw_bytes = dataset.raw_bytes * summary.rows // max(dataset.summary.rows, 1)
+    updated = AppendedDataset(chunks + (rows,), fingerprint, dataset.source, raw_bytes, summary,
+                              loaded.get("groups"), loaded.get("bitmaps"))
+    run_all(updated, stats)
+    return updated
@@ -0,0 +1,239 @@
+"""Several survey datasets (waves, countries, employers) side by side.
+
+Datasets are registered through ``WORKLIFE_DATASETS``: entries separated by
+``os.pathsep``, each a path, a glob pattern, or ``name=path``. The main
+workbook always comes first. Every dataset is loaded through the usual cached
+loader and analysed by the shared, memoized engine, so adding a dataset only
+costs its own loading and tests; the per-dataset work of a section runs
+concurrently in a thread pool.
+
+For every analysis the waves are compared with a heterogeneity test of the
+null hypothesis that the effect is the same in every wave:
+
+- t-tests and ANOVAs: Cochran's Q on the group mean differences (the
+  differences to the first group, with their covariance, when there are more
+  than two groups), chi-square with (waves - 1) x (groups - 1) degrees of
+  freedom;
+- correlations: Cochran's Q on Fisher's z;
+- chi-square tests: the likelihood-ratio test of the no-three-way-interaction
+  log-linear model (fitted by iterative proportional fitting), i.e. whether
+  the association between the two variables differs between waves.
+
+I² (the share of the variation between waves beyond chance) is reported with
+each test.
+"""
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.special import chdtrc, ndtri
+
+from worklife.analyses import SECTIONS, Analysis, Table
+from worklife.associations import cramers_v
+from worklife.effects import eta_squared
+from worklife.engine import engine
+
+DATASETS_ENV = "WORKLIFE_DATASETS"
+
+EFFECT_LABELS = {"ttest": "mean difference", "anova": "eta squared", "pearson": "r", "chi2": "Cramér's V"}
+
+
+@dataclass(frozen=True)
+class Heterogeneity:
+    statistic: float    # Q (or G² for chi-square tests)
+    dof: int
+    p_value: float
+    i2: float           # share of the variation between waves beyond chance
+    method: str
+
+
+@dataclass(eq=False)
+class WaveComparison:
+    table: pd.DataFrame         # one row per wave
+    heterogeneity: Heterogeneity
+
+
+def registered_datasets(spec=None, main=None):
+    """{name: path} of the datasets to compare, ``main`` (the app's workbook) first."""
+    spec = os.environ.get(DATASETS_ENV, "") if spec is None else spec
+    datasets = {}
+    if main is not None:
+        datasets[Path(main).stem] = Path(main).resolve()
+    for entry in filter(None, (part.strip() for part in spec.split(os.pathsep))):
+        name, _, path = entry.partition("=") if "=" in entry else ("", "", entry)
+        paths = sorted(glob.glob(path)) if glob.has_magic(path) else [path]
+        for match in paths:
+            match = Path(match).resolve()
+            if match in datasets.values():
+                continue
+            datasets[name if name and len(paths) == 1 else match.stem] = match
+    return datasets
+
+
+# ------------ Effects per wave ----------------#
+
+def _group_rows(dataset, analysis):
+    moments = dataset.group_moments(analysis.by, [analysis.outcome], analysis.levels or None)
+    return moments.levels, moments.n[:, 0], moments.mean[:, 0], moments.var[:, 0]
+
+
+def _group_effect(kind, n, mean, var, confidence):
+    """Mean difference (first minus second group) with its CI, or eta squared."""
+    if kind == "ttest":
+        difference = mean[0] - mean[1]
+        half_width = ndtri(0.5 + confidence / 2) * np.sqrt(var[0] / n[0] + var[1] / n[1])
+        return difference, (difference - half_width, difference + half_width)
+    return eta_squared(n, mean, var)[0], (np.nan, np.nan)
+
+
+# ------------ Heterogeneity tests ----------------#
+
+def _finish(statistic, dof, method):
+    if not np.isfinite(statistic) or dof <= 0:
+        return Heterogeneity(np.nan, int(dof), np.nan, np.nan, method)
+    i2 = max(0.0, (statistic - dof) / statistic) if statistic > 0 else 0.0
+    return Heterogeneity(float(statistic), int(dof), float(chdtrc(dof, statistic)), i2, method)
+
+
+def mean_heterogeneity(n, mean, var):
+    """Cochran's Q for differences between group means across waves.
+
+    ``n``, ``mean`` and ``var`` are (waves, groups) arrays. Groups without two
+    observations in every wave are left out.
+    """
+    n, mean, var = (np.asarray(a, dtype=np.float64) for a in (n, mean, var))
+    usable = (n >= 2).all(axis=0) & np.isfinite(var).all(axis=0)
+    n, mean, var = n[:, usable], mean[:, usable], var[:, usable]
+    waves, groups = n.shape
+    if waves < 2 or groups < 2:
+        return _finish(np.nan, 0, "Cochran's Q (group differences)")
+    se2 = var / n
+    contrasts = mean[:, 1:] - mean[:, :1]
+    # Covariance of the differences to the first group: its variance is shared
+    covariance = se2[:, 0, None, None] + se2[:, 1:, None] * np.eye(groups - 1)
+    weights = np.linalg.inv(covariance)
+    pooled = np.linalg.solve(weights.sum(axis=0), np.einsum("wij,wj->i", weights, contrasts))
+    deviation = contrasts - pooled
+    q = np.einsum("wi,wij,wj->", deviation, weights, deviation)
+    return _finish(q, (waves - 1) * (groups - 1), "Cochran's Q (group differences)")
+
+
+def correlation_heterogeneity(r, n):
+    """Cochran's Q for correlations across waves, on Fisher's z."""
+    r, n = np.asarray(r, dtype=np.float64), np.asarray(n, dtype=np.float64)
+    usable = np.isfinite(r) & (n > 3)
+    z, w = np.arctanh(np.clip(r[usable], -0.999999, 0.999999)), n[usable] - 3
+    if len(z) < 2:
+        return _finish(np.nan, 0, "Cochran's Q (Fisher z)")
+    pooled = (w * z).sum() / w.sum()
+    return _finish((w * (z - pooled) ** 2).sum(), len(z) - 1, "Cochran's Q (Fisher z)")
+
+
+def association_heterogeneity(tables, max_iter=200, tol=1e-10):
+    """G² test that the association in the (waves, rows, columns) counts is the same in every wave."""
+    tables = np.asarray(tables, dtype=np.float64)
+    tables = tables[tables.sum(axis=(1, 2)) > 0]
+    tables = tables[:, tables.sum(axis=(0, 2)) > 0][:, :, tables.sum(axis=(0, 1)) > 0]
+    waves, rows, columns = tables.shape
+    if waves < 2 or rows < 2 or columns < 2:
+        return _finish(np.nan, 0, "likelihood ratio (three-way interaction)")
+    # Iterative proportional fitting of the model with all two-way margins
+    fitted = np.ones_like(tables)
+    margins = ((1,), (2,), (0,))
+    for _ in range(max_iter):
+        previous = fitted
+        for axis in margins:
+            observed = tables.sum(axis=axis, keepdims=True)
+            current = fitted.sum(axis=axis, keepdims=True)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                fitted = fitted * np.where(current > 0, observed / current, 0.0)
+        if np.abs(fitted - previous).max() < tol:
+            break
+    with np.errstate(invalid="ignore", divide="ignore"):
+        g2 = max(2 * np.where(tables > 0, tables * np.log(tables / fitted), 0.0).sum(), 0.0)
+    return _finish(g2, (waves - 1) * (rows - 1) * (columns - 1), "likelihood ratio (three-way interaction)")
+
+
+# ------------ Comparisons ----------------#
+
+def compare_analysis(waves, analysis, stats=engine, confidence=0.95):
+    """Per-wave results of ``analysis`` and the heterogeneity test across waves.
+
+    ``waves`` maps names to datasets; the tests come from ``stats`` (memoized).
+    """
+    records, group_rows, tables = [], [], []
+    kind = analysis.kind
+    for name, dataset in waves.items():
+        result = stats.run(dataset, analysis)
+        effect, ci = np.nan, (np.nan, np.nan)
+        n = result.details.get("n", np.nan)
+        if kind in ("ttest", "anova"):
+            levels, counts, mean, var = _group_rows(dataset, analysis)
+            group_rows.append((levels, counts, mean, var))
+            effect, ci = _group_effect(kind, counts, mean, var, confidence)
+            n = int(counts.sum())
+        elif kind == "pearson":
+            effect, ci = result.statistic, result.details.get("ci", ci)
+        else:
+            table = dataset.crosstab(analysis.outcome, analysis.by)
+            tables.append(table)
+            effect = cramers_v(table)
+        records.append({"wave": name, "n": n, "statistic": result.statistic, "p-value": result.p_value,
+                        EFFECT_LABELS[kind]: effect,
+                        f"CI low ({confidence:.0%})": ci[0], f"CI high ({confidence:.0%})": ci[1]})
+    table = pd.DataFrame(records)
+
+    if kind in ("ttest", "anova"):
+        # Align the groups by level; a wave without a level gets an empty group
+        levels = list(dict.fromkeys(level for rows in group_rows for level in rows[0]))
+        arrays = np.full((3, len(group_rows), len(levels)), np.nan)
+        for w, (wave_levels, counts, mean, var) in enumerate(group_rows):
+            idx = [levels.index(level) for level in wave_levels]
+            arrays[:, w, idx] = counts, mean, var
+        heterogeneity = mean_heterogeneity(np.nan_to_num(arrays[0]), arrays[1], arrays[2])
+    elif kind == "pearson":
+        heterogeneity = correlation_heterogeneity(table["statistic"], table["n"])
+    else:
+        rows = list(dict.fromkeys(level for t in tables for level in t.index))
+        columns = list(dict.fromkeys(level for t in tables for level in t.columns))
+        stacked = [t.reindex(index=rows, columns=columns, fill_value=0).to_numpy() for t in tables]
+        heterogeneity = association_heterogeneity(stacked)
+    if kind not in ("ttest", "pearson"):
+        table = table.drop(columns=[f"CI low ({confidence:.0%})", f"CI high ({confidence:.0%})"])
+    return WaveComparison(table, heterogeneity)
+
+
+def compare_section(waves, section, stats=engine, executor=None):
+    """[(analysis, WaveComparison)] for every analysis of ``section``, plus each wave's tables.
+
+    The tests and tables of each wave are computed in ``executor`` (a thread
+    pool by default) before being put side by side, so waves run concurrently.
+    Returns (comparisons, {table block: {wave: DataFrame}}).
+    """
+    blocks = [block for block in SECTIONS[section] if isinstance(block, (Analysis, Table))]
+    own_pool = executor is None
+    if own_pool:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(waves), os.cpu_count() or 1)),
+                                      thread_name_prefix="worklife-waves")
+    try:
+        futures = {(name, block): executor.submit(_compute, stats, dataset, block)
+                   for name, dataset in waves.items() for block in blocks}
+        computed = {key: future.result() for key, future in futures.items()}
+    finally:
+        if own_pool:
+            executor.shutdown()
+    comparisons = [(block, compare_analysis(waves, block, stats))
+                   for block in blocks if isinstance(block, Analysis)]
+    tables = {block: {name: computed[name, block] for name in waves}
+              for block in blocks if isinstance(block, Table)}
+    return comparisons, tables
+
+
+def _compute(stats, dataset, block):
+    if isinstance(block, Analysis):
+        return stats.run(dataset, block)
+    return stats.table(dataset, block)